@@ -0,0 +1,93 @@
+"""
+Benchmark for the connection profiles.
+
+Compares the "safe" profile (SQLite defaults) with the "wal" profile:
+the time of many small commits (like check-offs saved one by one), and how many
+read queries reader threads from a ConnectionPool get done while a writer commits.
+
+Run from the project folder:
+    python benchmarks/bench_connection.py [number of commits]
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from connection import ConnectionPool  # noqa: E402
+from db import get_db  # noqa: E402
+from fixtures import build_synthetic_db  # noqa: E402
+
+READERS = 4
+
+
+def commits(path, profile, count):
+    """
+    Commits `count` single check-ins one by one.
+
+    :return: Seconds per commit.
+    """
+    db = get_db(path, profile)
+    start = time.perf_counter()
+    for day in range(count):
+        with db:
+            db.execute("INSERT OR IGNORE INTO check_ins (habit_id, day) VALUES (1, ?)", (800_000 + day,))
+    elapsed = time.perf_counter() - start
+    db.close()
+    return elapsed / count
+
+
+def concurrent_reads(path, profile, count):
+    """
+    Runs reader threads while one writer commits `count` check-ins.
+
+    :return: Tuple (read queries per second, seconds the writer needed).
+    """
+    pool = ConnectionPool(path, size=READERS + 1, profile=profile)
+    done = threading.Event()
+    reads = [0] * READERS
+
+    def reader(index):
+        while not done.is_set():
+            with pool.connection() as db:
+                db.execute("SELECT habit_id, COUNT(*) FROM check_ins GROUP BY habit_id LIMIT 10").fetchall()
+            reads[index] += 1
+
+    threads = [threading.Thread(target=reader, args=(i,)) for i in range(READERS)]
+    for thread in threads:
+        thread.start()
+
+    start = time.perf_counter()
+    with pool.connection() as db:
+        for day in range(count):
+            with db:
+                db.execute("INSERT OR IGNORE INTO check_ins (habit_id, day) VALUES (2, ?)", (900_000 + day,))
+    elapsed = time.perf_counter() - start
+
+    done.set()
+    for thread in threads:
+        thread.join()
+    pool.close()
+    return sum(reads) / elapsed, elapsed
+
+
+def main():
+    """
+    Runs the benchmark for both profiles and prints the results.
+    """
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    with tempfile.TemporaryDirectory() as folder:
+        for profile in ("safe", "wal"):
+            path = os.path.join(folder, f"{profile}.db")
+            build_synthetic_db(path, habits=100, years=3, seed=1)
+            per_commit = commits(path, profile, count)
+            reads, write_time = concurrent_reads(path, profile, count)
+            print(f"{profile:5s}: {per_commit * 1000:7.3f} ms per commit, "
+                  f"{reads:8.0f} reads/s during {count} commits ({write_time:.2f} s)")
+
+
+if __name__ == "__main__":
+    main()
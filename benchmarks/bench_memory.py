@@ -0,0 +1,87 @@
+"""
+Memory benchmark for check-in storage.
+
+Compares the memory used per check-in by the old layout (a list of datetime.date
+objects per habit) with CheckInList (day ordinals in an array of C ints), and the
+size of a habit object with and without __slots__ (without the attribute values).
+
+Run from the project folder with src/ on the PYTHONPATH:
+    python benchmarks/bench_memory.py [number of check-ins]
+"""
+import sys
+import tracemalloc
+from datetime import date
+from check_ins import CheckInList
+from habit import Habit
+
+DAYS_PER_HABIT = 1000
+FIRST_DAY = date(2020, 1, 1).toordinal()
+
+
+def measure(build):
+    """
+    Measures the memory that stays allocated by the object returned from build().
+
+    :param build: Function without arguments that creates the data.
+    :return: Tuple (object, allocated bytes).
+    """
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, after - before
+
+
+def list_layout(n_habits):
+    """
+    The old layout: one list of date objects per habit (as created by date.fromisoformat).
+    """
+    return [[date.fromordinal(FIRST_DAY + day) for day in range(DAYS_PER_HABIT)]
+            for _ in range(n_habits)]
+
+
+def array_layout(n_habits):
+    """
+    The compact layout: one CheckInList of day ordinals per habit.
+    """
+    return [CheckInList.from_ordinals(range(FIRST_DAY, FIRST_DAY + DAYS_PER_HABIT))
+            for _ in range(n_habits)]
+
+
+class PlainHabit:
+    """
+    A habit object with a __dict__, as Habit was before it used __slots__.
+    """
+
+    def __init__(self, name, description, frequency):
+        self.name = name
+        self.description = description
+        self.frequency = frequency
+        self.created_at = date.today()
+        self.check_ins = []
+
+
+def main():
+    """
+    Runs the benchmark and prints the results.
+    """
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    n_habits = max(1, total // DAYS_PER_HABIT)
+    count = n_habits * DAYS_PER_HABIT
+
+    _, list_bytes = measure(lambda: list_layout(n_habits))
+    _, array_bytes = measure(lambda: array_layout(n_habits))
+    print(f"{count:,} check-ins in {n_habits:,} habits")
+    print(f"list of date objects: {list_bytes / 2**20:8.1f} MiB ({list_bytes / count:5.1f} bytes per check-in)")
+    print(f"CheckInList (array):  {array_bytes / 2**20:8.1f} MiB ({array_bytes / count:5.1f} bytes per check-in)")
+    print(f"reduction:            {list_bytes / array_bytes:8.1f}x")
+
+    plain = PlainHabit("Habit", "Description", "daily")
+    plain_bytes = sys.getsizeof(plain) + sys.getsizeof(plain.__dict__)
+    slots_bytes = sys.getsizeof(Habit("Habit", "Description", "daily"))
+    print(f"habit object without __slots__ (object + __dict__): {plain_bytes:4d} bytes")
+    print(f"Habit with __slots__ (object only):                 {slots_bytes:4d} bytes")
+
+if __name__ == "__main__":
+    main()
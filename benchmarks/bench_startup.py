@@ -0,0 +1,186 @@
+"""
+Startup benchmark for the interactive app (main.py).
+
+Prints the modules that take longest to import (like python -X importtime), then starts
+main.py in a pseudo terminal on a synthetic database and measures the wall-clock time
+until the welcome prompt, and how long the user then waits after pressing Enter for the
+menu and for the first report that needs the habits ("List all habits"). Keys are
+pressed after a think time, like a user reading the screen. Unix only (uses a pty).
+
+Run from the project folder:
+    python benchmarks/bench_startup.py [--habits 1000] [--runs 5] [--think 1.0] [--snapshot] [--budget 300]
+With --budget, the script exits with status 1 if the time to the menu (in ms) is higher.
+"""
+import argparse
+import os
+import select
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from db import get_db  # noqa: E402
+from fixtures import build_synthetic_db  # noqa: E402
+from snapshot import save_snapshot  # noqa: E402
+
+DOWN, ENTER = b"\x1b[B", b"\r"
+# prompt_toolkit asks the terminal for the cursor position; a real terminal answers.
+CURSOR_REQUEST, CURSOR_ANSWER = b"\x1b[6n", b"\x1b[1;1R"
+TIMEOUT = 30
+
+
+def _env(**variables):
+    env = dict(os.environ, PYTHONPATH=str(ROOT / "src"), TERM="xterm", **variables)
+    env.pop("HABIT_TRACKER_PROFILE", None)
+    return env
+
+
+def import_breakdown(top=10):
+    """
+    Imports main.py with -X importtime and returns the slowest modules it imports directly.
+
+    :param top: Number of modules to return.
+    :return: Tuple (seconds to import main.py, list of (seconds, module name)).
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"], cwd=ROOT, env=_env(),
+                            capture_output=True, text=True, check=True)
+    total, imports, children = 0.0, [], []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        # The names are indented by two spaces per level, and a module comes after its imports.
+        level = (len(name) - len(name.lstrip()) - 1) // 2
+        if level == 1:
+            children.append((int(cumulative) / 1e6, name.strip()))
+        elif level == 0:
+            if name.strip() == "main":
+                total, imports = int(cumulative) / 1e6, children
+            children = []
+    imports.sort(reverse=True)
+    return total, imports[:top]
+
+
+class Terminal:
+    """
+    Runs a command in a pseudo terminal and waits for its output.
+    """
+
+    def __init__(self, command, cwd, env):
+        self.master, slave = os.openpty()
+        self.process = subprocess.Popen(command, cwd=cwd, env=env, stdin=slave, stdout=slave,
+                                        stderr=slave, close_fds=True)
+        os.close(slave)
+        self.output = b""
+        self.sent = time.perf_counter()
+
+    def wait_for(self, text):
+        """
+        Reads the output until it contains `text` (new output only).
+
+        :return: Seconds since the last key press.
+        :raises TimeoutError: If the text does not appear within TIMEOUT seconds.
+        """
+        start = len(self.output)
+        deadline = time.perf_counter() + TIMEOUT
+        while text not in self.output[start:]:
+            if not select.select([self.master], [], [], max(0.0, deadline - time.perf_counter()))[0]:
+                raise TimeoutError(f"{text!r} did not appear. Output so far: {self.output[-500:]!r}")
+            try:
+                chunk = os.read(self.master, 65536)
+            except OSError:  # the app has exited
+                raise RuntimeError(f"{text!r} did not appear. Output: {self.output[-500:]!r}") from None
+            if CURSOR_REQUEST in chunk:
+                os.write(self.master, CURSOR_ANSWER)
+            self.output += chunk
+        return time.perf_counter() - self.sent
+
+    def send(self, keys, think=0.0):
+        """
+        Presses keys after waiting `think` seconds (reading the output meanwhile).
+        """
+        deadline = time.perf_counter() + think
+        while select.select([self.master], [], [], max(0.0, deadline - time.perf_counter()))[0]:
+            self.output += os.read(self.master, 65536)
+        os.write(self.master, keys)
+        self.sent = time.perf_counter()
+
+    def close(self):
+        self.process.kill()
+        self.process.wait()
+        os.close(self.master)
+
+
+def time_to_prompt(folder, main, think, env):
+    """
+    Starts the app once and measures the time to its first prompts.
+
+    :param folder: Working directory with the main.db database.
+    :param main: Path of main.py.
+    :param think: Seconds before every key press.
+    :param env: Environment variables of the app.
+    :return: Tuple of seconds to the welcome prompt, to the menu after Enter
+             and waited in the menus up to the first report.
+    """
+    terminal = Terminal([sys.executable, str(main)], folder, env)
+    try:
+        welcome = terminal.wait_for(b"Press Enter")
+        terminal.send(ENTER, think)
+        menu = terminal.wait_for(b"Choose an action")
+        # Analyze habit(s) > Basic analysis > List all habits
+        terminal.send(DOWN * 3 + ENTER, think)
+        report = terminal.wait_for(b"Basic analysis")
+        terminal.send(ENTER, think)
+        report += terminal.wait_for(b"List all habits")
+        terminal.send(ENTER, think)
+        report += terminal.wait_for(b"tracked habits")
+    finally:
+        terminal.close()
+    return welcome, menu, report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Startup benchmark for main.py")
+    parser.add_argument("--habits", type=int, default=1000, help="habits in the synthetic database (default: 1000)")
+    parser.add_argument("--runs", type=int, default=5, help="app starts to measure (default: 5)")
+    parser.add_argument("--think", type=float, default=1.0, help="seconds before every key press (default: 1.0)")
+    parser.add_argument("--main", default=str(ROOT / "main.py"), help="entry point to start (default: main.py)")
+    parser.add_argument("--snapshot", action="store_true", help="start from a snapshot file (warm start)")
+    parser.add_argument("--budget", type=float, help="maximum median time to the menu in ms")
+    args = parser.parse_args()
+
+    total, imports = import_breakdown()
+    print(f"Importing main.py: {total * 1000:.1f} ms. Slowest direct imports:")
+    for seconds, name in imports:
+        print(f"  {seconds * 1000:8.1f} ms  {name}")
+
+    with tempfile.TemporaryDirectory() as folder:
+        check_ins = build_synthetic_db(os.path.join(folder, "main.db"), habits=args.habits, years=3, seed=1)
+        env = _env()
+        if args.snapshot:
+            db = get_db(os.path.join(folder, "main.db"))
+            save_snapshot(db, os.path.join(folder, "main.snapshot"))
+            db.close()
+            env = _env(HABIT_TRACKER_SNAPSHOT="main.snapshot")
+        runs = [time_to_prompt(folder, Path(args.main).resolve(), args.think, env) for _ in range(args.runs)]
+
+    print(f"\nStarting the app with {args.habits:,} habits ({check_ins:,} check-ins"
+          f"{', from a snapshot' if args.snapshot else ''}), "
+          f"{args.think:g} s think time, median of {args.runs} runs:")
+    medians = [statistics.median(run[index] for run in runs) * 1000 for index in range(3)]
+    labels = ["start to welcome", "Enter to menu", "menus to report"]
+    for label, value in zip(labels, medians):
+        print(f"  {label:16s} {value:8.1f} ms")
+
+    if args.budget is not None and medians[1] > args.budget:
+        print(f"\nThe time to the menu is over the budget of {args.budget:.0f} ms.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,331 @@
+"""
+Benchmark suite for the storage, streak and analysis hot paths.
+
+Every benchmark runs on a synthetic database (see fixtures.build_synthetic_db) at
+several scales, from 10^3 to 10^6 check-ins. For each benchmark the best time of a
+few runs and the peak memory (tracemalloc) of one extra run are reported.
+
+The results can be saved as a JSON baseline; later runs are compared with it and
+the script exits with status 1 if a benchmark got slower or needs more memory than
+the threshold allows. Everything runs offline:
+    python benchmarks/bench_suite.py                 # run and compare with the baseline
+    python benchmarks/bench_suite.py --save          # run and save a new baseline
+    python benchmarks/bench_suite.py --scales 1000 10000 --threshold 0.5
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+import analyze  # noqa: E402
+from db import get_db, load_habits, save_habit  # noqa: E402
+from fixtures import build_synthetic_db  # noqa: E402
+from habit_manager import HabitManager  # noqa: E402
+from snapshot import is_current, load_snapshot, save_snapshot  # noqa: E402
+
+DEFAULT_SCALES = [10**3, 10**4, 10**5, 10**6]
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+# Average check-ins per synthetic habit with the settings below (3 years, 70% daily, 80% adherence).
+CHECK_INS_PER_HABIT = 650
+YEARS = 3
+LOOKUPS = 1000
+
+# Differences below these limits are treated as noise, not as regressions.
+MIN_SECONDS = 0.0005
+MIN_BYTES = 64 * 1024
+
+BENCHMARKS = []
+
+
+def benchmark(name):
+    """
+    Registers a benchmark. The decorated function gets the Context of a scale and
+    returns the function to measure; it is called again before every run, so it can
+    reset the state that the measured function changes.
+    """
+    def register(setup):
+        BENCHMARKS.append((name, setup))
+        return setup
+    return register
+
+
+class Context:
+    """
+    The data of one scale: the database file, an open connection and the loaded habits.
+    """
+
+    def __init__(self, path, check_ins):
+        self.path = path
+        self.check_ins = check_ins
+        self.db = get_db(path)
+        self.habits = load_habits(self.db)
+        self.manager = HabitManager()
+        for habit in self.habits:
+            self.manager.add_habit(habit)
+        self.names = [habit.name for habit in self.habits]
+        self.names = (self.names * (LOOKUPS // len(self.names) + 1))[:LOOKUPS]
+        self.last_day = date.fromordinal(max(habit.check_ins.latest.toordinal()
+                                             for habit in self.habits if habit.check_ins))
+
+    def close(self):
+        self.db.close()
+
+
+@benchmark("db.get_db")
+def bench_get_db(ctx):
+    return lambda: get_db(ctx.path).close()
+
+
+@benchmark("db.load_habits")
+def bench_load_habits(ctx):
+    return lambda: load_habits(ctx.db)
+
+
+@benchmark("db.save_habit")
+def bench_save_habit(ctx):
+    habit = max(ctx.habits, key=lambda h: len(h.check_ins))
+    return lambda: save_habit(ctx.db, habit)
+
+
+@benchmark("Habit.check_off")
+def bench_check_off(ctx):
+    today = date.today()
+    for habit in ctx.habits:
+        habit.check_ins.discard(today)
+
+    def run():
+        for habit in ctx.habits:
+            habit.check_off()
+    return run
+
+
+@benchmark("Habit.current_streak")
+def bench_current_streak(ctx):
+    return lambda: [habit.current_streak() for habit in ctx.habits]
+
+
+@benchmark("Habit.habit_skipped")
+def bench_habit_skipped(ctx):
+    return lambda: [habit.habit_skipped() for habit in ctx.habits]
+
+
+@benchmark("analyze.list_all_habits")
+def bench_list_all_habits(ctx):
+    return lambda: analyze.list_all_habits(ctx.habits)
+
+
+@benchmark("analyze.list_habits_by_frequency")
+def bench_list_habits_by_frequency(ctx):
+    return lambda: analyze.list_habits_by_frequency(ctx.habits, "daily")
+
+
+@benchmark("analyze.get_longest_streak_overall")
+def bench_get_longest_streak_overall(ctx):
+    return lambda: analyze.get_longest_streak_overall(ctx.habits)
+
+
+@benchmark("analyze.get_longest_streak_of")
+def bench_get_longest_streak_of(ctx):
+    return lambda: analyze.get_longest_streak_of(ctx.habits, ctx.names[-1])
+
+
+@benchmark("analyze.checkin_counts")
+def bench_checkin_counts(ctx):
+    return lambda: analyze.checkin_counts(ctx.habits)
+
+
+@benchmark("analyze.skipped_habits")
+def bench_skipped_habits(ctx):
+    return lambda: analyze.skipped_habits(ctx.habits)
+
+
+@benchmark("analyze.habit_frequency_summary")
+def bench_habit_frequency_summary(ctx):
+    return lambda: analyze.habit_frequency_summary(ctx.habits)
+
+
+@benchmark("analyze.average_streak")
+def bench_average_streak(ctx):
+    return lambda: analyze.average_streak(ctx.habits)
+
+
+@benchmark("analyze.habits_by_streak")
+def bench_habits_by_streak(ctx):
+    return lambda: analyze.habits_by_streak(ctx.habits)
+
+
+@benchmark("analyze.checkins_between")
+def bench_checkins_between(ctx):
+    return lambda: analyze.checkins_between(ctx.habits, ctx.last_day - timedelta(days=90), ctx.last_day)
+
+
+@benchmark("analyze.skipped_habits_as_of")
+def bench_skipped_habits_as_of(ctx):
+    return lambda: analyze.skipped_habits_as_of(ctx.habits, ctx.last_day)
+
+
+@benchmark("analyze.longest_streaks_ever")
+def bench_longest_streaks_ever(ctx):
+    return lambda: analyze.longest_streaks_ever(ctx.habits)
+
+
+@benchmark("HabitManager.get_habit")
+def bench_get_habit(ctx):
+    return lambda: [ctx.manager.get_habit(name) for name in ctx.names]
+
+
+@benchmark("HabitManager.habits_by_frequency")
+def bench_habits_by_frequency(ctx):
+    return lambda: ctx.manager.habits_by_frequency("weekly")
+
+
+@benchmark("HabitManager.longest_streak")
+def bench_manager_longest_streak(ctx):
+    return lambda: ctx.manager.longest_streak()
+
+
+@benchmark("main.import")
+def bench_main_import(ctx):
+    # Startup of the interactive app in a new interpreter (does not depend on the scale,
+    # see bench_startup.py for the details).
+    command = [sys.executable, "-c", "import main"]
+    env = dict(os.environ, PYTHONPATH=str(ROOT / "src"))
+    return lambda: subprocess.run(command, cwd=ROOT, env=env, check=True)
+
+
+# Registered last: writing the snapshot adds the change tracking triggers to the database.
+@benchmark("snapshot.load_snapshot")
+def bench_load_snapshot(ctx):
+    path = ctx.path + ".snapshot"
+    if not is_current(ctx.db, path):
+        save_snapshot(ctx.db, path)
+    return lambda: load_snapshot(ctx.db, path)
+
+
+def measure(setup, ctx, repeat):
+    """
+    Measures one benchmark.
+
+    :param setup: Registered benchmark function.
+    :param ctx: Context of the scale.
+    :param repeat: Number of timed runs; the fastest one counts.
+    :return: Dictionary with 'seconds' and 'peak_bytes'.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        run = setup(ctx)
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+
+    # Memory is measured in a separate run, because tracing slows the code down.
+    run = setup(ctx)
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    run()
+    peak = tracemalloc.get_traced_memory()[1] - before
+    tracemalloc.stop()
+    return {"seconds": best, "peak_bytes": peak}
+
+
+def run_suite(scales, repeat, selected=None):
+    """
+    Runs all benchmarks at all scales and prints the results.
+
+    :param scales: Numbers of check-ins.
+    :param repeat: Number of timed runs per benchmark.
+    :param selected: Optional substring; only benchmarks with it in their name are run.
+    :return: Dictionary {"<scale>/<benchmark>": result}.
+    """
+    results = {}
+    with tempfile.TemporaryDirectory() as folder:
+        for scale in scales:
+            path = os.path.join(folder, f"bench_{scale}.db")
+            habits = max(1, round(scale / CHECK_INS_PER_HABIT))
+            check_ins = build_synthetic_db(path, habits=habits, years=YEARS, seed=scale)
+            ctx = Context(path, check_ins)
+            print(f"\n{scale:,} check-ins ({check_ins:,} in {habits:,} habits)")
+            try:
+                for name, setup in BENCHMARKS:
+                    if selected and selected not in name:
+                        continue
+                    result = measure(setup, ctx, repeat)
+                    result["check_ins"] = check_ins
+                    results[f"{scale}/{name}"] = result
+                    print(f"  {name:36s} {result['seconds'] * 1000:10.3f} ms {result['peak_bytes'] / 1024:10.1f} KiB")
+            finally:
+                ctx.close()
+    return results
+
+
+def compare(results, baseline, threshold):
+    """
+    Compares results with a baseline.
+
+    :param results: Results of this run.
+    :param baseline: Results of the baseline run.
+    :param threshold: Allowed relative increase, e.g. 0.25 for 25%.
+    :return: List of messages, one per regression.
+    """
+    regressions = []
+    for key, result in results.items():
+        old = baseline.get(key)
+        if old is None:
+            continue
+        for field, noise in (("seconds", MIN_SECONDS), ("peak_bytes", MIN_BYTES)):
+            if result[field] > old[field] * (1 + threshold) and result[field] - old[field] > noise:
+                regressions.append(f"{key}: {field} {old[field]:.6g} -> {result[field]:.6g} "
+                                   f"(+{(result[field] / old[field] - 1) * 100 if old[field] else float('inf'):.0f}%)")
+    return regressions
+
+
+def main():
+    """
+    Runs the suite, compares it with the baseline or saves a new baseline.
+    """
+    parser = argparse.ArgumentParser(description="Habit tracker benchmark suite")
+    parser.add_argument("--scales", type=int, nargs="+", default=DEFAULT_SCALES,
+                        help="numbers of check-ins (default: 10^3 to 10^6)")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per benchmark (default: 3)")
+    parser.add_argument("--only", help="run only benchmarks whose name contains this text")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="baseline JSON file")
+    parser.add_argument("--save", action="store_true", help="save the results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed slowdown or memory increase before failing (default: 0.25 = 25%%)")
+    args = parser.parse_args()
+
+    results = run_suite(args.scales, args.repeat, args.only)
+
+    if args.save:
+        data = {"python": platform.python_version(), "machine": platform.machine(), "results": results}
+        args.baseline.write_text(json.dumps(data, indent=2, sort_keys=True))
+        print(f"\nBaseline saved to {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print(f"\nNo baseline at {args.baseline}; run with --save to create one.")
+        return 0
+
+    baseline = json.loads(args.baseline.read_text())["results"]
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) above {args.threshold:.0%}:")
+        for message in regressions:
+            print(f"- {message}")
+        return 1
+    print(f"\nNo regressions above {args.threshold:.0%} compared with {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
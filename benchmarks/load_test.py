@@ -0,0 +1,106 @@
+"""
+Load test for the JSON API server (src/server.py).
+
+Opens many concurrent client connections that send a mix of check-ins and reports,
+then prints the requests per second and the latency percentiles per operation.
+Without --port, a server is started in this process on a temporary synthetic database.
+
+Run from the project folder:
+    python benchmarks/load_test.py [--clients 50] [--requests 200] [--writes 0.3]
+    python benchmarks/load_test.py --port 8765        # against a running server
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from fixtures import build_synthetic_db  # noqa: E402
+from server import HabitServer, HabitClient  # noqa: E402
+
+REPORTS = ["longest_streak_overall", "checkin_counts", "skipped_habits", "average_streak", "habits_by_streak"]
+
+
+def percentile(sorted_values, share):
+    """
+    Returns a percentile of sorted values (nearest rank).
+    """
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, max(0, round(share * len(sorted_values)) - 1))]
+
+
+async def run_client(client, names, count, writes, seed, latencies):
+    """
+    Sends `count` requests: check-ins with probability `writes`, otherwise reports.
+    """
+    rng = random.Random(seed)
+    first_day = date(2026, 1, 1)
+    for _ in range(count):
+        if rng.random() < writes:
+            op, args = "check_in", {"name": rng.choice(names),
+                                    "day": (first_day + timedelta(days=rng.randrange(365))).isoformat()}
+        elif rng.random() < 0.5:
+            op, args = "get_habit", {"name": rng.choice(names)}
+        else:
+            op, args = "report", {"kind": rng.choice(REPORTS)}
+        start = time.perf_counter()
+        await client.request(op, **args)
+        latencies.setdefault(op, []).append(time.perf_counter() - start)
+
+
+async def load_test(args, address):
+    """
+    Runs the clients against a server and prints the results.
+    """
+    clients = [await HabitClient.connect(*address) for _ in range(args.clients)]
+    names = [habit["name"] for habit in await clients[0].request("list_habits")]
+    latencies = {}
+
+    start = time.perf_counter()
+    await asyncio.gather(*[run_client(client, names, args.requests, args.writes, index, latencies)
+                           for index, client in enumerate(clients)])
+    elapsed = time.perf_counter() - start
+    for client in clients:
+        await client.close()
+
+    total = sum(len(values) for values in latencies.values())
+    print(f"{total:,} requests from {args.clients} clients in {elapsed:.2f} s: {total / elapsed:,.0f} requests/s")
+    print(f"{'operation':12s} {'count':>7s} {'p50 ms':>8s} {'p95 ms':>8s} {'p99 ms':>8s} {'max ms':>8s}")
+    for op, values in sorted(latencies.items()):
+        values.sort()
+        print(f"{op:12s} {len(values):7d} {percentile(values, 0.5) * 1000:8.2f} {percentile(values, 0.95) * 1000:8.2f} "
+              f"{percentile(values, 0.99) * 1000:8.2f} {values[-1] * 1000:8.2f}")
+
+
+async def main(args):
+    if args.port is not None:
+        await load_test(args, (args.host, args.port))
+        return
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "load.db")
+        build_synthetic_db(path, habits=args.habits, years=2, seed=1)
+        server = HabitServer(path)
+        await server.start(port=0)
+        try:
+            await load_test(args, server.address[:2])
+        finally:
+            await server.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test for the habit tracker API server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, help="port of a running server (default: start one)")
+    parser.add_argument("--clients", type=int, default=50, help="concurrent connections (default: 50)")
+    parser.add_argument("--requests", type=int, default=200, help="requests per client (default: 200)")
+    parser.add_argument("--writes", type=float, default=0.3, help="share of check-in requests (default: 0.3)")
+    parser.add_argument("--habits", type=int, default=200, help="habits in the temporary database (default: 200)")
+    asyncio.run(main(parser.parse_args()))
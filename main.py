@@ -1,37 +1,94 @@
-import questionary
+import os
+import sys
 from habit_manager import HabitManager
-from db import get_db, save_habit, load_habits
-from fixtures import generate_test_habits
-from analyze import (
-    list_all_habits,
-    list_habits_by_frequency,
-    get_longest_streak_overall,
-    get_longest_streak_of,
-    skipped_habits,
-    checkin_counts,
-    habits_by_streak,
-    average_streak,
-    habit_frequency_summary)
+from db import get_db, save_changes, load_habits
+from startup import BackgroundTask, lazy_import
+import instrumentation
+
+# Imported on first use: questionary alone (with prompt_toolkit) takes longer to import
+# than everything else the app needs to show the welcome prompt.
+questionary = lazy_import("questionary")
+analyze = lazy_import("analyze")
+db_analyze = lazy_import("db_analyze")
+fixtures = lazy_import("fixtures")
+history_cache_module = lazy_import("history_cache")
+persister_module = lazy_import("persister")
+snapshot = lazy_import("snapshot")
+batch = lazy_import("batch")
+
+
+def load_in_background(history_cache=None, snapshot_path=None):
+    """
+    Loads the habits with a connection of its own, so it can run on a background thread.
+
+    :param history_cache: Optional HistoryCache; if given, check-ins are loaded lazily.
+    :param snapshot_path: Optional snapshot file; used instead of the tables if it is current.
+    :return: List of Habit objects.
+    :raises RuntimeError: If the database cannot be opened.
+    """
+    db = get_db()
+    if db is None:
+        raise RuntimeError("Could not connect to the database.")
+    try:
+        if snapshot_path:
+            habits = snapshot.load_snapshot(db, snapshot_path)
+            if habits is not None:
+                return habits
+        return load_habits(db, history_cache=history_cache, user="")
+    finally:
+        db.close()
 
 def main():
     """
     Main loop of the habit tracker CLI app.
-    Connects to the SQLite database, loads habits, and shows interactive options.
+    Connects to the SQLite database and shows interactive options. The habits are loaded
+    on a background thread while the welcome prompt is shown; actions wait for them only
+    when they need them.
+    If HABIT_TRACKER_WRITE_BEHIND is set (flush interval in seconds),
+    changes are saved in the background while the app is running.
+    If HABIT_TRACKER_HISTORY_CACHE is set (number of histories), check-ins are loaded lazily.
+    If HABIT_TRACKER_SNAPSHOT is set (file name), the habits are loaded from that snapshot
+    file while it matches the database, and it is written again on exit when it does not.
+    If HABIT_TRACKER_PROFILE is set, the hot paths are instrumented; the numbers are shown
+    under "Diagnostics" and written to HABIT_TRACKER_PROFILE_FILE (default profile.json) on exit.
     """
 
+    persister = None
     try:
         db = get_db()
         if db is None:
             print("Could not connect to the database.")
             return
 
+        # The prompt library is imported and the habits are loaded while the welcome text is shown.
+        BackgroundTask(questionary.load, name="import-questionary")
+        history_cache = None
+        cache_size = os.environ.get("HABIT_TRACKER_HISTORY_CACHE")
+        if cache_size:
+            history_cache = history_cache_module.HistoryCache(db, capacity=int(cache_size))
+        snapshot_path = os.environ.get("HABIT_TRACKER_SNAPSHOT")
+        loading = BackgroundTask(load_in_background, history_cache, snapshot_path, name="load-habits")
+
         print("Welcome to the Habit Tracker App!")
         input("Press Enter to continue...\n")
 
         manager = HabitManager()
-        habits = load_habits(db)
-        for habit in habits:
-            manager.add_habit(habit)
+        write_behind = os.environ.get("HABIT_TRACKER_WRITE_BEHIND")
+        loaded = False
+
+        def wait_for_habits():
+            """
+            Waits until the habits are loaded (only the first time an action needs them).
+            """
+            nonlocal loaded, persister
+            if loaded:
+                return
+            for habit in loading.result():
+                manager.add_habit(habit)
+            loaded = True
+            if write_behind:
+                persister = persister_module.WriteBehindPersister(manager, interval=float(write_behind))
+                persister.start()
 
         demo_loaded = False  # Prevent multiple demo loads
 
@@ -44,6 +101,7 @@ def main():
                     "Delete habit",
                     "Analyze habit(s)",
                     "Load demo data (4 weeks)",
+                    "Diagnostics",
                     "Exit"
                 ]
             ).ask()
@@ -53,13 +111,17 @@ def main():
                 description = questionary.text("Describe the habit:").ask()
                 frequency = questionary.select("Choose frequency:", choices=["daily", "weekly"]).ask()
 
-                if name and description and frequency:
+                wait_for_habits()
+                if name and manager.get_habit(name):
+                    print(f"A habit named '{name}' already exists.")
+                elif name and description and frequency:
                     manager.create_habit(name, description, frequency)
                     print(f"Habit '{name}' has been created.")
                 else:
                     print("Invalid input. Please try again.")
 
             elif action == "Edit existing habit":
+                wait_for_habits()
                 if not manager.habits:
                     print("No habits found.")
                     continue
@@ -84,9 +146,10 @@ def main():
 
                 elif edit_action == "Rename habit":
                     new_name = questionary.text("New name:").ask()
-                    if new_name:
-                        habit.original_name = habit.name
-                        habit.name = new_name
+                    if new_name and manager.get_habit(new_name):
+                        print(f"A habit named '{new_name}' already exists.")
+                    elif new_name:
+                        manager.rename_habit(habit.name, new_name)
                         print("Habit renamed.")
 
                 elif edit_action == "Change description":
@@ -97,10 +160,12 @@ def main():
 
                 elif edit_action == "Change frequency":
                     new_freq = questionary.select("New frequency:", choices=["daily", "weekly"]).ask()
-                    habit.frequency = new_freq
-                    print("Frequency updated.")
+                    if new_freq:
+                        habit.frequency = new_freq
+                        print("Frequency updated.")
 
             elif action == "Delete habit":
+                wait_for_habits()
                 if not manager.habits:
                     print("No habits available to delete.")
                     continue
@@ -114,10 +179,14 @@ def main():
                     choices=[
                         "Basic analysis",
                         "Advanced analysis",
+                        "Database report (SQL)",
                         "Back"
                     ]
                 ).ask()
 
+                if analyze_action in ("Basic analysis", "Advanced analysis"):
+                    wait_for_habits()
+
                 if analyze_action == "Basic analysis":
                     basic_choice = questionary.select(
                         "Select basic analysis:",
@@ -132,20 +201,20 @@ def main():
                     ).ask()
 
                     if basic_choice == "List all habits":
-                        names = list_all_habits(manager.habits)
+                        names = analyze.list_all_habits(manager.habits)
                         print("\nCurrently  tracked habits:")
                         for name in names:
                             print(f"- {name}")
 
                     elif basic_choice == "List habits by frequency":
                         freq = questionary.select("Frequency:", choices=["daily", "weekly"]).ask()
-                        filtered = list_habits_by_frequency(manager.habits, freq)
+                        filtered = analyze.list_habits_by_frequency(manager.habits, freq)
                         print(f"\nHabits with '{freq}' frequency:")
                         for habit in filtered:
                             print(f"- {habit.name} (Streak: {habit.current_streak()})")
 
                     elif basic_choice == "Longest streak overall":
-                        habit, streak = get_longest_streak_overall(manager.habits)
+                        habit, streak = analyze.get_longest_streak_overall(manager)
                         if habit:
                             print(f"\nLongest streak overall: {habit.name} ({streak})")
                         else:
@@ -153,11 +222,11 @@ def main():
 
                     elif basic_choice == "Longest streak by name":
                         name = questionary.select("Select habit:", choices=[h.name for h in manager.habits]).ask()
-                        streak = get_longest_streak_of(manager.habits, name)
+                        streak = analyze.get_longest_streak_of(manager, name)
                         print(f"\n'{name}' has a current streak of {streak} days or weeks.")
 
                     elif basic_choice == "Skipped habits":
-                        skipped = skipped_habits(manager.habits)
+                        skipped = analyze.skipped_habits(manager.habits)
                         if not skipped:
                             print("No habits were skipped. 🎉")
                         else:
@@ -179,47 +248,93 @@ def main():
 
                     if advanced_choice == "Check-in count per habit":
                         print("\nCheck-in counts:")
-                        for name, count in checkin_counts(manager.habits):
+                        for name, count in analyze.checkin_counts(manager.habits):
                             print(f"- {name}: {count} check-ins")
 
                     elif advanced_choice == "Habits sorted by streak":
                         print("\nHabits sorted by current streak:")
-                        for habit in habits_by_streak(manager.habits):
+                        for habit in analyze.habits_by_streak(manager):
                             print(f"- {habit.name}: {habit.current_streak()}")
 
                     elif advanced_choice == "Average streak length":
-                        avg = average_streak(manager.habits)
+                        avg = analyze.average_streak(manager.habits)
                         print(f"\nAverage streak: {avg:.2f} check-ins")
 
                     elif advanced_choice == "Summary: daily vs. weekly":
-                        summary = habit_frequency_summary(manager.habits)
+                        summary = analyze.habit_frequency_summary(manager.habits)
                         print("\nHabit frequency summary:")
                         for freq, count in summary.items():
                             print(f"- {freq}: {count} habits")
 
+                elif analyze_action == "Database report (SQL)":
+                    # Answers the reports with SQL queries, so pending changes are saved first
+                    # (there are none before the habits are loaded).
+                    if persister is not None:
+                        persister.flush()
+                    elif loaded:
+                        save_changes(db, manager)
+
+                    name, streak = db_analyze.get_longest_streak_overall(db, user="")
+                    print("\nDatabase report:")
+                    if name:
+                        print(f"- Longest streak overall: {name} ({streak})")
+                    print(f"- Average streak: {db_analyze.average_streak(db, user=''):.2f} check-ins")
+                    for freq, count in db_analyze.habit_frequency_summary(db, user="").items():
+                        print(f"- {freq}: {count} habits")
+                    print("\nCheck-in counts:")
+                    for name, count in db_analyze.checkin_counts(db, user=""):
+                        print(f"- {name}: {count} check-ins")
+                    skipped = db_analyze.skipped_habits(db, user="")
+                    if skipped:
+                        print("\nSkipped habits:")
+                        for name in skipped:
+                            print(f"- {name}")
+
             elif action == "Load demo data (4 weeks)":
                 if demo_loaded:
                     print("Demo data has already been loaded.")
                 else:
-                    demo_habits = generate_test_habits()
+                    wait_for_habits()
+                    demo_habits = fixtures.generate_test_habits()
                     for demo in demo_habits:
-                        manager.add_habit(demo)
+                        if manager.get_habit(demo.name) is None:
+                            manager.add_habit(demo)
                     demo_loaded = True
                     print("Demo habits loaded (4 weeks of check-ins).")
 
+            elif action == "Diagnostics":
+                if not instrumentation.ENABLED:
+                    print("Diagnostics are disabled. Start the app with HABIT_TRACKER_PROFILE=1 to enable them.")
+                else:
+                    print()
+                    for line in instrumentation.format_report():
+                        print(line)
+
             elif action == "Exit":
-                try:
-                    for habit in manager.habits:
-                        save_habit(db, habit)
-                    print("Habits saved. Goodbye!")
-                except Exception as error:
-                    print(f"Error saving habits: {error}")
+                if persister is not None:
+                    persister.stop()
+                    saved = True
+                else:
+                    saved = not loaded or save_changes(db, manager)
+                if saved and snapshot_path and not snapshot.is_current(db, snapshot_path):
+                    snapshot.release(manager.habits)  # closes the mapping of the old file
+                    snapshot.save_snapshot(db, snapshot_path)
+                print("Habits saved. Goodbye!" if saved else "Error saving habits.")
                 break
 
     except KeyboardInterrupt:
         print("\nExited by user.")
     except Exception as e:
         print(f"Unexpected error: {e}")
+    finally:
+        # Writes the remaining changes, also after Ctrl-C.
+        if persister is not None:
+            persister.stop()
+        if instrumentation.ENABLED:
+            instrumentation.dump(os.environ.get("HABIT_TRACKER_PROFILE_FILE", "profile.json"))
 
 if __name__ == "__main__":
+    # With arguments, a batch subcommand runs without prompts (see batch.py).
+    if len(sys.argv) > 1:
+        sys.exit(batch.run())
     main()
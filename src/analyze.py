@@ -1,3 +1,7 @@
+from instrumentation import instrumented
+
+
+@instrumented
 def list_all_habits(habits):
     """
     Returns the names of all currently tracked habits.
@@ -8,6 +12,7 @@ def list_all_habits(habits):
     return [habit.name for habit in habits]
 
 
+@instrumented
 def list_habits_by_frequency(habits, frequency):
     """
     Filters habits based on their frequency ('daily' or 'weekly').
@@ -19,33 +24,43 @@ def list_habits_by_frequency(habits, frequency):
     return [habit for habit in habits if habit.frequency == frequency]
 
 
+@instrumented
 def get_longest_streak_overall(habits):
     """
     Finds the habit with the longest streak overall.
+    If a HabitManager is passed, its streak leaderboard is used instead of a full scan.
 
-    :param habits: list of Habit objects
+    :param habits: list of Habit objects or a HabitManager
     :return: Tuple (Habit, streak length) or (None, 0) if empty
     """
     if not habits:
         return None, 0
+    leaderboard = getattr(habits, "leaderboard", None)
+    if leaderboard is not None:
+        return leaderboard.top(1)[0]
     top = max(habits, key=lambda h: h.current_streak())
     return top, top.current_streak()
 
 
+@instrumented
 def get_longest_streak_of(habits, name):
     """
     Gets the current streak for a habit by its name.
 
-    :param habits: list of Habit objects
+    :param habits: list of Habit objects or a HabitManager
     :param name: Name of the habit
     :return: Streak value (int), or 0 if not found.
     """
+    if hasattr(habits, "get_habit"):
+        habit = habits.get_habit(name)
+        return habit.current_streak() if habit else 0
     filtered = [h for h in habits if h.name == name]
     if not filtered:
         return 0
     return filtered[0].current_streak()
 
 
+@instrumented
 def checkin_counts(habits):
     """
     Counts how many check-ins have been recorded for each habit.
@@ -56,6 +71,7 @@ def checkin_counts(habits):
     return [(habit.name, len(habit.check_ins)) for habit in habits]
 
 
+@instrumented
 def skipped_habits(habits):
     """
      Lists all habits that were skipped based on their frequency.
@@ -67,6 +83,7 @@ def skipped_habits(habits):
     return [habit for habit in habits if habit.habit_skipped()]
 
 
+@instrumented
 def habit_frequency_summary(habits):
     """
     Gives an overview of how many habits are daily or weekly.
@@ -82,6 +99,7 @@ def habit_frequency_summary(habits):
     return summary
 
 
+@instrumented
 def average_streak(habits):
     """
     Calculates the average streak length across all habits.
@@ -95,11 +113,53 @@ def average_streak(habits):
     return total / len(habits)
 
 
+@instrumented
 def habits_by_streak(habits):
     """
     Sorts habits by their current streak in descending order.
+    If a HabitManager is passed, the order is read from its streak leaderboard.
 
-    :param habits: List of Habit objects.
+    :param habits: List of Habit objects or a HabitManager.
     :return: Sorted list of Habit objects.
     """
+    leaderboard = getattr(habits, "leaderboard", None)
+    if leaderboard is not None:
+        return [habit for habit, streak in leaderboard.top(len(leaderboard))]
     return sorted(habits, key=lambda h: h.current_streak(), reverse=True)
+
+
+@instrumented
+def checkins_between(habits, start, end):
+    """
+    Counts the check-ins of each habit within a date window, using the day bitmap of each habit.
+
+    :param habits: List of Habit objects.
+    :param start: First date of the window.
+    :param end: Last date of the window.
+    :return: List of tuples: (habit name, number of check-ins in the window)
+    """
+    return [(habit.name, habit.day_bitmap().count(start, end)) for habit in habits]
+
+
+@instrumented
+def skipped_habits_as_of(habits, day):
+    """
+    Lists all habits that were skipped as of a given date, using the day bitmap of each habit.
+    Check-ins after that date are ignored.
+
+    :param habits: List of Habit objects.
+    :param day: Reference date.
+    :return: List of skipped Habit objects.
+    """
+    return [habit for habit in habits if habit.day_bitmap().skipped(habit.frequency, day)]
+
+
+@instrumented
+def longest_streaks_ever(habits):
+    """
+    Finds the longest streak each habit ever reached, using the day bitmap of each habit.
+
+    :param habits: List of Habit objects.
+    :return: List of tuples: (habit name, longest streak)
+    """
+    return [(habit.name, habit.day_bitmap().longest_streak(habit.frequency)) for habit in habits]
@@ -0,0 +1,242 @@
+import argparse
+import json
+import sqlite3
+import sys
+from datetime import date, timedelta
+import db_analyze
+import transfer
+from db import get_db
+from habit import check_name
+
+# SQLite limits the number of parameters per statement, so long IN (...) lists are split.
+_IN_CHUNK = 500
+
+REPORTS = {
+    "habits": lambda db, today, user: db_analyze.list_all_habits(db, user=user),
+    "checkin-counts": lambda db, today, user: db_analyze.checkin_counts(db, user=user),
+    "frequency-summary": lambda db, today, user: db_analyze.habit_frequency_summary(db, user=user),
+    "skipped": lambda db, today, user: db_analyze.skipped_habits(db, today, user),
+    "streaks": lambda db, today, user: db_analyze.current_streaks(db, user=user),
+    "longest-streaks": lambda db, today, user: db_analyze.longest_streaks(db, user=user),
+    "longest-streak": lambda db, today, user: db_analyze.get_longest_streak_overall(db, user=user),
+    "average-streak": lambda db, today, user: db_analyze.average_streak(db, user=user),
+}
+
+
+def habit_ids(db, names, user=""):
+    """
+    Looks up the ids of habits by name, using the (user_id, name) index.
+
+    :param db: SQLite database connection.
+    :param names: Habit names.
+    :param user: User the habits belong to.
+    :return: Dictionary {name: id} of the habits that exist.
+    """
+    names = list(dict.fromkeys(names))
+    ids = {}
+    for start in range(0, len(names), _IN_CHUNK):
+        chunk = names[start:start + _IN_CHUNK]
+        rows = db.execute(f"""SELECT name, id FROM habits
+            WHERE user_id = ? AND name IN ({', '.join('?' * len(chunk))})""", [user] + chunk)
+        ids.update(rows)
+    return ids
+
+
+def _require(db, names, user):
+    """
+    Looks up habit ids and fails if one of the habits does not exist.
+
+    :raises KeyError: If a habit is missing.
+    """
+    ids = habit_ids(db, names, user)
+    missing = [name for name in dict.fromkeys(names) if name not in ids]
+    if missing:
+        raise KeyError(f"Unknown habit(s): {', '.join(missing)}")
+    return ids
+
+
+def check_in(db, names, days, user=""):
+    """
+    Records check-ins of several habits on several days in one transaction.
+    Only the habit ids and the new check-in rows are touched.
+
+    :param db: SQLite database connection.
+    :param names: Habit names.
+    :param days: Dates of the check-ins.
+    :param user: User the habits belong to.
+    :return: Dictionary with the number of new and of already recorded check-ins.
+    :raises KeyError: If a habit does not exist (nothing is written then).
+    """
+    ids = _require(db, names, user)
+    rows = [(ids[name], day.toordinal()) for name in dict.fromkeys(names) for day in dict.fromkeys(days)]
+    with db:
+        before = db.total_changes
+        db.executemany("INSERT OR IGNORE INTO check_ins (habit_id, day) VALUES (?, ?)", rows)
+        added = db.total_changes - before
+    return {"added": added, "already_recorded": len(rows) - added}
+
+
+def create(db, names, description="", frequency="daily", user=""):
+    """
+    Creates several habits in one transaction.
+
+    :param db: SQLite database connection.
+    :param names: Names of the new habits.
+    :param description: Description of the new habits.
+    :param frequency: 'daily' or 'weekly'.
+    :param user: User the habits belong to.
+    :return: Dictionary with the names of the created habits.
+    :raises ValueError: If a name is empty or a habit already exists (nothing is written then).
+    """
+    for name in names:
+        check_name(name)
+    names = list(dict.fromkeys(names))
+    existing = habit_ids(db, names, user)
+    if existing:
+        raise ValueError(f"Habit(s) already exist: {', '.join(existing)}")
+    created_at = date.today().isoformat()
+    with db:
+        db.executemany("""INSERT INTO habits (user_id, name, description, frequency, created_at)
+            VALUES (?, ?, ?, ?, ?)""", [(user, name, description, frequency, created_at) for name in names])
+    return {"created": names}
+
+
+def _days(args):
+    """
+    Collects the dates of the --date and --from/--to options (today if none is given).
+
+    :raises ValueError: If the range ends before it starts.
+    """
+    if not (args.date or args.start or args.end):
+        return [date.today()]
+    days = [date.fromisoformat(day) for day in args.date or []]
+    if args.start or args.end:
+        start = date.fromisoformat(args.start) if args.start else date.today()
+        end = date.fromisoformat(args.end) if args.end else date.today()
+        if end < start:
+            raise ValueError(f"The date range ends on {end} before it starts on {start}.")
+        days += [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+    return days
+
+
+def _progress(err):
+    """
+    Returns a progress function that prints the number of rows to err.
+    """
+    return lambda rows: print(f"{rows:,} rows", file=err, flush=True)
+
+
+def _import(db, args, err):
+    """
+    Runs the import subcommand.
+    """
+    options = {"user": args.user, "dedup": args.dedup, "progress": _progress(err) if args.progress else None}
+    if args.kind == "check-ins":
+        options["create_missing"] = args.create_missing
+    if args.file != "-":
+        return transfer.import_file(db, args.file, args.kind, args.format, **options)
+
+    rows = transfer.read_rows(sys.stdin, args.format or "csv")
+    if args.kind == "habits":
+        return transfer.import_habits(db, rows, **options)
+    return transfer.import_check_ins(db, rows, **options)
+
+
+def _export(db, args, out, err):
+    """
+    Runs the export subcommand. The data of an export to - goes to out,
+    so there is no result to print then (None is returned).
+    """
+    user = args.user or None
+    progress = _progress(err) if args.progress else None
+    if args.file != "-":
+        return {"rows": transfer.export_file(db, args.file, args.kind, args.format, user, progress)}
+
+    if args.kind == "habits":
+        rows, fields = transfer.iter_habit_rows(db, user), transfer.HABIT_FIELDS
+    else:
+        rows, fields = transfer.iter_check_in_rows(db, user), transfer.CHECK_IN_FIELDS
+    transfer.write_rows(rows, out, args.format or "csv", fields, progress)
+    return None
+
+
+def build_parser():
+    """
+    Builds the parser of the batch subcommands.
+
+    :return: argparse.ArgumentParser
+    """
+    parser = argparse.ArgumentParser(prog="main.py", description="Habit tracker batch commands "
+                                     "(run without arguments for the interactive app). Results are printed as JSON.")
+    parser.add_argument("--db", default="main.db", help="database file (default: main.db)")
+    parser.add_argument("--user", default="", help="user the habits belong to (default: the local user)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    checkin = commands.add_parser("checkin", help="check off habits")
+    checkin.add_argument("names", nargs="+", help="habit names")
+    checkin.add_argument("--date", action="append", help="ISO date (repeatable, default: today)")
+    checkin.add_argument("--from", dest="start", help="first ISO date of a range")
+    checkin.add_argument("--to", dest="end", help="last ISO date of a range (default: today)")
+
+    create_parser = commands.add_parser("create", help="create habits")
+    create_parser.add_argument("names", nargs="+", help="habit names")
+    create_parser.add_argument("--frequency", choices=["daily", "weekly"], default="daily")
+    create_parser.add_argument("--description", default="")
+
+    report = commands.add_parser("report", help="print a report (computed in SQL) of all users, or of --user")
+    report.add_argument("kind", choices=sorted(REPORTS))
+    report.add_argument("--date", help="reference ISO date for 'skipped' (default: today)")
+
+    for name, help_text in (("import", "import habits or check-ins from a CSV or JSONL file"),
+                            ("export", "export habits or check-ins to a CSV or JSONL file")):
+        transfer_parser = commands.add_parser(name, help=help_text)
+        transfer_parser.add_argument("file", help="file name (.csv or .jsonl), or - for standard input/output")
+        transfer_parser.add_argument("--kind", choices=["check-ins", "habits"], default="check-ins")
+        transfer_parser.add_argument("--format", choices=transfer.FORMATS,
+                                     help="file format (default: from the file extension, csv for -)")
+        transfer_parser.add_argument("--progress", action="store_true", help="print the number of rows to stderr")
+        if name == "import":
+            transfer_parser.add_argument("--create-missing", choices=["daily", "weekly"],
+                                         help="create unknown habits with this frequency instead of failing")
+            transfer_parser.add_argument("--no-dedup", dest="dedup", action="store_false",
+                                         help="fail on rows that exist already instead of skipping them")
+    return parser
+
+
+def run(argv=None, out=sys.stdout, err=sys.stderr):
+    """
+    Runs a batch subcommand.
+
+    :param argv: Command line arguments (default: sys.argv[1:]).
+    :param out: Stream for the JSON result.
+    :param err: Stream for errors (also JSON).
+    :return: Exit status: 0 on success, 1 on errors.
+    """
+    args = build_parser().parse_args(argv)
+    db = get_db(args.db)
+    if db is None:
+        return 1
+
+    try:
+        if args.command == "checkin":
+            result = check_in(db, args.names, _days(args), args.user)
+        elif args.command == "create":
+            result = create(db, args.names, args.description, args.frequency, args.user)
+        elif args.command == "report":
+            today = date.fromisoformat(args.date) if args.date else None
+            result = REPORTS[args.kind](db, today, args.user or None)
+        elif args.command == "import":
+            result = _import(db, args, err)
+        else:
+            result = _export(db, args, out, err)
+            if result is None:
+                return 0
+    except (KeyError, ValueError, OSError, sqlite3.Error) as error:
+        message = error.args[0] if isinstance(error, KeyError) else str(error)
+        print(json.dumps({"error": message}), file=err)
+        return 1
+    finally:
+        db.close()
+
+    print(json.dumps(result), file=out)
+    return 0
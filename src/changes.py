@@ -0,0 +1,41 @@
+class ChangeSet:
+    """
+    The pending database changes of habits, collected by HabitManager.collect_changes.
+    Rows refer to the Habit objects instead of their database ids, because a habit
+    that was just created gets its id only when the change set is written
+    (see db.apply_changes). All other values are copied when the changes are collected.
+    """
+
+    def __init__(self):
+        """
+        Initializes an empty change set.
+        """
+        self.deleted = []   # habits to delete
+        self.inserted = []  # (habit, name, description, frequency, created_at) of new habits
+        self.updated = []   # (habit, name, description, frequency, created_at) of changed habits
+        self.cleared = []   # habits whose check-ins are replaced completely
+        self.removed = []   # (habit, day ordinal) of removed check-ins
+        self.added = []     # (habit, day ordinal) of new check-ins
+
+    def row_count(self):
+        """
+        Counts the rows in this change set.
+
+        :return: Number of rows that will be written.
+        """
+        return (len(self.deleted) + len(self.inserted) + len(self.updated)
+                + len(self.cleared) + len(self.removed) + len(self.added))
+
+    def habits(self):
+        """
+        Lists the habits this change set refers to.
+
+        :return: List of Habit objects, each once.
+        """
+        habits = {id(habit): habit for habit in self.deleted + self.cleared}
+        for row in self.inserted + self.updated + self.removed + self.added:
+            habits[id(row[0])] = row[0]
+        return list(habits.values())
+
+    def __bool__(self):
+        return self.row_count() > 0
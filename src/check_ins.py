@@ -0,0 +1,178 @@
+from array import array
+from bisect import bisect_left
+from datetime import date
+
+
+class CheckInList:
+    """
+    A sorted collection of unique check-in dates.
+    Dates are stored compactly as day ordinals (date.toordinal()) in an array of C ints,
+    in ascending order, so membership checks and inserts use binary search and the
+    latest check-in is always the last element. date objects are only created when
+    the dates are read.
+    """
+
+    __slots__ = ("_days", "listener")
+
+    def __init__(self, dates=()):
+        """
+        Initializes the collection from any iterable of dates.
+        Duplicates are dropped and the dates are sorted.
+
+        :param dates: Iterable of date objects.
+        """
+        self._days = array("i", sorted({day.toordinal() for day in dates}))
+        # Called as listener(event, day, index) after 'add' or 'remove'.
+        self.listener = None
+
+    @classmethod
+    def from_ordinals(cls, ordinals):
+        """
+        Creates the collection from day ordinals without creating date objects.
+
+        :param ordinals: Iterable of ints (date.toordinal()).
+        :return: CheckInList object.
+        """
+        check_ins = cls()
+        check_ins._days = array("i", sorted(set(ordinals)))
+        return check_ins
+
+    @classmethod
+    def from_buffer(cls, ordinals):
+        """
+        Wraps sorted, unique day ordinals without copying them, e.g. a memoryview of a
+        snapshot file. The buffer is only read; it is copied into an array on the first change.
+
+        :param ordinals: Buffer or sequence of C ints (memoryview cast to 'i').
+        :return: CheckInList object.
+        """
+        check_ins = cls()
+        check_ins._days = ordinals
+        return check_ins
+
+    def _writable(self):
+        """
+        Returns the day array, copying a wrapped read-only buffer first.
+        """
+        days = self._days
+        if type(days) is not array:
+            days = self._days = array("i", days)
+        return days
+
+    def release_buffer(self):
+        """
+        Copies a wrapped buffer into an array of its own, so the buffer
+        (e.g. the memory map of a snapshot file) can be closed or replaced.
+        """
+        self._writable()
+
+    @property
+    def ordinals(self):
+        """
+        The check-ins as a sorted array (or read-only buffer) of day ordinals. Must not be modified.
+        """
+        return self._days
+
+    def add(self, day):
+        """
+        Inserts a date at its sorted position, if it is not recorded yet.
+        Appending a date newer than all others costs O(1).
+
+        :param day: The date to add.
+        :return: True if the date was added, False if it already existed.
+        """
+        days = self._writable()
+        ordinal = day.toordinal()
+        if not days or ordinal > days[-1]:
+            index = len(days)
+            days.append(ordinal)
+        else:
+            index = bisect_left(days, ordinal)
+            if index < len(days) and days[index] == ordinal:
+                return False
+            days.insert(index, ordinal)
+
+        if self.listener is not None:
+            self.listener("add", day, index)
+        return True
+
+    def remove(self, day):
+        """
+        Removes a date from the collection.
+
+        :param day: The date to remove.
+        :raises ValueError: If the date is not recorded.
+        """
+        if not self.discard(day):
+            raise ValueError(f"{day} is not a check-in date")
+
+    def discard(self, day):
+        """
+        Removes a date from the collection, if it is recorded.
+
+        :param day: The date to remove.
+        :return: True if the date was removed, else False.
+        """
+        index = self._index(day)
+        if index is None:
+            return False
+        del self._writable()[index]
+
+        if self.listener is not None:
+            self.listener("remove", day, index)
+        return True
+
+    @property
+    def latest(self):
+        """
+        The most recent check-in date, or None if there are no check-ins.
+        """
+        return date.fromordinal(self._days[-1]) if self._days else None
+
+    @property
+    def earliest(self):
+        """
+        The oldest check-in date, or None if there are no check-ins.
+        """
+        return date.fromordinal(self._days[0]) if self._days else None
+
+    def _index(self, day):
+        """
+        Finds the position of a date using binary search.
+
+        :param day: The date to look for.
+        :return: Index of the date or None if not found.
+        """
+        days = self._days
+        ordinal = day.toordinal()
+        index = bisect_left(days, ordinal)
+        if index < len(days) and days[index] == ordinal:
+            return index
+        return None
+
+    def __contains__(self, day):
+        return self._index(day) is not None
+
+    def __iter__(self):
+        return map(date.fromordinal, self._days)
+
+    def __reversed__(self):
+        return map(date.fromordinal, reversed(self._days))
+
+    def __len__(self):
+        return len(self._days)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [date.fromordinal(day) for day in self._days[index]]
+        return date.fromordinal(self._days[index])
+
+    def __eq__(self, other):
+        if isinstance(other, CheckInList):
+            return self._days == other._days
+        if isinstance(other, (list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return f"CheckInList({list(self)!r})"
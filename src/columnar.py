@@ -0,0 +1,255 @@
+from datetime import date
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, a pure Python fallback is used without it.
+    np = None
+
+FREQUENCY_CODES = {"daily": 0, "weekly": 1}
+OTHER_FREQUENCY = 2
+
+
+class CheckInColumns:
+    """
+    Columnar snapshot of the check-ins of many habits.
+    All check-ins are packed into one array of day ordinals (int32), sorted per habit,
+    with offsets[i]:offsets[i + 1] being the slice of habit i.
+    Analyses run as vectorized passes with NumPy, or as plain loops if NumPy is missing.
+    """
+
+    def __init__(self, habits, use_numpy=True):
+        """
+        Packs the check-ins of the given habits.
+
+        :param habits: List of Habit objects.
+        :param use_numpy: Use NumPy if it is installed (default True).
+        """
+        self.habits = list(habits)
+        self.use_numpy = use_numpy and np is not None
+        self.frequencies = [habit.frequency for habit in self.habits]
+
+        days = []
+        offsets = [0]
+        for habit in self.habits:
+            days.extend(habit.check_ins.ordinals)
+            offsets.append(len(days))
+        codes = [FREQUENCY_CODES.get(freq, OTHER_FREQUENCY) for freq in self.frequencies]
+        self._pack(codes, offsets, days)
+
+    @classmethod
+    def from_arrays(cls, codes, offsets, days, use_numpy=True):
+        """
+        Builds the columns from already packed data instead of Habit objects
+        (used by the worker processes of parallel_analyze). frequency_summary
+        needs the frequency names and is not available on these columns.
+
+        :param codes: Frequency code per habit (see FREQUENCY_CODES).
+        :param offsets: Start of every habit in days, plus the total length.
+        :param days: Day ordinals of all habits, sorted per habit.
+        :param use_numpy: Use NumPy if it is installed (default True).
+        :return: CheckInColumns object.
+        """
+        columns = cls([], use_numpy)
+        columns._pack(codes, offsets, days)
+        return columns
+
+    def _pack(self, codes, offsets, days):
+        """
+        Stores the packed columns, as NumPy arrays if NumPy is used.
+        """
+        self.size = len(codes)
+        if self.use_numpy:
+            self.days = np.asarray(days, dtype=np.int32)
+            self.offsets = np.asarray(offsets, dtype=np.int64)
+            self.codes = np.asarray(codes, dtype=np.int8)
+        else:
+            self.days = days
+            self.offsets = offsets
+            self.codes = codes
+
+    def checkin_counts(self):
+        """
+        Number of check-ins per habit.
+
+        :return: List of ints in habit order.
+        """
+        if self.use_numpy:
+            return np.diff(self.offsets).tolist()
+        return [self.offsets[i + 1] - self.offsets[i] for i in range(self.size)]
+
+    def current_streaks(self):
+        """
+        Current streak per habit, using the same rules as Habit.current_streak.
+
+        :return: List of ints in habit order.
+        """
+        if self.use_numpy:
+            return self._current_streaks_numpy()
+
+        streaks = []
+        for i, code in enumerate(self.codes):
+            start, end = self.offsets[i], self.offsets[i + 1]
+            if start == end:
+                streaks.append(0)
+                continue
+            position = end - 1
+            while position > start and _continues(code, self.days[position] - self.days[position - 1]):
+                position -= 1
+            streaks.append(end - position)
+        return streaks
+
+    def _current_streaks_numpy(self):
+        """
+        Vectorized current streaks: a diff over the packed days marks where a streak breaks,
+        and a running maximum over the break positions gives the start of the last run per habit.
+        """
+        days, offsets = self.days, self.offsets
+        counts = np.diff(offsets)
+        streaks = np.zeros(self.size, dtype=np.int64)
+        if len(days) == 0:
+            return streaks.tolist()
+
+        element_codes = np.repeat(self.codes, counts)
+        gaps = np.diff(days)
+        breaks = np.ones(len(days), dtype=bool)
+        breaks[1:] = np.where(
+            element_codes[1:] == 0, gaps != 1,
+            np.where(element_codes[1:] == 1, (gaps <= 0) | (gaps > 7), True))
+        breaks[offsets[:-1][counts > 0]] = True  # every habit starts a new run
+
+        positions = np.arange(len(days))
+        run_starts = np.maximum.accumulate(np.where(breaks, positions, 0))
+
+        filled = counts > 0
+        ends = offsets[1:][filled]
+        streaks[filled] = ends - run_starts[ends - 1]
+        return streaks.tolist()
+
+    def skipped(self, today=None):
+        """
+        Skipped flag per habit, using the same rules as Habit.habit_skipped.
+
+        :param today: Reference date (default: date.today()).
+        :return: List of bools in habit order.
+        """
+        today = (today or date.today()).toordinal()
+
+        if self.use_numpy:
+            counts = np.diff(self.offsets)
+            filled = counts > 0
+            flags = np.ones(self.size, dtype=bool)
+            days_since = today - self.days[self.offsets[1:][filled] - 1].astype(np.int64)
+            codes = self.codes[filled]
+            flags[filled] = np.where(codes == 0, days_since > 1,
+                                     np.where(codes == 1, days_since > 7, False))
+            return flags.tolist()
+
+        flags = []
+        for i, code in enumerate(self.codes):
+            start, end = self.offsets[i], self.offsets[i + 1]
+            if start == end:
+                flags.append(True)
+                continue
+            days_since = today - self.days[end - 1]
+            if code == 0:
+                flags.append(days_since > 1)
+            elif code == 1:
+                flags.append(days_since > 7)
+            else:
+                flags.append(False)
+        return flags
+
+    def frequency_summary(self):
+        """
+        Number of daily and weekly habits.
+
+        :return: Dictionary {'daily': int, 'weekly': int}
+        """
+        codes = [FREQUENCY_CODES.get(freq.lower(), OTHER_FREQUENCY) for freq in self.frequencies]
+        if self.use_numpy:
+            counts = np.bincount(np.array(codes, dtype=np.int64), minlength=3)
+            return {"daily": int(counts[0]), "weekly": int(counts[1])}
+        return {"daily": codes.count(0), "weekly": codes.count(1)}
+
+
+def _continues(code, gap):
+    """
+    Checks whether a gap in days keeps a streak going for the given frequency code.
+    """
+    if code == 0:
+        return gap == 1
+    if code == 1:
+        return 0 < gap <= 7
+    return False
+
+
+def get_longest_streak_overall(habits):
+    """
+    Columnar version of analyze.get_longest_streak_overall.
+
+    :param habits: list of Habit objects
+    :return: Tuple (Habit, streak length) or (None, 0) if empty
+    """
+    if not habits:
+        return None, 0
+    columns = CheckInColumns(habits)
+    streaks = columns.current_streaks()
+    top = max(range(len(streaks)), key=streaks.__getitem__)
+    return columns.habits[top], streaks[top]
+
+
+def checkin_counts(habits):
+    """
+    Columnar version of analyze.checkin_counts.
+
+    :param habits: List of Habit objects
+    :return: List of tuples: (habit name, number of check-ins)
+    """
+    columns = CheckInColumns(habits)
+    return [(habit.name, count) for habit, count in zip(columns.habits, columns.checkin_counts())]
+
+
+def skipped_habits(habits):
+    """
+    Columnar version of analyze.skipped_habits.
+
+    :param habits: List of Habit objects.
+    :return: List of skipped Habit objects.
+    """
+    columns = CheckInColumns(habits)
+    return [habit for habit, skipped in zip(columns.habits, columns.skipped()) if skipped]
+
+
+def habit_frequency_summary(habits):
+    """
+    Columnar version of analyze.habit_frequency_summary.
+
+    :param habits: List of Habit objects.
+    :return: Dictionary {'daily': int, 'weekly': int}
+    """
+    return CheckInColumns(habits).frequency_summary()
+
+
+def average_streak(habits):
+    """
+    Columnar version of analyze.average_streak.
+
+    :param habits: List of Habit objects.
+    :return: Average streak length (float).
+    """
+    if not habits:
+        return 0
+    return sum(CheckInColumns(habits).current_streaks()) / len(habits)
+
+
+def habits_by_streak(habits):
+    """
+    Columnar version of analyze.habits_by_streak.
+
+    :param habits: List of Habit objects.
+    :return: Sorted list of Habit objects.
+    """
+    columns = CheckInColumns(habits)
+    streaks = columns.current_streaks()
+    order = sorted(range(len(streaks)), key=streaks.__getitem__, reverse=True)
+    return [columns.habits[i] for i in order]
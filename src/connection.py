@@ -0,0 +1,176 @@
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from migrations import migrate
+
+# Pragma profiles for new connections, applied in the given order.
+PROFILES = {
+    # SQLite's defaults (rollback journal, fsync on every commit) plus a busy timeout.
+    "safe": {
+        "journal_mode": "DELETE",
+        "synchronous": "FULL",
+        "busy_timeout": 5000,
+    },
+    # Write-ahead log: readers do not block the writer and commits need no fsync
+    # (the database stays consistent after a crash, the last commits may be lost on power failure).
+    "wal": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -16384,        # 16 MiB page cache (negative values are KiB)
+        "mmap_size": 256 * 2**20,    # read pages through a 256 MiB memory map
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    },
+    # Bulk loading into a new file that can simply be rebuilt after a crash.
+    "bulk": {
+        "journal_mode": "OFF",
+        "synchronous": "OFF",
+        "cache_size": -65536,
+        "temp_store": "MEMORY",
+    },
+}
+
+
+def _default_profile():
+    """
+    Reads the profile from HABIT_TRACKER_DB_PROFILE; an unknown name falls back to 'wal'.
+    """
+    profile = os.environ.get("HABIT_TRACKER_DB_PROFILE", "wal")
+    if profile not in PROFILES:
+        print(f"[DB Error] Unknown database profile '{profile}' in HABIT_TRACKER_DB_PROFILE, using 'wal'.")
+        return "wal"
+    return profile
+
+
+DEFAULT_PROFILE = _default_profile()
+
+
+def connect(name="main.db", profile=DEFAULT_PROFILE, check_same_thread=True):
+    """
+    Opens a SQLite connection and applies a pragma profile.
+
+    :param name: Name of the database file.
+    :param profile: Name of a profile in PROFILES.
+    :param check_same_thread: False allows handing the connection to other threads
+                              (one at a time), as the ConnectionPool does.
+    :return: SQLite database connection.
+    :raises ValueError: If the profile does not exist.
+    """
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown database profile '{profile}'. Choose one of: {', '.join(PROFILES)}")
+
+    db = sqlite3.connect(name, check_same_thread=check_same_thread)
+    try:
+        for pragma, value in PROFILES[profile].items():
+            db.execute(f"PRAGMA {pragma} = {value}")
+    except sqlite3.Error:
+        db.close()
+        raise
+    return db
+
+
+class ConnectionPool:
+    """
+    A small pool of SQLite connections for worker threads and background jobs.
+    Connections are created when needed, up to `size`; a thread borrows one with
+    `with pool.connection() as db:` and has it to itself until the block ends.
+    """
+
+    def __init__(self, name="main.db", size=4, profile=DEFAULT_PROFILE, timeout=10.0):
+        """
+        Initializes the pool and brings the database schema up to date.
+
+        :param name: Name of the database file.
+        :param size: Maximum number of open connections.
+        :param profile: Pragma profile of the connections.
+        :param timeout: Seconds to wait for a free connection before TimeoutError is raised.
+        """
+        self.name = name
+        self.size = size
+        self.profile = profile
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._opened = 0
+        self._closed = False
+
+        with self.connection() as db:
+            migrate(db)
+
+    @contextmanager
+    def connection(self):
+        """
+        Borrows a connection for the duration of a with block.
+        A transaction that is still open at the end of the block is rolled back.
+
+        :return: Context manager that yields a SQLite connection.
+        :raises TimeoutError: If no connection became free within the timeout.
+        """
+        db = self._acquire()
+        try:
+            yield db
+        finally:
+            self._release(db)
+
+    def _acquire(self):
+        """
+        Takes an idle connection, opens a new one, or waits for one to be returned.
+        """
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("The connection pool is closed.")
+            can_open = self._opened < self.size
+            if can_open:
+                self._opened += 1
+        if can_open:
+            try:
+                return connect(self.name, self.profile, check_same_thread=False)
+            except Exception:
+                with self._lock:
+                    self._opened -= 1
+                raise
+
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise TimeoutError(f"No free database connection after {self.timeout} seconds.") from None
+
+    def _release(self, db):
+        """
+        Returns a connection to the pool (or closes it if the pool was closed).
+        """
+        if db.in_transaction:
+            db.rollback()
+        with self._lock:
+            closed = self._closed
+            if closed:
+                self._opened -= 1
+        if closed:
+            db.close()
+        else:
+            self._idle.put(db)
+
+    def close(self):
+        """
+        Closes the idle connections; borrowed ones are closed when they are returned.
+        """
+        with self._lock:
+            self._closed = True
+        while True:
+            try:
+                db = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            with self._lock:
+                self._opened -= 1
+            db.close()
+
+    def __len__(self):
+        return self._opened
@@ -0,0 +1,168 @@
+from datetime import date
+
+# int.bit_count exists since Python 3.10
+_popcount = getattr(int, "bit_count", lambda value: bin(value).count("1"))
+
+# A weekly streak continues if the next check-in is at most 7 days later.
+WEEKLY_GAP = 7
+
+
+class DayBitmap:
+    """
+    The check-ins of a habit as a bitmap with one bit per day.
+    Bit i is set if the habit was done on day `origin + i` (day ordinals).
+    Streaks, counts and skip checks are computed with bit operations on a Python int
+    instead of loops over dates.
+    """
+
+    __slots__ = ("origin", "bits")
+
+    def __init__(self, origin, bits=0):
+        """
+        Initializes the bitmap.
+
+        :param origin: Day ordinal of bit 0.
+        :param bits: Int with one bit per day.
+        """
+        self.origin = origin
+        self.bits = bits
+
+    @classmethod
+    def from_ordinals(cls, ordinals, origin=None):
+        """
+        Builds a bitmap from day ordinals.
+
+        :param ordinals: Iterable of day ordinals.
+        :param origin: Day ordinal of bit 0 (default: the earliest ordinal).
+        :return: DayBitmap object.
+        """
+        ordinals = list(ordinals)
+        if not ordinals:
+            return cls(origin or 0)
+        if origin is None or origin > min(ordinals):
+            origin = min(ordinals)
+
+        buffer = bytearray((max(ordinals) - origin) // 8 + 1)
+        for ordinal in ordinals:
+            offset = ordinal - origin
+            buffer[offset >> 3] |= 1 << (offset & 7)
+        return cls(origin, int.from_bytes(buffer, "little"))
+
+    @classmethod
+    def from_habit(cls, habit):
+        """
+        Builds the bitmap of a habit, starting at its creation date
+        (or at its first check-in, if that is earlier).
+
+        :param habit: Habit object.
+        :return: DayBitmap object.
+        """
+        return cls.from_ordinals(habit.check_ins.ordinals, habit.created_at.toordinal())
+
+    def current_streak(self, frequency):
+        """
+        Length of the streak that ends at the latest check-in (same rules as Habit).
+
+        :param frequency: 'daily' or 'weekly'.
+        :return: Streak length in days or weeks.
+        """
+        if not self.bits:
+            return 0
+        top = self.bits.bit_length()
+        if frequency == 'daily':
+            return top - _last_gap(self.bits, top)
+        if frequency == 'weekly':
+            covered = _cover_weekly_gaps(self.bits)
+            start = _last_gap(covered, top)
+            return _popcount(self.bits >> start)
+        return 1
+
+    def longest_streak(self, frequency):
+        """
+        Length of the longest streak in the history (same rules as Habit).
+
+        :param frequency: 'daily' or 'weekly'.
+        :return: Streak length in days or weeks.
+        """
+        if not self.bits:
+            return 0
+        if frequency == 'daily':
+            return max(length for start, length in _runs(self.bits))
+        if frequency == 'weekly':
+            covered = _cover_weekly_gaps(self.bits)
+            return max(_popcount((self.bits >> start) & ((1 << length) - 1))
+                       for start, length in _runs(covered))
+        return 1
+
+    def count(self, start, end):
+        """
+        Counts the check-ins between two dates (both included).
+
+        :param start: First date of the window.
+        :param end: Last date of the window.
+        :return: Number of check-ins.
+        """
+        first = max(start.toordinal() - self.origin, 0)
+        last = end.toordinal() - self.origin
+        if last < first:
+            return 0
+        return _popcount((self.bits >> first) & ((1 << (last - first + 1)) - 1))
+
+    def skipped(self, frequency, as_of=None):
+        """
+        Checks whether the habit was skipped as of a date (same rules as Habit.habit_skipped).
+        Check-ins after that date are ignored.
+
+        :param frequency: 'daily' or 'weekly'.
+        :param as_of: Reference date (default: date.today()).
+        :return: True if the expected check-in interval was missed, else False.
+        """
+        offset = (as_of or date.today()).toordinal() - self.origin
+        if offset < 0:
+            return True
+        bits = self.bits & ((1 << (offset + 1)) - 1)
+        if not bits:
+            return True
+
+        days_since = offset - (bits.bit_length() - 1)
+        if frequency == 'daily':
+            return days_since > 1
+        elif frequency == 'weekly':
+            return days_since > WEEKLY_GAP
+        return False
+
+    def __len__(self):
+        return _popcount(self.bits)
+
+
+def _last_gap(bits, top):
+    """
+    Finds where the run of set bits ending at bit `top - 1` starts.
+
+    :return: Index of the first bit of that run.
+    """
+    gaps = ~bits & ((1 << top) - 1)
+    return gaps.bit_length()
+
+
+def _cover_weekly_gaps(bits):
+    """
+    Sets the 6 days after every check-in, so check-ins that are at most
+    7 days apart end up in one run of set bits.
+    """
+    covered = bits
+    for shift in range(1, WEEKLY_GAP):
+        covered |= bits << shift
+    return covered
+
+
+def _runs(bits):
+    """
+    Yields (start, length) of every run of set bits, lowest first.
+    """
+    while bits:
+        start = (bits & -bits).bit_length() - 1
+        shifted = bits >> start
+        length = (~shifted & (shifted + 1)).bit_length() - 1
+        yield start, length
+        bits &= ~(((1 << length) - 1) << start)
@@ -1,104 +1,320 @@
 import sqlite3
 from datetime import date
 from habit import Habit
+from check_ins import CheckInList
+from migrations import migrate
+from connection import connect, DEFAULT_PROFILE
+import instrumentation
+from instrumentation import instrumented
 
-def get_db(name= "main.db"):
+@instrumented
+def get_db(name= "main.db", profile=DEFAULT_PROFILE):
     """
     Connects to the SQLite database.
 
     :param name: Name of the database file.
+    :param profile: Pragma profile of the connection (see connection.PROFILES).
     :return: SQLite database connection object or None.
     """
     try:
-        db = sqlite3.connect(name)
+        db = connect(name, profile)
         create_tables(db)
         return db
-    except sqlite3.Error as error:
+    except (sqlite3.Error, ValueError) as error:  # ValueError: unknown profile
         print(f"[DB Error] Could not connect to database: {error}")
         return None
 
 def create_tables(db):
     """
-    Creates tables in the SQLite database, if they don't exist yet.
+    Creates or upgrades the tables in the SQLite database (see migrations.py).
+    If the schema is up to date, this only reads PRAGMA user_version.
 
     :param db: SQLite database connection object.
     """
 
     try:
-        cur = db.cursor()
-
-        # Table for habit definitions
-        cur.execute("""CREATE TABLE IF NOT EXISTS habits (
-            name TEXT PRIMARY KEY,
-            description TEXT,
-            frequency TEXT,
-            created_at TEXT)""")
-
-        # Table for individual check-ins
-        cur.execute("""CREATE TABLE IF NOT EXISTS check_ins (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            habit_name TEXT,
-            date TEXT,
-            FOREIGN KEY(habit_name) REFERENCES habits(name))""")
-
-        db.commit()
+        migrate(db)
     except sqlite3.Error as error:
         print(f"[DB Error] Failed to create tables: {error}")
 
-def save_habit(db, habit):
+@instrumented
+def save_habit(db, habit, user=""):
     """
     Saves habit and its ckeck-ins in SQLite database.
-    If the habit was renamed, old records will be deleted first.
+    A habit without id is inserted (or merged into the user's stored habit with the same name),
+    otherwise its row is updated, so a rename is a single UPDATE.
     :param db: SQLite database connection.
     :param habit: A Habit object to  save.
+    :param user: User the habit belongs to (default: the single local user '').
     """
 
     try:
         cur = db.cursor()
-
-        # If name of habit was changed, delete the former name.
-        if hasattr(habit, 'original_name') and habit.original_name != habit.name:
-            cur.execute("DELETE FROM habits WHERE name = ?", (habit.original_name,))
-            cur.execute("DELETE FROM check_ins WHERE habit_name = ?", (habit.original_name,))
-
-        # Insert oder replace habit info.
-        cur.execute("""INSERT OR REPLACE INTO habits(name, description, frequency, created_at) 
-            VALUES (?, ?, ?, ?)""", (habit.name, habit.description, habit.frequency, habit.created_at.isoformat()))
+        values = (habit.name, habit.description, habit.frequency, habit.created_at.isoformat())
+        habit_id = habit.id
+        if habit_id is None:
+            habit_id = _insert_habit(cur, values, user)
+        else:
+            cur.execute("""UPDATE habits SET name = ?, description = ?, frequency = ?, created_at = ?
+                WHERE id = ?""", values + (habit_id,))
 
         # Delete old check-ins and insert new ones.
-        cur.execute("DELETE FROM check_ins WHERE habit_name = ?", (habit.name,))
-        for check in habit.check_ins:
-            cur.execute("INSERT INTO check_ins (habit_name, date) VALUES (?, ?)", (habit.name, check.isoformat()))
+        cur.execute("DELETE FROM check_ins WHERE habit_id = ?", (habit_id,))
+        cur.executemany("INSERT OR IGNORE INTO check_ins (habit_id, day) VALUES (?, ?)",
+                        [(habit_id, day) for day in habit.check_ins.ordinals])
 
         db.commit()
+        habit.id = habit_id
+        habit.mark_saved()
+        if instrumentation.ENABLED:
+            instrumentation.add_rows("db.save_habit", written=1 + len(habit.check_ins))
     except sqlite3.Error as error:
+        db.rollback()
         print(f"[DB Error] Failed to save habit '{habit.name}': {error}")
 
-def load_habits(db):
+def _insert_habit(cur, values, user):
     """
-    Loads all habits and their check-in data from the SQLite database.
+    Inserts a habit row, or updates the user's row with the same name if there is one.
+
+    :param cur: SQLite cursor.
+    :param values: Tuple (name, description, frequency, created_at).
+    :param user: User the habit belongs to.
+    :return: The id of the habit row.
+    """
+
+    cur.execute("""INSERT INTO habits(name, description, frequency, created_at, user_id)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT(user_id, name) DO UPDATE SET
+            description = excluded.description,
+            frequency = excluded.frequency,
+            created_at = excluded.created_at""", tuple(values) + (user,))
+    return cur.execute("SELECT id FROM habits WHERE user_id = ? AND name = ?", (user, values[0])).fetchone()[0]
+
+@instrumented
+def write_changes(db, *changesets, user=""):
+    """
+    Writes one or more change sets in a single transaction.
+    New habits get their id here; every other kind of change is written with
+    one executemany call. Renames are plain UPDATEs of the habit row and run before
+    the inserts; inserting a name that another habit of the user still has fails.
+
     :param db: SQLite database connection.
-    :return: List of Habit objects.
+    :param changesets: ChangeSet objects, applied in the given order.
+    :param user: User that new habits belong to.
+    :raises sqlite3.Error: If the changes could not be written (nothing is written then).
+    """
+
+    new_habits = []
+    try:
+        with db:
+            cur = db.cursor()
+            for changes in changesets:
+                deleted = [(habit.id,) for habit in changes.deleted]
+                cur.executemany("DELETE FROM check_ins WHERE habit_id = ?", deleted)
+                cur.executemany("DELETE FROM habits WHERE id = ?", deleted)
+
+                # Renames first, so a new habit may take the old name of a renamed one.
+                cur.executemany("""UPDATE habits SET name = ?, description = ?, frequency = ?, created_at = ?
+                    WHERE id = ?""", [tuple(values) + (habit.id,) for habit, *values in changes.updated])
+
+                # A plain INSERT: a name that is still taken is an error, not a merge into that row.
+                for habit, *values in changes.inserted:
+                    cur.execute("""INSERT INTO habits(name, description, frequency, created_at, user_id)
+                        VALUES (?, ?, ?, ?, ?)""", tuple(values) + (user,))
+                    habit.id = cur.lastrowid
+                    new_habits.append(habit)
+
+                cur.executemany("DELETE FROM check_ins WHERE habit_id = ?",
+                                [(habit.id,) for habit in changes.cleared])
+                cur.executemany("DELETE FROM check_ins WHERE habit_id = ? AND day = ?",
+                                [(habit.id, day) for habit, day in changes.removed])
+                cur.executemany("INSERT OR IGNORE INTO check_ins (habit_id, day) VALUES (?, ?)",
+                                [(habit.id, day) for habit, day in changes.added])
+    except sqlite3.Error:
+        for habit in new_habits:
+            habit.id = None
+        raise
+    if instrumentation.ENABLED:
+        instrumentation.add_rows("db.write_changes", written=sum(changes.row_count() for changes in changesets))
+
+def apply_changes(db, *changesets, user=""):
+    """
+    Writes one or more change sets in a single transaction (see write_changes)
+    and reports errors instead of raising them.
+
+    :param db: SQLite database connection.
+    :param changesets: ChangeSet objects, applied in the given order.
+    :param user: User that new habits belong to.
+    :return: True if all changes were written, else False (nothing is written then).
+    """
+
+    try:
+        write_changes(db, *changesets, user=user)
+        return True
+    except sqlite3.Error as error:
+        print(f"[DB Error] Failed to save changes: {error}")
+        return False
+
+def write_batch(db, changesets, user=""):
+    """
+    Writes a batch of change sets in one transaction (group commit). If the database
+    is busy or unavailable, the batch can be retried later. Any other error (e.g. a
+    violated constraint) would fail every retry as well, so the change sets are then
+    written one by one and the ones that still fail are dropped. Errors are reported.
+
+    :param db: SQLite database connection.
+    :param changesets: ChangeSet objects, in the order they were made.
+    :param user: User that new habits belong to.
+    :return: Tuple (change sets to retry later, change sets that were dropped).
+    """
+
+    try:
+        write_changes(db, *changesets, user=user)
+        return [], []
+    except sqlite3.OperationalError as error:
+        print(f"[DB Error] Failed to save changes: {error}")
+        return list(changesets), []
+    except sqlite3.Error as error:
+        if len(changesets) == 1:
+            print(f"[DB Error] Dropped changes that cannot be saved: {error}")
+            return [], list(changesets)
+
+    dropped = []
+    for index, changes in enumerate(changesets):
+        retry, failed = write_batch(db, [changes], user)
+        dropped += failed
+        if retry:
+            # Later changes may depend on this one, so they wait for it.
+            return list(changesets[index:]), dropped
+    return [], dropped
+
+def save_changes(db, manager, user=""):
+    """
+    Saves only the habits of a HabitManager that changed since the last save.
+
+    :param db: SQLite database connection.
+    :param manager: HabitManager with the habits.
+    :param user: User the habits belong to.
+    :return: True if the changes were written, else False.
     """
 
-    habits = []
+    changes = manager.collect_changes()
+    if not changes:
+        return True
+    return apply_changes(db, changes, user=user)
+
+@instrumented
+def iter_habits(db, chunk_size=1000, history_cache=None, user=None):
+    """
+    Streams all habits with their check-ins from the SQLite database.
+    Habits and check-ins are read with a single ordered query and grouped while streaming,
+    so only one habit's history and one chunk of rows are held in memory at a time.
+    With a history cache only the habit metadata is read; check-ins are loaded lazily.
+
+    :param db: SQLite database connection.
+    :param chunk_size: Number of rows fetched from SQLite per round trip.
+    :param history_cache: Optional HistoryCache for lazy loading of check-ins.
+    :param user: Only load the habits of this user (default: the habits of all users).
+    :return: Generator of Habit objects, in the order they were first saved (by id).
+    """
+
+    if history_cache is not None:
+        yield from _iter_habits_lazy(db, chunk_size, history_cache, user)
+        return
+
+    where, params = user_filter(user)
     try:
         cur = db.cursor()
-        cur.execute("SELECT * FROM habits")
-        rows = cur.fetchall()
+        cur.execute(f"""SELECT h.id, h.name, h.description, h.frequency, h.created_at, c.day
+            FROM habits h LEFT JOIN check_ins c ON c.habit_id = h.id {where}
+            ORDER BY h.id, c.day""", params)
 
-        for row in rows:
-            name, description, frequency, created_at = row
-            habit = Habit(name, description, frequency)
-            habit.created_at = date.fromisoformat(created_at)
+        habit = None
+        checkins = []
+        while True:
+            rows = cur.fetchmany(chunk_size)
+            if not rows:
+                break
+            if instrumentation.ENABLED:
+                instrumentation.add_rows("db.iter_habits", read=len(rows))
 
-            cur.execute("SELECT date FROM check_ins WHERE habit_name = ?", (name,))
-            checkins = cur.fetchall()
-            habit.check_ins = [date.fromisoformat(d[0]) for d in checkins]
+            for habit_id, name, description, frequency, created_at, check_in in rows:
+                if habit is None or habit.id != habit_id:
+                    if habit is not None:
+                        habit.check_ins = CheckInList.from_ordinals(checkins)
+                        habit.mark_saved()
+                        yield habit
+                    habit = Habit(name, description, frequency)
+                    habit.id = habit_id
+                    habit.created_at = date.fromisoformat(created_at)
+                    checkins = []
 
-            habits.append(habit)
+                if check_in is not None:
+                    checkins.append(check_in)
+
+        if habit is not None:
+            habit.check_ins = CheckInList.from_ordinals(checkins)
+            habit.mark_saved()
+            yield habit
 
     except sqlite3.Error as error:
         print(f"[DB Error] Failed to load habits: {error}")
 
-    return habits
\ No newline at end of file
+def _iter_habits_lazy(db, chunk_size, history_cache, user):
+    """
+    Streams all habits without their check-ins; the history cache loads them on first access.
+
+    :param db: SQLite database connection.
+    :param chunk_size: Number of rows fetched from SQLite per round trip.
+    :param history_cache: HistoryCache that loads the check-ins.
+    :param user: Only load the habits of this user, or None for all users.
+    :return: Generator of Habit objects, in the order they were first saved (by id).
+    """
+
+    where, params = user_filter(user)
+    try:
+        cur = db.cursor()
+        cur.execute(f"""SELECT h.id, h.name, h.description, h.frequency, h.created_at
+            FROM habits h {where} ORDER BY h.id""", params)
+        while True:
+            rows = cur.fetchmany(chunk_size)
+            if not rows:
+                break
+            if instrumentation.ENABLED:
+                instrumentation.add_rows("db.iter_habits", read=len(rows))
+
+            for habit_id, name, description, frequency, created_at in rows:
+                habit = Habit(name, description, frequency)
+                habit.id = habit_id
+                habit.created_at = date.fromisoformat(created_at)
+                habit.mark_saved()
+                habit.use_history_cache(history_cache)
+                yield habit
+
+    except sqlite3.Error as error:
+        print(f"[DB Error] Failed to load habits: {error}")
+
+def user_filter(user, keyword="WHERE"):
+    """
+    Builds the WHERE clause that restricts a habit query (alias h) to one user.
+
+    :param user: User name, or None for all users.
+    :param keyword: 'WHERE', or 'AND' to extend a WHERE clause of the query.
+    :return: Tuple (SQL clause, parameters).
+    """
+
+    if user is None:
+        return "", ()
+    return f"{keyword} h.user_id = ?", (user,)
+
+@instrumented
+def load_habits(db, history_cache=None, user=None):
+    """
+    Loads all habits and their check-in data from the SQLite database.
+    :param db: SQLite database connection.
+    :param history_cache: Optional HistoryCache; if given, check-ins are loaded lazily.
+    :param user: Only load the habits of this user (default: the habits of all users).
+    :return: List of Habit objects.
+    """
+
+    return list(iter_habits(db, history_cache=history_cache, user=user))
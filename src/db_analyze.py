@@ -0,0 +1,256 @@
+import sqlite3
+from datetime import date
+from db import user_filter
+
+# Marks where a new streak starts for each check-in, using the same rules as Habit:
+# daily habits continue on the next day, weekly habits within 7 days, others never.
+# {where} restricts it to the habits of one user (see _islands).
+_ISLANDS = """
+    WITH gaps AS (
+        SELECT c.habit_id, c.day, h.frequency,
+               c.day - LAG(c.day) OVER (PARTITION BY c.habit_id ORDER BY c.day) AS gap
+        FROM check_ins c JOIN habits h ON h.id = c.habit_id
+        {where}
+    ),
+    islands AS (
+        SELECT habit_id, day,
+               SUM(CASE
+                       WHEN gap IS NULL THEN 1
+                       WHEN frequency = 'daily' AND gap = 1 THEN 0
+                       WHEN frequency = 'weekly' AND gap BETWEEN 1 AND 7 THEN 0
+                       ELSE 1
+                   END) OVER (PARTITION BY habit_id ORDER BY day) AS island
+        FROM gaps
+    ),
+    island_sizes AS (
+        SELECT habit_id, island, COUNT(*) AS length,
+               MAX(island) OVER (PARTITION BY habit_id) AS last_island
+        FROM islands
+        GROUP BY habit_id, island
+    )
+"""
+
+
+def _islands(user):
+    """
+    Returns the _ISLANDS query for the habits of one user, and its parameters.
+
+    :param user: User name, or None for all users.
+    :return: Tuple (SQL, parameters).
+    """
+    where, params = user_filter(user)
+    return _ISLANDS.format(where=where), params
+
+
+def _query(db, sql, params=()):
+    """
+    Runs a query and returns all rows, or an empty list on errors.
+    """
+    try:
+        return db.execute(sql, params).fetchall()
+    except sqlite3.Error as error:
+        print(f"[DB Error] Analysis query failed: {error}")
+        return []
+
+
+def list_all_habits(db, user=None):
+    """
+    Returns the names of all habits stored in the database.
+
+    :param db: SQLite database connection.
+    :param user: Only list the habits of this user (default: all users).
+    :return: List of habit names (strings).
+    """
+    where, params = user_filter(user)
+    return [row[0] for row in _query(db, f"SELECT h.name FROM habits h {where} ORDER BY h.id", params)]
+
+
+def list_habits_by_frequency(db, frequency, user=None):
+    """
+    Returns the names of the stored habits with the given frequency.
+
+    :param db: SQLite database connection.
+    :param frequency: Frequency – 'daily' or 'weekly'
+    :param user: Only list the habits of this user (default: all users).
+    :return: List of habit names.
+    """
+    where, params = user_filter(user, "AND")
+    rows = _query(db, f"SELECT h.name FROM habits h WHERE h.frequency = ? {where} ORDER BY h.id",
+                  (frequency,) + params)
+    return [row[0] for row in rows]
+
+
+def checkin_counts(db, user=None):
+    """
+    Counts how many check-ins have been recorded for each habit.
+
+    :param db: SQLite database connection.
+    :param user: Only count the habits of this user (default: all users).
+    :return: List of tuples: (habit name, number of check-ins)
+    """
+    where, params = user_filter(user)
+    return _query(db, f"""SELECT h.name, COUNT(c.day)
+        FROM habits h LEFT JOIN check_ins c ON c.habit_id = h.id
+        {where}
+        GROUP BY h.id ORDER BY h.id""", params)
+
+
+def habit_frequency_summary(db, user=None):
+    """
+    Gives an overview of how many habits are daily or weekly.
+
+    :param db: SQLite database connection.
+    :param user: Only count the habits of this user (default: all users).
+    :return: Dictionary {'daily': int, 'weekly': int}
+    """
+    summary = {"daily": 0, "weekly": 0}
+    where, params = user_filter(user)
+    rows = _query(db, f"SELECT LOWER(h.frequency), COUNT(*) FROM habits h {where} GROUP BY LOWER(h.frequency)",
+                  params)
+    for frequency, count in rows:
+        if frequency in summary:
+            summary[frequency] = count
+    return summary
+
+
+def skipped_habits(db, today=None, user=None):
+    """
+    Lists all habits that were skipped based on their frequency.
+
+    :param db: SQLite database connection.
+    :param today: Reference date (default: date.today()).
+    :param user: Only check the habits of this user (default: all users).
+    :return: List of habit names.
+    """
+    today = (today or date.today()).toordinal()
+    where, params = user_filter(user, "AND")
+    rows = _query(db, f"""SELECT h.name
+        FROM habits h LEFT JOIN (
+            SELECT habit_id, MAX(day) AS last_day FROM check_ins GROUP BY habit_id
+        ) l ON l.habit_id = h.id
+        WHERE (l.last_day IS NULL
+               OR (h.frequency = 'daily' AND ? - l.last_day > 1)
+               OR (h.frequency = 'weekly' AND ? - l.last_day > 7))
+           {where}
+        ORDER BY h.id""", (today, today) + params)
+    return [row[0] for row in rows]
+
+
+def current_streaks(db, user=None):
+    """
+    Computes the current streak of every habit with a gaps-and-islands query.
+
+    :param db: SQLite database connection.
+    :param user: Only compute the streaks of this user's habits (default: all users).
+    :return: List of tuples: (habit name, current streak), in habit order.
+    """
+    islands, params = _islands(user)
+    where, _ = user_filter(user)
+    return _query(db, islands + f"""
+        SELECT h.name, COALESCE(s.length, 0)
+        FROM habits h LEFT JOIN island_sizes s ON s.habit_id = h.id AND s.island = s.last_island
+        {where}
+        ORDER BY h.id""", params * 2)
+
+
+def longest_streaks(db, user=None):
+    """
+    Computes the longest streak every habit ever reached.
+
+    :param db: SQLite database connection.
+    :param user: Only compute the streaks of this user's habits (default: all users).
+    :return: List of tuples: (habit name, longest streak), in habit order.
+    """
+    islands, params = _islands(user)
+    where, _ = user_filter(user)
+    return _query(db, islands + f"""
+        SELECT h.name, COALESCE(MAX(s.length), 0)
+        FROM habits h LEFT JOIN island_sizes s ON s.habit_id = h.id
+        {where}
+        GROUP BY h.id ORDER BY h.id""", params * 2)
+
+
+def get_longest_streak_overall(db, user=None):
+    """
+    Finds the habit with the longest current streak.
+
+    :param db: SQLite database connection.
+    :param user: Only look at the habits of this user (default: all users).
+    :return: Tuple (habit name, streak length) or (None, 0) if there are no habits.
+    """
+    ranked = habits_by_streak(db, user)
+    return ranked[0] if ranked else (None, 0)
+
+
+def get_longest_streak_of(db, name, user=None):
+    """
+    Gets the current streak for a habit by its name.
+
+    :param db: SQLite database connection.
+    :param name: Name of the habit.
+    :param user: User the habit belongs to (default: any user).
+    :return: Streak value (int), or 0 if not found.
+    """
+    islands, params = _islands(user)
+    where, _ = user_filter(user, "AND")
+    rows = _query(db, islands + f"""
+        SELECT s.length
+        FROM habits h JOIN island_sizes s ON s.habit_id = h.id AND s.island = s.last_island
+        WHERE h.name = ? {where}""", params + (name,) + params)
+    return rows[0][0] if rows else 0
+
+
+def average_streak(db, user=None):
+    """
+    Calculates the average current streak across all habits.
+
+    :param db: SQLite database connection.
+    :param user: Only look at the habits of this user (default: all users).
+    :return: Average streak length (float), 0 if there are no habits.
+    """
+    streaks = [streak for name, streak in current_streaks(db, user)]
+    if not streaks:
+        return 0
+    return sum(streaks) / len(streaks)
+
+
+def habits_by_streak(db, user=None):
+    """
+    Sorts habits by their current streak in descending order (ties keep the habit order).
+
+    :param db: SQLite database connection.
+    :param user: Only rank the habits of this user (default: all users).
+    :return: List of tuples: (habit name, current streak)
+    """
+    islands, params = _islands(user)
+    where, _ = user_filter(user)
+    return _query(db, islands + f"""
+        SELECT h.name, COALESCE(s.length, 0) AS streak
+        FROM habits h LEFT JOIN island_sizes s ON s.habit_id = h.id AND s.island = s.last_island
+        {where}
+        ORDER BY streak DESC, h.id""", params * 2)
+
+
+def habit_summaries(db, today=None):
+    """
+    Computes the main numbers of every habit in one query, for reports that
+    combine several databases (see sharding.py).
+
+    :param db: SQLite database connection.
+    :param today: Reference date for the skipped flag (default: date.today()).
+    :return: List of tuples (user, habit name, frequency, number of check-ins,
+             current streak, skipped), in habit order.
+    """
+    today = (today or date.today()).toordinal()
+    rows = _query(db, _ISLANDS.format(where="") + """
+        SELECT h.user_id, h.name, h.frequency, COALESCE(n.count, 0), COALESCE(s.length, 0),
+               n.last_day IS NULL
+               OR (h.frequency = 'daily' AND ? - n.last_day > 1)
+               OR (h.frequency = 'weekly' AND ? - n.last_day > 7)
+        FROM habits h
+        LEFT JOIN (
+            SELECT habit_id, COUNT(*) AS count, MAX(day) AS last_day FROM check_ins GROUP BY habit_id
+        ) n ON n.habit_id = h.id
+        LEFT JOIN island_sizes s ON s.habit_id = h.id AND s.island = s.last_island
+        ORDER BY h.id""", (today, today))
+    return [row[:5] + (bool(row[5]),) for row in rows]
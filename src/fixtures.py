@@ -1,5 +1,12 @@
+import math
+import random
+import sqlite3
 from datetime import date
 from habit import Habit
+from check_ins import CheckInList
+from db import get_db
+
+SYNTHETIC_START = date(2020, 1, 1)
 
 def generate_test_habits():
     """
@@ -10,7 +17,7 @@ def generate_test_habits():
     habits = []
 
     def iso_list(dates):
-        return [date.fromisoformat(d) for d in dates]
+        return CheckInList(date.fromisoformat(d) for d in dates)
 
     # Habit 1: Read a book – weekly habit
     h1 = Habit("Read a book", "Read at least 20 pages of a book you're currently reading.", "weekly")
@@ -113,3 +120,106 @@ def generate_test_habits():
     habits.append(h5)
 
     return habits
+
+
+def synthetic_check_ins(rng, frequency, first_day, periods, adherence=0.8, mean_gap=3.0):
+    """
+    Generates the check-in days of one synthetic habit.
+    The habit alternates between runs of done periods and runs of missed periods (gaps).
+    Both run lengths are drawn from geometric distributions: gaps are `mean_gap` periods
+    long on average, and the done runs are sized so that about `adherence` of all
+    periods are done. Daily habits check in on every done day, weekly habits on the
+    same weekday of every done week.
+
+    :param rng: random.Random instance.
+    :param frequency: 'daily' or 'weekly'.
+    :param first_day: Day ordinal of the first period.
+    :param periods: Number of days or weeks to generate.
+    :param adherence: Share of periods with a check-in (0 to 1).
+    :param mean_gap: Average length of a gap in periods (at least 1).
+    :return: Generator of day ordinals in ascending order.
+    """
+    if adherence <= 0:
+        return
+    step = 7 if frequency == 'weekly' else 1
+    if adherence >= 1:
+        yield from range(first_day, first_day + periods * step, step)
+        return
+    mean_gap = max(mean_gap, 1.0)
+    mean_run = max(adherence * mean_gap / (1 - adherence), 1.0)
+
+    period = 0
+    while period < periods:
+        run = min(_geometric(rng, mean_run), periods - period)
+        for offset in range(period, period + run):
+            yield first_day + offset * step
+        period += run + _geometric(rng, mean_gap)
+
+
+def _geometric(rng, mean):
+    """
+    Draws a run length >= 1 from a geometric distribution with the given mean.
+    """
+    if mean <= 1:
+        return 1
+    return int(math.log(1.0 - rng.random()) / math.log(1.0 - 1.0 / mean)) + 1
+
+
+def build_synthetic_db(name, habits=100, years=1, seed=0, daily_share=0.7,
+                       adherence=0.8, mean_gap=3.0, start=SYNTHETIC_START, batch_size=100_000):
+    """
+    Creates a database with synthetic habits and check-ins for benchmarks and load tests.
+    The same arguments always produce the same data. Check-ins are streamed into SQLite
+    in primary key order with executemany in batches, inside a single transaction and
+    with the "bulk" connection profile (no journal, no fsync), so millions of rows
+    are never held in memory as a whole.
+
+    :param name: Name of the database file (should not exist yet).
+    :param habits: Number of habits.
+    :param years: Number of years of check-ins, starting at `start`.
+    :param seed: Random seed.
+    :param daily_share: Share of daily habits (0 to 1), the rest are weekly.
+    :param adherence: Share of days or weeks with a check-in (0 to 1).
+    :param mean_gap: Average length of a gap in days or weeks.
+    :param start: Date of the first possible check-in; also the creation date of the habits.
+    :param batch_size: Number of check-ins per executemany call.
+    :return: Number of check-ins written, or None if the database could not be built.
+    """
+    try:
+        end = start.replace(year=start.year + years)
+    except ValueError:  # February 29 and the end year is no leap year
+        end = start.replace(year=start.year + years, day=28)
+    db = get_db(name, profile="bulk")
+    if db is None:
+        return None
+
+    rng = random.Random(seed)
+    first_day = start.toordinal()
+    days = end.toordinal() - first_day
+    total = 0
+    try:
+        with db:
+            cur = db.cursor()
+            batch = []
+            for index in range(1, habits + 1):
+                frequency = 'daily' if rng.random() < daily_share else 'weekly'
+                periods = days if frequency == 'daily' else (days + 6) // 7
+                cur.execute("""INSERT INTO habits (id, name, description, frequency, created_at)
+                    VALUES (?, ?, ?, ?, ?)""",
+                            (index, f"Habit {index}", f"Synthetic {frequency} habit", frequency, start.isoformat()))
+
+                for day in synthetic_check_ins(rng, frequency, first_day, periods, adherence, mean_gap):
+                    batch.append((index, day))
+                    if len(batch) >= batch_size:
+                        cur.executemany("INSERT INTO check_ins (habit_id, day) VALUES (?, ?)", batch)
+                        total += len(batch)
+                        batch.clear()
+
+            cur.executemany("INSERT INTO check_ins (habit_id, day) VALUES (?, ?)", batch)
+            total += len(batch)
+        return total
+    except sqlite3.Error as error:
+        print(f"[DB Error] Failed to build synthetic database: {error}")
+        return None
+    finally:
+        db.close()
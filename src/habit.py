@@ -1,10 +1,38 @@
 from datetime import date
+from check_ins import CheckInList
+from day_bitmap import DayBitmap
+from instrumentation import instrumented
+
+# Shared empty set for habits without pending check-in changes (saves two sets per habit).
+_NO_DATES = frozenset()
+
+
+def check_name(name):
+    """
+    Rejects habit names that are not non-empty strings (e.g. from JSON input or the command line).
+
+    :param name: The name to check.
+    :raises ValueError: If the name is invalid.
+    """
+    if not isinstance(name, str) or not name.strip():
+        raise ValueError("The name must be a non-empty string.")
+
 
 class Habit:
     """
     A habit that the user wants to build or track over time.
+    The current and the longest streak are kept up to date while check-ins change,
+    so reading them does not depend on the length of the history.
+    Changes since the last save are tracked, so only those have to be written to the database.
+    With a history cache (see HistoryCache) the check-ins are loaded on first access
+    and may be unloaded again, while the streaks stay known.
     """
 
+    __slots__ = ("id", "_observer", "_stored", "_meta_dirty", "_history_cache",
+                 "_name", "_description", "_frequency", "_created_at",
+                 "_check_ins", "_history_replaced", "_added", "_removed",
+                 "_current_streak", "_longest_streak", "_bitmap")
+
     def __init__(self, name: str, description: str, frequency: str):
         """
         Initializes a new habit with the provided name, description and frequency.
@@ -13,44 +41,383 @@ class Habit:
         :param description: Short description of the habit.
         :param frequency: Frequency ('daily' or 'weekly') of the habit.
         """
-        self.name = name
-        self.description = description
-        self.frequency = frequency  # 'daily' or 'weekly'
-        self.created_at = date.today()
+        # Database id, None until the habit was inserted.
+        self.id = None
+        # Called as observer(habit, field, old_value) after every change.
+        self._observer = None
+        # True once the habit was saved (or its insert was collected into a change set).
+        self._stored = False
+        self._meta_dirty = False
+        # Loads the check-ins on demand, None if they are always kept in memory.
+        self._history_cache = None
+
+        self._name = name
+        self._description = description
+        self._frequency = frequency  # 'daily' or 'weekly'
+        self._created_at = date.today()
+        # DayBitmap of the check-ins, built on first use (see day_bitmap()).
+        self._bitmap = None
         self.check_ins = []
 
+    @property
+    def name(self):
+        """
+        Name of the habit.
+        """
+        return self._name
+
+    @name.setter
+    def name(self, name):
+        if self._observer is not None and name != self._name:
+            # Lets the observer reject the new name (e.g. if another habit has it) before it is set.
+            self._observer(self, "rename", name)
+        self._set_metadata("name", name)
+
+    @property
+    def description(self):
+        """
+        Short description of the habit.
+        """
+        return self._description
+
+    @description.setter
+    def description(self, description):
+        self._set_metadata("description", description)
+
+    @property
+    def created_at(self):
+        """
+        Date on which the habit was created.
+        """
+        return self._created_at
+
+    @created_at.setter
+    def created_at(self, created_at):
+        self._set_metadata("created_at", created_at)
+
+    @property
+    def frequency(self):
+        """
+        Frequency ('daily' or 'weekly') of the habit.
+        """
+        return self._frequency
+
+    @frequency.setter
+    def frequency(self, frequency):
+        """
+        Changes the frequency and recomputes the streaks under the new rule.
+
+        :param frequency: New frequency ('daily' or 'weekly').
+        """
+        old = self._frequency
+        if old == frequency:
+            return
+        self._frequency = frequency
+        self._recompute_streaks()
+        self._meta_dirty = True
+        self._notify("frequency", old)
+
+    @property
+    def check_ins(self):
+        """
+        Sorted, duplicate-free collection of check-in dates.
+        """
+        if self._history_cache is not None:
+            if self._check_ins is None:
+                self._history_cache.load(self)
+            else:
+                self._history_cache.touch(self)
+        return self._check_ins
+
+    @check_ins.setter
+    def check_ins(self, dates):
+        """
+        Replaces the check-ins. A CheckInList is used as is,
+        any other iterable of dates (e.g. a list) is converted.
+
+        :param dates: CheckInList or iterable of date objects.
+        """
+        if not isinstance(dates, CheckInList) or dates.listener is not None:
+            dates = CheckInList(dates)
+        dates.listener = self._check_ins_changed
+        self._check_ins = dates
+        self._bitmap = None
+        self._recompute_streaks()
+
+        # The whole history has to be rewritten on the next save.
+        self._history_replaced = True
+        self._added = _NO_DATES
+        self._removed = _NO_DATES
+        self._notify("check_ins", None)
+
+    def use_history_cache(self, cache):
+        """
+        Drops the check-ins from memory; from now on they are loaded through the cache
+        when they are accessed. The habit must be saved before.
+
+        :param cache: A HistoryCache object.
+        """
+        self._unload_history()
+        self._current_streak = None
+        self._longest_streak = None
+        self._history_cache = cache
+
+    def _history_loaded(self, dates, streaks=None):
+        """
+        Called by the history cache after the check-ins were loaded from the database,
+        and by snapshot.load_snapshot.
+
+        :param dates: CheckInList with the stored check-ins.
+        :param streaks: Optional known (current, longest) streaks of these check-ins;
+                        the history is not walked then.
+        """
+        dates.listener = self._check_ins_changed
+        self._check_ins = dates
+        self._bitmap = None
+        if streaks is not None:
+            self._current_streak, self._longest_streak = streaks
+        elif self._current_streak is None:
+            self._recompute_streaks()
+
+    def _unload_history(self):
+        """
+        Drops the check-ins from memory. The streaks are kept.
+        """
+        if self._check_ins is not None:
+            self._check_ins.listener = None
+        self._check_ins = None
+        self._bitmap = None
+
+    @property
+    def has_unsaved_history(self):
+        """
+        True if there are check-in changes that are not saved yet.
+        """
+        return (not self._stored or self._history_replaced
+                or bool(self._added) or bool(self._removed))
+
+    def day_bitmap(self):
+        """
+        Returns the check-ins as a DayBitmap. It is built on first use and then kept
+        up to date while check-ins are added or removed, so reports that use it
+        do not rebuild it on every call. The bitmap must not be modified.
+
+        :return: DayBitmap object.
+        """
+        dates = self.check_ins  # loads the history, which may reset the bitmap
+        if self._bitmap is None:
+            self._bitmap = DayBitmap.from_ordinals(dates.ordinals, self._created_at.toordinal())
+        return self._bitmap
+
     def check_off(self):
         """
         Marks today's date as as completed for the habit.
         """
-        today = date.today()
-        if today not in self.check_ins:
-            self.check_ins.append(today)
+        self.check_ins.add(date.today())
 
+    @instrumented
     def current_streak(self):
         """
-        Calculates how many times in a row this habit was done.
+        Returns how many times in a row this habit was done,
+        counted back from the latest check-in.
 
         :return: Length of current streak in days or weeks.
         """
-        if not self.check_ins:
-            return 0
-
-        streak = 1
-        sorted_check_ins = sorted(self.check_ins, reverse=True)
-        current = sorted_check_ins[0]
-
-        for check_in in sorted_check_ins[1:]:
-            delta_days = (current - check_in).days
-            if self.frequency == 'daily' and delta_days == 1:
-                streak += 1
-            elif self.frequency == 'weekly' and 0 < delta_days <= 7:
-                streak += 1
+        if self._current_streak is None:
+            self.check_ins  # loads the history and computes the streaks
+        return self._current_streak
+
+    @instrumented
+    def longest_streak(self):
+        """
+        Returns the longest streak this habit ever reached.
+
+        :return: Length of the longest streak in days or weeks.
+        """
+        if self._longest_streak is None:
+            self.check_ins  # loads the history and computes the streaks
+        return self._longest_streak
+
+    def _continues(self, older, newer):
+        """
+        Checks whether two consecutive check-ins belong to the same streak.
+
+        :param older: The earlier check-in as day ordinal.
+        :param newer: The later check-in as day ordinal.
+        :return: True if the streak is not broken between both dates.
+        """
+        delta_days = newer - older
+        if self._frequency == 'daily':
+            return delta_days == 1
+        elif self._frequency == 'weekly':
+            return 0 < delta_days <= 7
+        return False
+
+    @instrumented
+    def _recompute_streaks(self):
+        """
+        Recomputes the current and the longest streak from the whole history.
+        """
+        current = longest = 0
+        previous = None
+        for check_in in self.check_ins.ordinals:
+            if previous is not None and self._continues(previous, check_in):
+                current += 1
             else: # streak is broken
-                break
-            current = check_in
-        return streak
+                current = 1
+            longest = max(longest, current)
+            previous = check_in
+        self._current_streak = current
+        self._longest_streak = longest
+
+    def _check_ins_changed(self, event, day, index):
+        """
+        Updates the streaks and the pending changes after a single check-in was added or removed.
+        Appending the newest date is O(1), a backfilled date only walks its own streak
+        and a removal recomputes the history.
+
+        :param event: 'add' or 'remove'.
+        :param day: The date that was added or removed.
+        :param index: Position of the date in the check-in list.
+        """
+        if self._bitmap is not None:
+            self._update_bitmap(event, day)
+        if event == "add":
+            self._update_streaks_after_add(day, index)
+            if day in self._removed:
+                self._removed.discard(day)
+            else:
+                if not self._added:
+                    self._added = set()
+                self._added.add(day)
+        else:
+            self._recompute_streaks()
+            if day in self._added:
+                self._added.discard(day)
+            else:
+                if not self._removed:
+                    self._removed = set()
+                self._removed.add(day)
+        self._notify("check_ins", None)
+
+    def _update_bitmap(self, event, day):
+        """
+        Sets or clears the bit of a check-in that was added or removed.
+        A date before the start of the bitmap drops it; it is rebuilt on next use.
+
+        :param event: 'add' or 'remove'.
+        :param day: The date that was added or removed.
+        """
+        offset = day.toordinal() - self._bitmap.origin
+        if offset < 0:
+            self._bitmap = None
+        elif event == "add":
+            self._bitmap.bits |= 1 << offset
+        else:
+            self._bitmap.bits &= ~(1 << offset)
+
+    def _update_streaks_after_add(self, day, index):
+        """
+        Updates the streaks after a date was inserted at the given index.
+
+        :param day: The date that was added.
+        :param index: Position of the date in the check-in list.
+        """
+        dates = self._check_ins.ordinals
+        if index == len(dates) - 1:
+            if index > 0 and self._continues(dates[index - 1], dates[index]):
+                self._current_streak += 1
+            else:
+                self._current_streak = 1
+            self._longest_streak = max(self._longest_streak, self._current_streak)
+            return
 
+        # A backfilled date can only join streaks, so walk the streak around it.
+        start = index
+        while start > 0 and self._continues(dates[start - 1], dates[start]):
+            start -= 1
+        end = index
+        while end < len(dates) - 1 and self._continues(dates[end], dates[end + 1]):
+            end += 1
+
+        length = end - start + 1
+        if end == len(dates) - 1:
+            self._current_streak = length
+        self._longest_streak = max(self._longest_streak, length)
+
+    def _set_metadata(self, field, value):
+        """
+        Sets a metadata attribute and records the change.
+
+        :param field: Name of the attribute ('name', 'description' or 'created_at').
+        :param value: The new value.
+        """
+        old = getattr(self, "_" + field)
+        if old == value:
+            return
+        setattr(self, "_" + field, value)
+        self._meta_dirty = True
+        self._notify(field, old)
+
+    def _notify(self, field, old):
+        """
+        Informs the observer (usually a HabitManager) about a change.
+        Before a rename, the observer is also called with the field 'rename' and the new
+        name instead of the old value; it may raise ValueError to reject the name.
+
+        :param field: Name of the changed attribute.
+        :param old: The value before the change.
+        """
+        if self._observer is not None:
+            self._observer(self, field, old)
+
+    @property
+    def is_dirty(self):
+        """
+        True if the habit has changes that are not saved yet.
+        """
+        return (not self._stored or self._meta_dirty or self._history_replaced
+                or bool(self._added) or bool(self._removed))
+
+    def mark_saved(self):
+        """
+        Marks the current state of the habit as saved in the database.
+        """
+        self._stored = True
+        self._meta_dirty = False
+        self._history_replaced = False
+        self._added = _NO_DATES
+        self._removed = _NO_DATES
+
+    def collect_changes(self, changes):
+        """
+        Adds the unsaved changes of this habit to a change set and marks the habit as saved.
+
+        :param changes: A ChangeSet object.
+        """
+        self.add_changes(changes)
+        self.mark_saved()
+
+    def add_changes(self, changes):
+        """
+        Adds the unsaved changes of this habit to a change set, without marking them as saved.
+
+        :param changes: A ChangeSet object.
+        """
+        row = (self, self._name, self._description, self._frequency, self._created_at.isoformat())
+        if not self._stored:
+            changes.inserted.append(row)
+        elif self._meta_dirty:
+            changes.updated.append(row)
+
+        if not self._stored or self._history_replaced:
+            changes.cleared.append(self)
+            changes.added.extend((self, day) for day in self._check_ins.ordinals)
+        else:
+            changes.removed.extend((self, check.toordinal()) for check in sorted(self._removed))
+            changes.added.extend((self, check.toordinal()) for check in sorted(self._added))
+
+    @instrumented
     def habit_skipped(self):
         """
         Checks whether the habit has been missed based on its frequency.
@@ -60,7 +427,7 @@ class Habit:
         if not self.check_ins:
             return True
 
-        last_check = max(self.check_ins)
+        last_check = self.check_ins.latest
         days_since = (date.today() - last_check).days
 
         if self.frequency == 'daily':
@@ -76,4 +443,3 @@ class Habit:
         :return: String including name, frequency, and current streak.
         """
         return f"{self.name} ({self.frequency}) - Streak: {self.current_streak()}"
-
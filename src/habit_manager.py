@@ -1,25 +1,107 @@
 from habit import Habit
+from changes import ChangeSet
+from leaderboard import StreakLeaderboard
 
 class HabitManager:
     """
     Manages a collection of habit objects like creation, filtering, analysis, etc.
+    Habits are indexed by name and by frequency, so lookups do not scan all habits,
+    and ranked by their current streak in a StreakLeaderboard.
+    It also keeps track of which habits changed, so only those have to be saved.
     """
 
     def __init__(self):
         """
-        Initializes an empty list to store Habit instances.
+        Initializes empty indexes to store Habit instances.
         """
 
-        self.habits = []
+        self._habits = {}        # id(habit) -> habit, in insertion order
+        self._order = {}         # id(habit) -> insertion number
+        self._next_order = 0
+        self._by_name = {}       # name -> habit
+        self._by_frequency = {}  # frequency -> {id(habit): habit}, in insertion order
+        self._leaderboard = None # built on first use, then kept up to date
+        self._dirty = {}     # id(habit) -> habit with unsaved changes
+        self._deleted = []   # removed habits that are stored in the database
+        self._listeners = []
+
+    def add_listener(self, listener):
+        """
+        Registers a callback that is called without arguments after every change
+        (e.g. to persist changes in the background).
+
+        :param listener: A callable.
+        """
+
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        """
+        Unregisters a callback registered with add_listener.
+
+        :param listener: The callable to remove.
+        """
+
+        self._listeners.remove(listener)
+
+    def _notify_listeners(self):
+        """
+        Calls all registered listeners.
+        """
+
+        for listener in self._listeners:
+            listener()
+
+    @property
+    def habits(self):
+        """
+        Read-only view of all habits in the order they were added.
+        """
+
+        return self._habits.values()
+
+    @property
+    def leaderboard(self):
+        """
+        StreakLeaderboard of all habits. It is built on first use (which loads lazily
+        loaded histories) and then updated whenever a streak changes.
+        """
+
+        if self._leaderboard is None:
+            self._leaderboard = StreakLeaderboard()
+            for key, habit in self._habits.items():
+                self._leaderboard.update(habit, self._order[key])
+        return self._leaderboard
+
+    def __iter__(self):
+        return iter(self._habits.values())
+
+    def __len__(self):
+        return len(self._habits)
 
     def add_habit(self, habit):
         """
         Adds an existing Habit object to the list.
 
         :param habit: An instance of Habit to be added.
+        :raises ValueError: If a habit with the same name already exists.
         """
 
-        self.habits.append(habit)
+        if habit.name in self._by_name:
+            raise ValueError(f"A habit named '{habit.name}' already exists.")
+
+        key = id(habit)
+        self._habits[key] = habit
+        self._order[key] = self._next_order
+        self._next_order += 1
+        self._by_name[habit.name] = habit
+        self._add_to_bucket(habit)
+        if self._leaderboard is not None:
+            self._leaderboard.update(habit, self._order[key])
+        habit._observer = self._habit_changed
+        if habit.is_dirty:
+            self._dirty[id(habit)] = habit
+            self._notify_listeners()
 
     def create_habit(self, name, description, frequency):
         """
@@ -28,17 +110,138 @@ class HabitManager:
         :param name: Name of the new habit.
         :param description: Short description of the new habit.
         :param frequency: Frequency ('daily' or 'weekly') of the new habit
+        :raises ValueError: If a habit with the same name already exists.
         """
         habit = Habit(name, description, frequency)
         self.add_habit(habit)
 
+    def rename_habit(self, name, new_name):
+        """
+        Renames a habit.
+
+        :param name: Current name of the habit.
+        :param new_name: The new name.
+        :raises KeyError: If there is no habit with the current name.
+        :raises ValueError: If another habit already uses the new name.
+        """
+
+        habit = self._by_name[name]
+        if new_name != name and new_name in self._by_name:
+            raise ValueError(f"A habit named '{new_name}' already exists.")
+        habit.name = new_name  # the indexes are updated by _habit_changed
+
     def remove_habit(self, name):
         """
         Removes a habit from the list.
         :param name: The name of the habit to be removed.
         """
 
-        self.habits = [habit for habit in self.habits if habit.name != name]
+        habit = self._by_name.get(name)
+        if habit is None:
+            return
+
+        self._detach(habit)
+        if habit._stored:
+            self._deleted.append(habit)
+            self._notify_listeners()
+
+    def discard_habit(self, habit):
+        """
+        Removes a habit object without recording a deletion, e.g. after its changes
+        were rejected by the database and it is replaced by the stored version.
+
+        :param habit: The Habit instance (nothing happens if it is not managed).
+        """
+
+        if id(habit) in self._habits:
+            self._detach(habit)
+
+    def _detach(self, habit):
+        """
+        Removes a managed habit from all indexes and forgets its unsaved changes.
+
+        :param habit: The Habit instance.
+        """
+
+        key = id(habit)
+        del self._by_name[habit.name]
+        if self._leaderboard is not None:
+            self._leaderboard.remove(habit)
+        del self._habits[key]
+        del self._order[key]
+        del self._by_frequency[habit.frequency][key]
+        habit._observer = None
+        if habit._history_cache is not None:
+            habit._history_cache.forget(habit)
+        self._dirty.pop(key, None)
+
+    def _add_to_bucket(self, habit):
+        """
+        Adds a habit to the index of its frequency, keeping the insertion order.
+
+        :param habit: The Habit instance.
+        """
+
+        key = id(habit)
+        bucket = self._by_frequency.setdefault(habit.frequency, {})
+        moved_back = bool(bucket) and self._order[next(reversed(bucket))] > self._order[key]
+        bucket[key] = habit
+        if moved_back:
+            # The habit changed its frequency and belongs somewhere before the end.
+            ordered = sorted(bucket.items(), key=lambda item: self._order[item[0]])
+            self._by_frequency[habit.frequency] = dict(ordered)
+
+    def _habit_changed(self, habit, field, old):
+        """
+        Called by a managed habit after it changed.
+
+        :param habit: The changed Habit instance.
+        :param field: Name of the changed attribute, or 'rename' before the name changes.
+        :param old: The value before the change (the new name for 'rename').
+        :raises ValueError: If a habit is renamed to the name of another managed habit.
+        """
+
+        if field == "rename":
+            if old in self._by_name:
+                raise ValueError(f"A habit named '{old}' already exists.")
+            return
+        if field == "name":
+            if self._by_name.get(old) is habit:
+                del self._by_name[old]
+            self._by_name[habit.name] = habit
+        elif field == "frequency":
+            del self._by_frequency[old][id(habit)]
+            self._add_to_bucket(habit)
+
+        if field in ("check_ins", "frequency") and self._leaderboard is not None:
+            self._leaderboard.update(habit, self._order[id(habit)])
+
+        self._dirty[id(habit)] = habit
+        self._notify_listeners()
+
+    def has_changes(self):
+        """
+        Checks whether there are changes that are not saved yet.
+
+        :return: True if a habit was created, changed or removed since the last save.
+        """
+
+        return bool(self._dirty) or bool(self._deleted)
+
+    def collect_changes(self):
+        """
+        Collects all unsaved changes into a ChangeSet and marks the habits as saved.
+        Only habits that actually changed are visited.
+
+        :return: ChangeSet with the pending changes.
+        """
+
+        changes = ChangeSet()
+        changes.deleted, self._deleted = self._deleted, []
+        for habit in self._dirty.values():
+            habit.collect_changes(changes)
+        self._dirty = {}
+        return changes
 
     def get_habit(self, name):
         """
@@ -47,10 +250,7 @@ class HabitManager:
         :return: Habit instance or None if not found.
         """
 
-        for habit in self.habits:
-            if habit.name == name:
-                return habit
-        return None
+        return self._by_name.get(name)
 
     def habits_by_frequency(self, frequency):
         """
@@ -60,7 +260,7 @@ class HabitManager:
         :return: List of Habit instances (may be empty).
         """
 
-        return [habit for habit in self.habits if habit.frequency == frequency]
+        return list(self._by_frequency.get(frequency, {}).values())
 
     def longest_streak(self):
         """
@@ -69,18 +269,7 @@ class HabitManager:
         :return: Tuple (Habit, streak length) or (None, 0) if no streak was found.
         """
 
-        if not self.habits:
-            return None, 0
-
-        max_streak = 0
-        top_habit = None
-
-        for habit in self.habits:
-            streak = habit.current_streak()
-            if streak > max_streak:
-                max_streak = streak
-                top_habit = habit
-        return top_habit, max_streak
+        return self._top_streak(None)
 
     def longest_daily_streak(self):
         """
@@ -88,16 +277,17 @@ class HabitManager:
         :return: Tuple (Habit, streak) or (None, 0) if no daily habit was found.
         """
 
-        daily_habits = self.habits_by_frequency('daily')
-        if not daily_habits:
-            return None, 0
+        return self._top_streak('daily')
 
-        max_streak = 0
-        top_habit = None
+    def _top_streak(self, frequency):
+        """
+        Reads the top entry of the leaderboard.
+
+        :param frequency: Frequency to rank within, or None for all habits.
+        :return: Tuple (Habit, streak) or (None, 0) if there is no streak.
+        """
 
-        for habit in daily_habits:
-            streak = habit.current_streak()
-            if streak > max_streak:
-                max_streak = streak
-                top_habit = habit
-        return top_habit, max_streak
\ No newline at end of file
+        top = self.leaderboard.top(1, frequency)
+        if not top or top[0][1] == 0:
+            return None, 0
+        return top[0]
@@ -0,0 +1,88 @@
+import sqlite3
+from collections import OrderedDict
+from check_ins import CheckInList
+from changes import ChangeSet
+from db import apply_changes
+import instrumentation
+from instrumentation import instrumented
+
+
+class HistoryCache:
+    """
+    LRU cache for the check-in histories of lazily loaded habits.
+    A habit's check-ins are fetched from SQLite the first time they are accessed.
+    When more than `capacity` histories are loaded, the least recently used one is
+    dropped from memory; unsaved check-in changes are written to the database first.
+    """
+
+    def __init__(self, db, capacity=1000):
+        """
+        Initializes an empty cache.
+
+        :param db: SQLite database connection.
+        :param capacity: Maximum number of histories kept in memory (at least 1).
+        """
+        self.db = db
+        self.capacity = max(1, capacity)
+        self._entries = OrderedDict()   # id(habit) -> habit, least recently used first
+
+    @instrumented
+    def load(self, habit):
+        """
+        Loads the check-ins of a habit from the database and caches them.
+
+        :param habit: Habit whose history is loaded.
+        """
+        days = []
+        if habit.id is not None:
+            try:
+                cur = self.db.cursor()
+                cur.execute("SELECT day FROM check_ins WHERE habit_id = ? ORDER BY day", (habit.id,))
+                days = [row[0] for row in cur.fetchall()]
+                if instrumentation.ENABLED:
+                    instrumentation.add_rows("history_cache.HistoryCache.load", read=len(days))
+            except sqlite3.Error as error:
+                print(f"[DB Error] Failed to load check-ins of '{habit.name}': {error}")
+
+        habit._history_loaded(CheckInList.from_ordinals(days))
+        self._entries[id(habit)] = habit
+        self._evict()
+
+    def touch(self, habit):
+        """
+        Marks a habit's history as most recently used.
+
+        :param habit: Habit whose history was accessed.
+        """
+        key = id(habit)
+        if key in self._entries:
+            self._entries.move_to_end(key)
+
+    def forget(self, habit):
+        """
+        Removes a habit from the cache without saving it (e.g. after it was deleted).
+
+        :param habit: The habit to forget.
+        """
+        self._entries.pop(id(habit), None)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _evict(self):
+        """
+        Drops the least recently used histories until the cache fits its capacity.
+        Histories with unsaved changes are written first; if that fails they stay loaded.
+        """
+        for key in list(self._entries)[:-1]:
+            if len(self._entries) <= self.capacity:
+                break
+            habit = self._entries[key]
+            if habit.has_unsaved_history:
+                changes = ChangeSet()
+                habit.add_changes(changes)
+                if not apply_changes(self.db, changes):
+                    continue
+                habit.mark_saved()
+            del self._entries[key]
+            habit._unload_history()
@@ -0,0 +1,165 @@
+import math
+import os
+import threading
+import time
+from collections import deque
+from functools import wraps
+from startup import lazy_import
+
+# Only needed with instrumentation enabled; importing them would slow down every start.
+inspect = lazy_import("inspect")
+json = lazy_import("json")
+
+# Instrumentation is switched on by setting HABIT_TRACKER_PROFILE before the app starts.
+# When it is off, @instrumented returns the functions unchanged, so there is no overhead.
+ENABLED = bool(os.environ.get("HABIT_TRACKER_PROFILE"))
+
+# Number of recent durations kept per function for the p95 latency.
+SAMPLE_SIZE = 10_000
+
+_lock = threading.Lock()
+_stats = {}
+
+
+class _Stats:
+    """
+    Collected numbers of one instrumented function.
+    """
+
+    __slots__ = ("calls", "seconds", "samples", "rows_read", "rows_written")
+
+    def __init__(self):
+        self.calls = 0
+        self.seconds = 0.0
+        self.samples = deque(maxlen=SAMPLE_SIZE)
+        self.rows_read = 0
+        self.rows_written = 0
+
+
+def _get(name):
+    stats = _stats.get(name)
+    if stats is None:
+        stats = _stats[name] = _Stats()
+    return stats
+
+
+def _record(name, seconds):
+    with _lock:
+        stats = _get(name)
+        stats.calls += 1
+        stats.seconds += seconds
+        stats.samples.append(seconds)
+
+
+def instrumented(func):
+    """
+    Decorator that counts the calls of a function and measures their duration.
+    For generator functions only the time spent inside the generator is measured.
+    Does nothing if instrumentation is disabled.
+
+    :param func: Function to instrument.
+    :return: The wrapped function, or func itself if instrumentation is disabled.
+    """
+    if not ENABLED:
+        return func
+    name = f"{func.__module__}.{func.__qualname__}"
+
+    if inspect.isgeneratorfunction(func):
+        @wraps(func)
+        def generator_wrapper(*args, **kwargs):
+            generator = func(*args, **kwargs)
+            elapsed = 0.0
+            try:
+                while True:
+                    start = time.perf_counter()
+                    try:
+                        item = next(generator)
+                    except StopIteration:
+                        break
+                    finally:
+                        elapsed += time.perf_counter() - start
+                    yield item
+            finally:
+                generator.close()
+                _record(name, elapsed)
+        return generator_wrapper
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _record(name, time.perf_counter() - start)
+    return wrapper
+
+
+def add_rows(name, read=0, written=0):
+    """
+    Adds database rows read or written to the numbers of a function.
+    Callers check ENABLED first, so disabled instrumentation costs one attribute lookup.
+
+    :param name: Name of the function, as reported (e.g. 'db.iter_habits').
+    :param read: Number of rows read.
+    :param written: Number of rows written.
+    """
+    with _lock:
+        stats = _get(name)
+        stats.rows_read += read
+        stats.rows_written += written
+
+
+def snapshot():
+    """
+    Returns the collected numbers.
+
+    :return: Dictionary {function name: {'calls', 'total_ms', 'mean_ms', 'p95_ms',
+             'rows_read', 'rows_written'}}, the slowest functions (total time) first.
+    """
+    with _lock:
+        items = [(name, stats.calls, stats.seconds, sorted(stats.samples), stats.rows_read, stats.rows_written)
+                 for name, stats in _stats.items()]
+
+    report = {}
+    for name, calls, seconds, samples, rows_read, rows_written in sorted(items, key=lambda item: -item[2]):
+        p95 = samples[math.ceil(0.95 * len(samples)) - 1] if samples else 0.0
+        report[name] = {
+            "calls": calls,
+            "total_ms": seconds * 1000,
+            "mean_ms": seconds * 1000 / calls if calls else 0.0,
+            "p95_ms": p95 * 1000,
+            "rows_read": rows_read,
+            "rows_written": rows_written,
+        }
+    return report
+
+
+def format_report():
+    """
+    Formats the collected numbers as a table.
+
+    :return: List of lines.
+    """
+    lines = [f"{'function':40s} {'calls':>8s} {'total ms':>10s} {'p95 ms':>9s} {'rows read':>10s} {'written':>9s}"]
+    for name, stats in snapshot().items():
+        lines.append(f"{name:40s} {stats['calls']:8d} {stats['total_ms']:10.2f} {stats['p95_ms']:9.3f} "
+                     f"{stats['rows_read']:10d} {stats['rows_written']:9d}")
+    return lines
+
+
+def dump(path):
+    """
+    Writes the collected numbers to a JSON file.
+
+    :param path: File name.
+    """
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(snapshot(), file, indent=2)
+
+
+def reset():
+    """
+    Clears all collected numbers.
+    """
+    with _lock:
+        _stats.clear()
@@ -0,0 +1,204 @@
+from random import random
+
+# Highest level of the skip lists; enough for far more than 2**32 keys.
+_MAX_LEVEL = 32
+
+
+class StreakLeaderboard:
+    """
+    Ranks habits by their current streak, overall and per frequency.
+    Each ranking holds (-streak, insertion number, id) keys in an indexable skip list,
+    so the top entries are at the front and ties keep the order in which habits were added.
+    Updating a habit is one delete and one insert per ranking in O(log n) expected time;
+    top-k reads k entries and the rank of a habit is O(log n) as well.
+    """
+
+    def __init__(self):
+        """
+        Initializes an empty leaderboard.
+        """
+        self._overall = _SkipList()
+        self._by_frequency = {}   # frequency -> _SkipList of keys
+        self._entries = {}        # id(habit) -> (key, frequency)
+        self._habits = {}         # id(habit) -> habit
+
+    def update(self, habit, order):
+        """
+        Adds a habit or moves it to the position of its current streak.
+
+        :param habit: The Habit instance.
+        :param order: Insertion number of the habit (breaks ties).
+        """
+        key = (-habit.current_streak(), order, id(habit))
+        frequency = habit.frequency
+        if self._entries.get(id(habit)) == (key, frequency):
+            return
+        self.remove(habit)
+        self._overall.insert(key)
+        ranking = self._by_frequency.get(frequency)
+        if ranking is None:
+            ranking = self._by_frequency[frequency] = _SkipList()
+        ranking.insert(key)
+        self._entries[id(habit)] = (key, frequency)
+        self._habits[id(habit)] = habit
+
+    def remove(self, habit):
+        """
+        Removes a habit from the leaderboard, if it is listed.
+
+        :param habit: The Habit instance.
+        """
+        entry = self._entries.pop(id(habit), None)
+        if entry is None:
+            return
+        key, frequency = entry
+        self._overall.remove(key)
+        self._by_frequency[frequency].remove(key)
+        del self._habits[id(habit)]
+
+    def top(self, k=1, frequency=None):
+        """
+        Returns the habits with the longest current streaks.
+
+        :param k: Number of habits to return.
+        :param frequency: Optional frequency ('daily' or 'weekly') to rank within.
+        :return: List of tuples (Habit, streak), longest streak first.
+        """
+        ranking = self._ranking(frequency)
+        if ranking is None:
+            return []
+        return [(self._habits[key[2]], -key[0]) for key in ranking.first(k)]
+
+    def rank(self, habit, frequency=None):
+        """
+        Returns the position of a habit in the ranking.
+
+        :param habit: The Habit instance.
+        :param frequency: Optional frequency to rank within.
+        :return: 1-based rank, or None if the habit is not ranked there.
+        """
+        entry = self._entries.get(id(habit))
+        if entry is None or (frequency is not None and entry[1] != frequency):
+            return None
+        return self._ranking(frequency).index(entry[0]) + 1
+
+    def _ranking(self, frequency):
+        """
+        Returns the skip list of the overall ranking or of one frequency (None if empty).
+        """
+        if frequency is None:
+            return self._overall
+        return self._by_frequency.get(frequency)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class _Node:
+    """
+    A skip list node: a key with one link per level, and the number of
+    positions each link skips (so positions can be counted on the way).
+    """
+
+    __slots__ = ("key", "next", "width")
+
+    def __init__(self, key, height):
+        self.key = key
+        self.next = [None] * height
+        self.width = [1] * height
+
+
+class _SkipList:
+    """
+    Sorted, duplicate-free keys in an indexable skip list. Insert, remove and the
+    position of a key take O(log n) expected time; the first k keys are read in O(k).
+    """
+
+    def __init__(self):
+        """
+        Initializes an empty list.
+        """
+        self._head = _Node(None, _MAX_LEVEL)
+        self._levels = 1  # levels in use
+        self._size = 0
+
+    def _find(self, key):
+        """
+        Finds the last node before `key` on every level in use.
+
+        :return: Tuple (nodes per level, position of each node), position 0 is the head.
+        """
+        nodes = [None] * self._levels
+        positions = [0] * self._levels
+        node, position = self._head, 0
+        for level in range(self._levels - 1, -1, -1):
+            following = node.next[level]
+            while following is not None and following.key < key:
+                position += node.width[level]
+                node = following
+                following = node.next[level]
+            nodes[level] = node
+            positions[level] = position
+        return nodes, positions
+
+    def insert(self, key):
+        """
+        Inserts a key that is not in the list yet.
+        """
+        height = 1
+        while height < _MAX_LEVEL and random() < 0.5:
+            height += 1
+        head = self._head
+        while self._levels < height:
+            # A new level starts with one link from the head to the end of the list.
+            head.next[self._levels] = None
+            head.width[self._levels] = self._size + 1
+            self._levels += 1
+
+        nodes, positions = self._find(key)
+        position = positions[0] + 1
+        node = _Node(key, height)
+        for level in range(height):
+            before = nodes[level]
+            node.next[level] = before.next[level]
+            node.width[level] = positions[level] + before.width[level] - positions[0]
+            before.next[level] = node
+            before.width[level] = position - positions[level]
+        for level in range(height, self._levels):
+            nodes[level].width[level] += 1
+        self._size += 1
+
+    def remove(self, key):
+        """
+        Removes a key that is in the list.
+        """
+        nodes, positions = self._find(key)
+        node = nodes[0].next[0]
+        for level in range(self._levels):
+            before = nodes[level]
+            if before.next[level] is node:
+                before.width[level] += node.width[level] - 1
+                before.next[level] = node.next[level]
+            else:
+                before.width[level] -= 1
+        self._size -= 1
+
+    def index(self, key):
+        """
+        Returns the 0-based position of a key that is in the list.
+        """
+        return self._find(key)[1][0]
+
+    def first(self, k):
+        """
+        Returns the k smallest keys in order.
+        """
+        keys = []
+        node = self._head.next[0]
+        while node is not None and len(keys) < k:
+            keys.append(node.key)
+            node = node.next[0]
+        return keys
+
+    def __len__(self):
+        return self._size
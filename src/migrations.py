@@ -0,0 +1,143 @@
+import sqlite3
+
+# Python's date.toordinal() is 1 for 0001-01-01, SQLite's julianday() is 1721425.5 for that day.
+JULIANDAY_TO_ORDINAL = 1721424.5
+
+
+def _v1_initial_tables(cur):
+    """
+    Version 1: the original layout with ISO date strings.
+    Uses IF NOT EXISTS, so databases created before versioning are adopted as they are.
+    """
+    cur.execute("""CREATE TABLE IF NOT EXISTS habits (
+        name TEXT PRIMARY KEY,
+        description TEXT,
+        frequency TEXT,
+        created_at TEXT)""")
+
+    cur.execute("""CREATE TABLE IF NOT EXISTS check_ins (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        habit_name TEXT,
+        date TEXT,
+        FOREIGN KEY(habit_name) REFERENCES habits(name))""")
+
+    cur.execute("""CREATE INDEX IF NOT EXISTS idx_check_ins_habit_date
+        ON check_ins(habit_name, date)""")
+
+
+def _v2_day_ordinals(cur):
+    """
+    Version 2: check-ins are stored as integer day ordinals in a WITHOUT ROWID table
+    with the primary key (habit_name, day). Duplicate check-ins are dropped.
+    """
+    cur.execute("""CREATE TABLE check_ins_v2 (
+        habit_name TEXT NOT NULL,
+        day INTEGER NOT NULL,
+        PRIMARY KEY (habit_name, day),
+        FOREIGN KEY(habit_name) REFERENCES habits(name)) WITHOUT ROWID""")
+
+    cur.execute(f"""INSERT OR IGNORE INTO check_ins_v2 (habit_name, day)
+        SELECT habit_name, CAST(julianday(date) - {JULIANDAY_TO_ORDINAL} AS INTEGER)
+        FROM check_ins
+        WHERE habit_name IS NOT NULL AND julianday(date) IS NOT NULL""")
+
+    cur.execute("DROP TABLE check_ins")
+    cur.execute("ALTER TABLE check_ins_v2 RENAME TO check_ins")
+
+
+def _v3_habit_ids(cur):
+    """
+    Version 3: habits get an integer id (the former rowid, so the order is kept) and
+    check-ins refer to it instead of repeating the habit name. Names stay unique.
+    """
+    cur.execute("""CREATE TABLE habits_v3 (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL UNIQUE,
+        description TEXT,
+        frequency TEXT,
+        created_at TEXT)""")
+
+    cur.execute("""INSERT INTO habits_v3 (id, name, description, frequency, created_at)
+        SELECT rowid, name, description, frequency, created_at FROM habits
+        WHERE name IS NOT NULL""")
+
+    cur.execute("""CREATE TABLE check_ins_v3 (
+        habit_id INTEGER NOT NULL,
+        day INTEGER NOT NULL,
+        PRIMARY KEY (habit_id, day),
+        FOREIGN KEY(habit_id) REFERENCES habits(id)) WITHOUT ROWID""")
+
+    cur.execute("""INSERT OR IGNORE INTO check_ins_v3 (habit_id, day)
+        SELECT h.id, c.day FROM check_ins c JOIN habits_v3 h ON h.name = c.habit_name""")
+
+    cur.execute("DROP TABLE check_ins")
+    cur.execute("DROP TABLE habits")
+    cur.execute("ALTER TABLE habits_v3 RENAME TO habits")
+    cur.execute("ALTER TABLE check_ins_v3 RENAME TO check_ins")
+
+
+def _v4_habit_users(cur):
+    """
+    Version 4: habits belong to a user (sharded multi-user storage), names are unique per user.
+    Existing habits belong to the default user ''.
+    """
+    cur.execute("""CREATE TABLE habits_v4 (
+        id INTEGER PRIMARY KEY,
+        user_id TEXT NOT NULL DEFAULT '',
+        name TEXT NOT NULL,
+        description TEXT,
+        frequency TEXT,
+        created_at TEXT,
+        UNIQUE (user_id, name))""")
+
+    cur.execute("""INSERT INTO habits_v4 (id, name, description, frequency, created_at)
+        SELECT id, name, description, frequency, created_at FROM habits""")
+
+    cur.execute("DROP TABLE habits")
+    cur.execute("ALTER TABLE habits_v4 RENAME TO habits")
+
+
+# MIGRATIONS[i] upgrades a database from version i to version i + 1.
+MIGRATIONS = [
+    _v1_initial_tables,
+    _v2_day_ordinals,
+    _v3_habit_ids,
+    _v4_habit_users,
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def schema_version(db):
+    """
+    Reads the schema version of a database (PRAGMA user_version).
+
+    :param db: SQLite database connection.
+    :return: Version number, 0 for new or unversioned databases.
+    """
+    return db.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(db):
+    """
+    Brings the database schema up to SCHEMA_VERSION.
+    Each step runs in its own transaction together with the version update,
+    so a failed step leaves the database at the previous version.
+    An up-to-date database costs a single PRAGMA read.
+
+    :param db: SQLite database connection.
+    :return: The schema version after migrating.
+    """
+    version = schema_version(db)
+    while version < SCHEMA_VERSION:
+        cur = db.cursor()
+        try:
+            cur.execute("BEGIN")
+            MIGRATIONS[version](cur)
+            version += 1
+            cur.execute(f"PRAGMA user_version = {version}")
+            db.commit()
+        except sqlite3.Error:
+            db.rollback()
+            raise
+    return version
@@ -0,0 +1,156 @@
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from columnar import CheckInColumns, FREQUENCY_CODES, OTHER_FREQUENCY
+
+DEFAULT_CHUNK_SIZE = 10_000
+
+
+def pack_chunk(habits):
+    """
+    Packs the data of some habits into compact arrays for a worker process.
+
+    :param habits: List of Habit objects.
+    :return: Tuple (streak codes, summary codes, offsets, days) of arrays: the frequency
+             code per habit (exact and lower-cased name, see columnar.FREQUENCY_CODES),
+             the start of every habit in days, and the day ordinals of all check-ins.
+    """
+    codes = array("b")
+    summary_codes = array("b")
+    offsets = array("q", [0])
+    days = array("i")
+    for habit in habits:
+        frequency = habit.frequency
+        codes.append(FREQUENCY_CODES.get(frequency, OTHER_FREQUENCY))
+        summary_codes.append(FREQUENCY_CODES.get(frequency.lower(), OTHER_FREQUENCY))
+        days.extend(habit.check_ins.ordinals)
+        offsets.append(len(days))
+    return codes, summary_codes, offsets, days
+
+
+def analyze_chunk(chunk, today):
+    """
+    Computes the partial results of one packed chunk. Runs in a worker process.
+
+    :param chunk: Arrays returned by pack_chunk.
+    :param today: Reference date for skipped habits.
+    :return: Dictionary with 'top' (index, streak) of the first longest streak,
+             'total' (sum of the streaks), 'streaks' (array), 'skipped' (indices),
+             'daily' and 'weekly' (numbers of habits).
+    """
+    codes, summary_codes, offsets, days = chunk
+    columns = CheckInColumns.from_arrays(codes, offsets, days)
+    streaks = array("i", columns.current_streaks())
+
+    top = (None, 0)
+    for index, streak in enumerate(streaks):
+        if top[0] is None or streak > top[1]:
+            top = (index, streak)
+
+    return {
+        "top": top,
+        "total": sum(streaks),
+        "streaks": streaks,
+        "skipped": array("q", [index for index, flag in enumerate(columns.skipped(today)) if flag]),
+        "daily": summary_codes.count(FREQUENCY_CODES["daily"]),
+        "weekly": summary_codes.count(FREQUENCY_CODES["weekly"]),
+    }
+
+
+class ParallelAnalysis:
+    """
+    Runs the analyze.py reports over many habits on several CPU cores.
+    The habits are split into chunks that are packed into arrays (no Habit objects
+    are pickled); a ProcessPoolExecutor computes the partial results of every chunk
+    and they are merged here. The results are the same as in serial mode,
+    including the order of habits with equal streaks.
+    """
+
+    def __init__(self, habits, chunk_size=DEFAULT_CHUNK_SIZE, workers=None, today=None):
+        """
+        Analyzes the habits.
+
+        :param habits: List of Habit objects.
+        :param chunk_size: Number of habits per chunk.
+        :param workers: Number of worker processes (default: CPU count; 0 runs the chunks in this process).
+        :param today: Reference date for skipped habits (default: date.today()).
+        """
+        self.habits = list(habits)
+        today = today or date.today()
+        chunks = [pack_chunk(self.habits[start:start + chunk_size])
+                  for start in range(0, len(self.habits), chunk_size)]
+
+        if workers == 0 or len(chunks) <= 1:
+            parts = [analyze_chunk(chunk, today) for chunk in chunks]
+        else:
+            with ProcessPoolExecutor(max_workers=min(workers or os.cpu_count() or 1, len(chunks))) as executor:
+                parts = list(executor.map(analyze_chunk, chunks, [today] * len(chunks)))
+
+        self._merge(parts, chunk_size)
+
+    def _merge(self, parts, chunk_size):
+        """
+        Merges the partial results of the chunks (in chunk order).
+        """
+        self.top = (None, 0)
+        self.total = 0
+        self.summary = {"daily": 0, "weekly": 0}
+        self.streaks = array("i")
+        self.skipped = []
+        for number, part in enumerate(parts):
+            start = number * chunk_size
+            index, streak = part["top"]
+            if index is not None and (self.top[0] is None or streak > self.top[1]):
+                self.top = (start + index, streak)
+            self.total += part["total"]
+            self.summary["daily"] += part["daily"]
+            self.summary["weekly"] += part["weekly"]
+            self.streaks.extend(part["streaks"])
+            self.skipped.extend(start + index for index in part["skipped"])
+
+    def get_longest_streak_overall(self):
+        """
+        Parallel version of analyze.get_longest_streak_overall.
+
+        :return: Tuple (Habit, streak length) or (None, 0) if empty
+        """
+        index, streak = self.top
+        if index is None:
+            return None, 0
+        return self.habits[index], streak
+
+    def average_streak(self):
+        """
+        Parallel version of analyze.average_streak.
+
+        :return: Average streak length (float).
+        """
+        if not self.habits:
+            return 0
+        return self.total / len(self.habits)
+
+    def habit_frequency_summary(self):
+        """
+        Parallel version of analyze.habit_frequency_summary.
+
+        :return: Dictionary {'daily': int, 'weekly': int}
+        """
+        return dict(self.summary)
+
+    def skipped_habits(self):
+        """
+        Parallel version of analyze.skipped_habits.
+
+        :return: List of skipped Habit objects.
+        """
+        return [self.habits[index] for index in self.skipped]
+
+    def habits_by_streak(self):
+        """
+        Parallel version of analyze.habits_by_streak.
+
+        :return: Sorted list of Habit objects.
+        """
+        streaks = self.streaks
+        return [self.habits[index] for index in sorted(range(len(streaks)), key=lambda i: -streaks[i])]
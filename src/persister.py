@@ -0,0 +1,128 @@
+import queue
+import threading
+import time
+from db import get_db, write_batch
+
+_STOP = object()
+
+
+class WriteBehindPersister:
+    """
+    Persists the changes of a HabitManager in the background.
+    Every change is collected right away into a ChangeSet and put into a queue.
+    A worker thread with its own SQLite connection writes the queued change sets
+    in batches (group commit): a batch is written once it has batch_size rows
+    or once interval seconds passed since its first change.
+    """
+
+    def __init__(self, manager, db_name="main.db", interval=1.0, batch_size=500):
+        """
+        Initializes the persister. Call start() to begin persisting.
+
+        :param manager: HabitManager whose changes are persisted.
+        :param db_name: Name of the database file.
+        :param interval: Maximum time in seconds a change waits before it is written.
+        :param batch_size: Number of rows after which a batch is written immediately.
+        """
+        self.manager = manager
+        self.db_name = db_name
+        self.interval = interval
+        self.batch_size = batch_size
+        self._queue = queue.Queue()
+        self._thread = None
+
+    def start(self):
+        """
+        Starts the worker thread and begins listening to changes of the manager.
+        Changes that are already pending are queued immediately.
+        """
+        self._thread = threading.Thread(target=self._run, name="habit-persister", daemon=True)
+        self._thread.start()
+        self.manager.add_listener(self.enqueue_changes)
+        self.enqueue_changes()
+
+    def enqueue_changes(self):
+        """
+        Collects the pending changes of the manager and puts them into the queue.
+        Called by the manager after every change.
+        """
+        changes = self.manager.collect_changes()
+        if changes:
+            self._queue.put(changes)
+
+    def flush(self):
+        """
+        Blocks until every queued change has been written (or dropped because the
+        database rejects it); change sets that wait for a retry are waited for as well.
+
+        :return: True if the queue was emptied, False if the worker thread is not running
+                 (the queued changes are not written then).
+        """
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                if self._thread is None or not self._thread.is_alive():
+                    print("[DB Error] The background writer is not running; recent changes were not saved.")
+                    return False
+                self._queue.all_tasks_done.wait(0.1)
+        return True
+
+    def stop(self):
+        """
+        Stops listening, writes all remaining changes and stops the worker thread.
+        """
+        if self._thread is None:
+            return
+        self.manager.remove_listener(self.enqueue_changes)
+        self.enqueue_changes()
+        self._queue.put(_STOP)
+        self._thread.join()
+        self._thread = None
+
+    def _run(self):
+        """
+        Worker loop: waits for changes, groups them into batches and writes each batch
+        in one transaction. A batch that failed is retried together with the next one
+        (or after interval seconds), unless it can never be written (see db.write_batch).
+        A change set counts as done for flush() only once it was written or dropped.
+        """
+        db = get_db(self.db_name)
+        if db is None:
+            return
+
+        retry = []
+        stopping = False
+        while not stopping:
+            batch = []
+            rows = 0
+            try:
+                item = self._queue.get(timeout=self.interval) if retry else self._queue.get()
+            except queue.Empty:
+                item = None  # only retry the failed change sets
+            deadline = time.monotonic() + self.interval
+            while item is not None:
+                if item is _STOP:
+                    stopping = True
+                    self._queue.task_done()
+                    break
+                batch.append(item)
+                rows += item.row_count()
+                if rows >= self.batch_size:
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+
+            pending = len(retry) + len(batch)
+            retry, _ = write_batch(db, retry + batch)
+            for _ in range(pending - len(retry)):
+                self._queue.task_done()
+
+        if retry:
+            write_batch(db, retry)
+            for _ in retry:
+                self._queue.task_done()
+        db.close()
@@ -0,0 +1,450 @@
+import argparse
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+import analyze
+import db_analyze
+from connection import ConnectionPool, DEFAULT_PROFILE
+from db import load_habits, write_batch
+from habit import check_name
+from habit_manager import HabitManager
+
+
+class HabitServer:
+    """
+    Headless JSON API for a HabitManager, for scripts and dashboards that run at the same time.
+    Clients send one JSON object per line, e.g. {"id": 1, "op": "check_off", "args": {"name": "Read"}},
+    and get one JSON object per line back: {"id": 1, "ok": true, "result": ...} or
+    {"id": 1, "ok": false, "error": "..."}.
+
+    All habit operations run on the event loop, so the manager needs no locks.
+    SQLite work runs on a bounded thread pool with its own connections. Changes are
+    written in batches: a writing request waits until the batch with its change is
+    committed, and all changes made while a batch is being written go into the next one.
+    Every request keeps its own change set, so a change the database rejects only fails
+    the request that made it.
+    """
+
+    def __init__(self, db_name="main.db", workers=4, flush_interval=0.005, profile=DEFAULT_PROFILE):
+        """
+        Initializes the server. Call start() to load the habits and accept clients.
+
+        :param db_name: Name of the database file.
+        :param workers: Number of threads (and database connections) for SQLite work.
+        :param flush_interval: Seconds a write waits for other writes to join its batch.
+        :param profile: Pragma profile of the database connections.
+        """
+        self.db_name = db_name
+        self.flush_interval = flush_interval
+        self.manager = HabitManager()
+        self._pool = ConnectionPool(db_name, size=workers, profile=profile)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="habit-db")
+        self._server = None
+        self._writer_task = None
+        self._wake = None
+        self._pending = []  # (change set, future) of every request waiting for the next batch
+        self._retry = []
+        self.operations = {
+            "list_habits": self.list_habits,
+            "get_habit": self.get_habit,
+            "create_habit": self.create_habit,
+            "rename_habit": self.rename_habit,
+            "delete_habit": self.delete_habit,
+            "check_off": self.check_off,
+            "check_in": self.check_in,
+            "report": self.report,
+            "db_report": self.db_report,
+        }
+
+    async def start(self, host="127.0.0.1", port=8765, path=None):
+        """
+        Loads the habits and starts listening on a TCP port or a Unix socket.
+
+        :param host: Host name for TCP.
+        :param port: TCP port (0 picks a free one, see the `address` property).
+        :param path: Path of a Unix socket; if given, host and port are ignored.
+        """
+        for habit in await self._run_db(lambda db: load_habits(db, user="")):
+            self.manager.add_habit(habit)
+
+        self._wake = asyncio.Event()
+        self._writer_task = asyncio.create_task(self._write_batches())
+        if path is not None:
+            self._server = await asyncio.start_unix_server(self._serve_client, path=path)
+        else:
+            self._server = await asyncio.start_server(self._serve_client, host, port)
+
+    @property
+    def address(self):
+        """
+        The address the server listens on: (host, port) for TCP or the socket path.
+        """
+        return self._server.sockets[0].getsockname()
+
+    async def serve_forever(self):
+        """
+        Accepts clients until the task is cancelled.
+        """
+        await self._server.serve_forever()
+
+    async def stop(self):
+        """
+        Stops accepting clients, writes the remaining changes and closes the database connections.
+        """
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._writer_task is not None:
+            try:
+                await self._commit()
+            except RuntimeError:
+                pass  # write_batch already reported the error
+            self._writer_task.cancel()
+        self._executor.shutdown()
+        self._pool.close()
+
+    async def _run_db(self, func, *args):
+        """
+        Runs a function with a pooled connection on the thread pool.
+
+        :param func: Function (db, *args).
+        :return: Result of the function.
+        """
+        def call():
+            with self._pool.connection() as db:
+                return func(db, *args)
+        return await asyncio.get_running_loop().run_in_executor(self._executor, call)
+
+    async def _serve_client(self, reader, writer):
+        """
+        Answers the requests of one client, in the order they arrive.
+        """
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                response = await self.handle(line)
+                writer.write(json.dumps(response).encode("utf-8") + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def handle(self, line):
+        """
+        Executes one request.
+
+        :param line: Request as JSON text (bytes or str).
+        :return: Response dictionary.
+        """
+        try:
+            request = json.loads(line)
+            request_id = request.get("id")
+            operation = self.operations[request["op"]]
+        except (ValueError, KeyError, TypeError, AttributeError):
+            return {"id": None, "ok": False, "error": "Invalid request."}
+
+        try:
+            result = await operation(**request.get("args", {}))
+            return {"id": request_id, "ok": True, "result": result}
+        except (KeyError, ValueError, TypeError, RuntimeError) as error:
+            message = error.args[0] if error.args else type(error).__name__
+            return {"id": request_id, "ok": False, "error": str(message)}
+
+    def _habit(self, name):
+        check_name(name)
+        habit = self.manager.get_habit(name)
+        if habit is None:
+            raise KeyError(f"No habit named '{name}'.")
+        return habit
+
+    # Writes
+
+    async def _commit(self):
+        """
+        Collects the changes of the current request and waits until they (and earlier
+        changes that are still pending) are written.
+
+        :raises RuntimeError: If the changes could not be saved.
+        """
+        changes = self.manager.collect_changes()
+        if not changes and not self._pending and not self._retry:
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._pending.append((changes, waiter))
+        self._wake.set()
+        await waiter
+
+    async def _write_batches(self):
+        """
+        Writer loop: writes the change sets of all requests that arrived in the meantime
+        in one transaction (group commit). Change sets that failed because the database
+        was busy are retried with the next batch. A change set the database rejects
+        (see db.write_batch) is dropped: its habits are reloaded from the database and
+        only its request gets the error.
+        """
+        while True:
+            await self._wake.wait()
+            await asyncio.sleep(self.flush_interval)
+            self._wake.clear()
+            pending, self._pending = self._pending, []
+            changesets = self._retry + [changes for changes, waiter in pending if changes]
+
+            try:
+                self._retry, dropped = await self._run_db(write_batch, changesets)
+            except Exception as error:
+                print(f"[DB Error] Dropped changes that cannot be saved: {error}")
+                self._retry, dropped = [], changesets
+            if dropped:
+                await self._restore(dropped)
+
+            dropped = {id(changes) for changes in dropped}
+            retry = {id(changes) for changes in self._retry}
+            for changes, waiter in pending:
+                if waiter.done():
+                    continue
+                if id(changes) in dropped:
+                    waiter.set_exception(RuntimeError("The changes were rejected by the database and are not saved."))
+                elif id(changes) in retry or (not changes and self._retry):
+                    waiter.set_exception(RuntimeError("The changes could not be saved."))
+                else:
+                    waiter.set_result(None)
+
+    async def _restore(self, dropped):
+        """
+        Replaces the habits of dropped change sets with their stored versions,
+        so the habits in memory match the database again.
+
+        :param dropped: ChangeSet objects that were not written.
+        """
+        habits = list({id(habit): habit for changes in dropped for habit in changes.habits()}.values())
+        stored = {habit.id: habit for habit in await self._run_db(lambda db: load_habits(db, user=""))}
+        for habit in habits:
+            self.manager.discard_habit(habit)
+        for habit in habits:
+            original = stored.get(habit.id) if habit.id is not None else None
+            if original is not None and self.manager.get_habit(original.name) is None:
+                self.manager.add_habit(original)
+
+    # Operations
+
+    async def list_habits(self, frequency=None):
+        """
+        :param frequency: Optional frequency filter.
+        :return: List of habit dictionaries.
+        """
+        habits = self.manager.habits if frequency is None else self.manager.habits_by_frequency(frequency)
+        return [_habit_data(habit) for habit in habits]
+
+    async def get_habit(self, name):
+        """
+        :return: Habit dictionary with all check-in dates.
+        """
+        habit = self._habit(name)
+        data = _habit_data(habit)
+        data["check_ins"] = [day.isoformat() for day in habit.check_ins]
+        return data
+
+    async def create_habit(self, name, description="", frequency="daily"):
+        """
+        :return: The new habit as dictionary.
+        """
+        check_name(name)
+        if description is not None and not isinstance(description, str):
+            raise ValueError("The description must be a string.")
+        if frequency not in ("daily", "weekly"):
+            raise ValueError("The frequency must be 'daily' or 'weekly'.")
+        self.manager.create_habit(name, description, frequency)
+        await self._commit()
+        return _habit_data(self.manager.get_habit(name))
+
+    async def rename_habit(self, name, new_name):
+        """
+        :return: The renamed habit as dictionary.
+        """
+        self._habit(name)
+        check_name(new_name)
+        self.manager.rename_habit(name, new_name)
+        await self._commit()
+        return _habit_data(self.manager.get_habit(new_name))
+
+    async def delete_habit(self, name):
+        """
+        :return: True
+        """
+        self._habit(name)
+        self.manager.remove_habit(name)
+        await self._commit()
+        return True
+
+    async def check_off(self, name):
+        """
+        Marks today as done.
+
+        :return: The habit as dictionary.
+        """
+        habit = self._habit(name)
+        habit.check_off()
+        await self._commit()
+        return _habit_data(habit)
+
+    async def check_in(self, name, day):
+        """
+        Marks a given day (ISO date) as done.
+
+        :return: The habit as dictionary.
+        """
+        habit = self._habit(name)
+        habit.check_ins.add(date.fromisoformat(day))
+        await self._commit()
+        return _habit_data(habit)
+
+    # Reports
+
+    async def report(self, kind, name=None, frequency=None):
+        """
+        Runs an analyze.py report on the habits in memory.
+
+        :param kind: One of 'longest_streak_overall', 'longest_streak_of', 'checkin_counts',
+                     'skipped_habits', 'frequency_summary', 'average_streak', 'habits_by_streak'.
+        :param name: Habit name for 'longest_streak_of'.
+        :param frequency: Optional frequency filter for 'habits_by_streak'.
+        :return: JSON compatible result.
+        """
+        habits = list(self.manager.habits)
+        if kind == "longest_streak_overall":
+            habit, streak = analyze.get_longest_streak_overall(self.manager)
+            return {"name": habit.name if habit else None, "streak": streak}
+        if kind == "longest_streak_of":
+            return analyze.get_longest_streak_of(self.manager, name)
+        if kind == "checkin_counts":
+            return analyze.checkin_counts(habits)
+        if kind == "skipped_habits":
+            return [habit.name for habit in analyze.skipped_habits(habits)]
+        if kind == "frequency_summary":
+            return analyze.habit_frequency_summary(habits)
+        if kind == "average_streak":
+            return analyze.average_streak(habits)
+        if kind == "habits_by_streak":
+            ranked = self.manager.leaderboard.top(len(self.manager), frequency)
+            return [[habit.name, streak] for habit, streak in ranked]
+        raise ValueError(f"Unknown report '{kind}'.")
+
+    async def db_report(self):
+        """
+        Runs the SQL reports of db_analyze on the database (after writing pending changes).
+
+        :return: Dictionary with the report values.
+        """
+        await self._commit()
+
+        def report(db):
+            name, streak = db_analyze.get_longest_streak_overall(db, user="")
+            return {
+                "longest_streak_overall": {"name": name, "streak": streak},
+                "average_streak": db_analyze.average_streak(db, user=""),
+                "frequency_summary": db_analyze.habit_frequency_summary(db, user=""),
+                "checkin_counts": db_analyze.checkin_counts(db, user=""),
+                "skipped_habits": db_analyze.skipped_habits(db, user=""),
+            }
+        return await self._run_db(report)
+
+
+def _habit_data(habit):
+    """
+    Converts a habit to a JSON compatible dictionary (without the check-in dates).
+    """
+    latest = habit.check_ins.latest if habit.check_ins else None
+    return {
+        "name": habit.name,
+        "description": habit.description,
+        "frequency": habit.frequency,
+        "created_at": habit.created_at.isoformat(),
+        "check_ins": len(habit.check_ins),
+        "last_check_in": latest.isoformat() if latest else None,
+        "current_streak": habit.current_streak(),
+        "longest_streak": habit.longest_streak(),
+    }
+
+
+class HabitClient:
+    """
+    Minimal asyncio client for HabitServer.
+    """
+
+    def __init__(self, reader, writer):
+        self._reader = reader
+        self._writer = writer
+        self._next_id = 0
+
+    @classmethod
+    async def connect(cls, host="127.0.0.1", port=8765, path=None):
+        """
+        Connects to a server over TCP or a Unix socket.
+
+        :return: HabitClient object.
+        """
+        if path is not None:
+            reader, writer = await asyncio.open_unix_connection(path)
+        else:
+            reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    async def request(self, op, **args):
+        """
+        Sends a request and waits for its response.
+
+        :param op: Name of the operation.
+        :param args: Arguments of the operation.
+        :return: Result of the operation.
+        :raises RuntimeError: If the server answered with an error.
+        """
+        self._next_id += 1
+        message = {"id": self._next_id, "op": op, "args": args}
+        self._writer.write(json.dumps(message).encode("utf-8") + b"\n")
+        await self._writer.drain()
+        response = json.loads(await self._reader.readline())
+        if not response["ok"]:
+            raise RuntimeError(response["error"])
+        return response["result"]
+
+    async def close(self):
+        """
+        Closes the connection.
+        """
+        self._writer.close()
+        await self._writer.wait_closed()
+
+
+async def _serve(args):
+    server = HabitServer(args.db, workers=args.workers)
+    await server.start(args.host, args.port, args.unix)
+    print(f"Habit tracker API listening on {server.address}")
+    try:
+        await server.serve_forever()
+    finally:
+        await server.stop()
+
+
+def main():
+    """
+    Runs the server until Ctrl-C.
+    """
+    parser = argparse.ArgumentParser(description="Habit tracker JSON API server")
+    parser.add_argument("--db", default="main.db", help="database file (default: main.db)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", help="listen on this Unix socket instead of TCP")
+    parser.add_argument("--workers", type=int, default=4, help="threads for database work (default: 4)")
+    args = parser.parse_args()
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
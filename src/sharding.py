@@ -0,0 +1,229 @@
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+import db_analyze
+from connection import ConnectionPool, connect, DEFAULT_PROFILE
+from db import load_habits, save_habit, save_changes
+
+
+class ShardRouter:
+    """
+    Maps users to shards with rendezvous (highest random weight) hashing.
+    The mapping only depends on the user name and the number of shards, so it is
+    the same in every process and after restarts. When a shard is added, only the
+    users that move to the new shard change their shard.
+    """
+
+    def __init__(self, shard_count):
+        """
+        Initializes the router.
+
+        :param shard_count: Number of shards (at least 1).
+        """
+        if shard_count < 1:
+            raise ValueError("At least one shard is needed.")
+        self.shard_count = shard_count
+
+    def shard_for(self, user):
+        """
+        Finds the shard of a user.
+
+        :param user: User name.
+        :return: Shard index (0 to shard_count - 1).
+        """
+        return max(range(self.shard_count), key=lambda shard: _weight(shard, user))
+
+
+def _weight(shard, user):
+    """
+    Stable pseudo-random weight of a (shard, user) pair.
+    """
+    digest = hashlib.blake2b(f"{shard}:{user}".encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+
+class ShardedStorage:
+    """
+    Stores the habits of many users in several SQLite files (shards).
+    Each user lives in exactly one shard, chosen by a ShardRouter, so loading and
+    saving a user's habits touches only that file. Reports over all users run the
+    SQL analytics of db_analyze in every shard in parallel (a process pool) and
+    merge the results.
+    """
+
+    def __init__(self, folder, shards=4, profile=DEFAULT_PROFILE, pool_size=2, processes=None):
+        """
+        Opens (or creates) the shard files.
+
+        :param folder: Folder of the shard files (shard_00.db, shard_01.db, ...).
+        :param shards: Number of shards; must stay the same for an existing folder.
+        :param profile: Pragma profile of the connections.
+        :param pool_size: Connections per shard for the threads of this process.
+        :param processes: Worker processes for cross-shard reports
+                          (default: one per shard, up to the CPU count; 0 runs them in this process).
+        """
+        os.makedirs(folder, exist_ok=True)
+        self.router = ShardRouter(shards)
+        self.profile = profile
+        self.processes = processes
+        self.paths = [os.path.join(folder, f"shard_{index:02d}.db") for index in range(shards)]
+        self._pools = [ConnectionPool(path, pool_size, profile) for path in self.paths]
+
+    def connection(self, user):
+        """
+        Borrows a connection to the shard of a user.
+
+        :param user: User name.
+        :return: Context manager that yields a SQLite connection.
+        """
+        return self._pools[self.router.shard_for(user)].connection()
+
+    def load_habits(self, user):
+        """
+        Loads the habits of a user with their check-ins.
+
+        :param user: User name.
+        :return: List of Habit objects.
+        """
+        with self.connection(user) as db:
+            return load_habits(db, user=user)
+
+    def save_habit(self, user, habit):
+        """
+        Saves a habit of a user with its check-ins.
+
+        :param user: User name.
+        :param habit: Habit object.
+        """
+        with self.connection(user) as db:
+            save_habit(db, habit, user)
+
+    def save_changes(self, user, manager):
+        """
+        Saves the changed habits of a user's HabitManager.
+
+        :param user: User name.
+        :param manager: HabitManager with the user's habits.
+        :return: True if the changes were written, else False.
+        """
+        with self.connection(user) as db:
+            return save_changes(db, manager, user)
+
+    def _fan_out(self, worker, *args):
+        """
+        Runs a worker function for every shard and returns the results in shard order.
+
+        :param worker: Module-level function (path, profile, *args).
+        :return: List of the results.
+        """
+        count = len(self.paths)
+        if self.processes == 0:
+            return [worker(path, self.profile, *args) for path in self.paths]
+        processes = self.processes or min(count, os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            return list(executor.map(worker, self.paths, [self.profile] * count,
+                                     *[[arg] * count for arg in args]))
+
+    def habit_frequency_summary(self):
+        """
+        Number of daily and weekly habits of all users.
+
+        :return: Dictionary {'daily': int, 'weekly': int}
+        """
+        summary = {"daily": 0, "weekly": 0}
+        for part in self._fan_out(_shard_frequency_summary):
+            for frequency, count in part.items():
+                summary[frequency] += count
+        return summary
+
+    def average_streak(self):
+        """
+        Average current streak of all habits of all users.
+
+        :return: Average streak length (float), 0 if there are no habits.
+        """
+        totals = self._fan_out(_shard_streak_totals)
+        count = sum(count for total, count in totals)
+        if not count:
+            return 0
+        return sum(total for total, count in totals) / count
+
+    def checkin_counts(self):
+        """
+        Number of check-ins of every habit of all users.
+
+        :return: List of tuples (user, habit name, number of check-ins).
+        """
+        return [(user, name, count) for user, name, _, count, _, _ in self._summaries()]
+
+    def skipped_habits(self, today=None):
+        """
+        Habits of all users that were skipped based on their frequency.
+
+        :param today: Reference date (default: date.today()).
+        :return: List of tuples (user, habit name).
+        """
+        return [(user, name) for user, name, _, _, _, skipped in self._summaries(today) if skipped]
+
+    def habits_by_streak(self, limit=None):
+        """
+        Habits of all users sorted by their current streak in descending order.
+
+        :param limit: Optional maximum number of habits to return.
+        :return: List of tuples (user, habit name, current streak).
+        """
+        ranked = sorted(((user, name, streak) for user, name, _, _, streak, _ in self._summaries()),
+                        key=lambda row: -row[2])
+        return ranked if limit is None else ranked[:limit]
+
+    def get_longest_streak_overall(self):
+        """
+        Finds the habit with the longest current streak of all users.
+
+        :return: Tuple (user, habit name, streak) or (None, None, 0) if there are no habits.
+        """
+        ranked = self.habits_by_streak(1)
+        return ranked[0] if ranked else (None, None, 0)
+
+    def _summaries(self, today=None):
+        """
+        Collects db_analyze.habit_summaries of all shards, in shard order.
+        """
+        today = today or date.today()
+        return [row for rows in self._fan_out(_shard_habit_summaries, today) for row in rows]
+
+    def close(self):
+        """
+        Closes the connections of all shards.
+        """
+        for pool in self._pools:
+            pool.close()
+
+
+# Workers for ShardedStorage._fan_out. They run in other processes,
+# so they open their own connection and return plain values.
+
+def _shard_frequency_summary(path, profile):
+    db = connect(path, profile)
+    try:
+        return db_analyze.habit_frequency_summary(db)
+    finally:
+        db.close()
+
+
+def _shard_streak_totals(path, profile):
+    db = connect(path, profile)
+    try:
+        streaks = [streak for name, streak in db_analyze.current_streaks(db)]
+        return sum(streaks), len(streaks)
+    finally:
+        db.close()
+
+
+def _shard_habit_summaries(path, profile, today):
+    db = connect(path, profile)
+    try:
+        return db_analyze.habit_summaries(db, today)
+    finally:
+        db.close()
@@ -0,0 +1,278 @@
+import mmap
+import os
+import sqlite3
+import struct
+import sys
+from array import array
+from datetime import date
+from check_ins import CheckInList
+from db import iter_habits
+from habit import Habit
+from migrations import schema_version
+
+# File layout (little endian, every section starts at a multiple of 8 bytes):
+#   header   magic, format version, schema version, generation, habit count, day count, string bytes
+#   habits   one record per habit: id, created_at and streaks, byte lengths of name, description, frequency
+#   offsets  habit count + 1 int64: the check-ins of habit i are days[offsets[i]:offsets[i + 1]]
+#   days     int32 day ordinals (date.toordinal()), sorted per habit
+#   strings  the UTF-8 encoded names, descriptions and frequencies of all habits
+MAGIC = b"HABITSNP"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<8sIIQQQQ")
+RECORD = struct.Struct("<qiiiIII4x")
+NULL = 0xFFFFFFFF  # string length of a NULL column
+
+# A snapshot is current if the generation in its header is the one in snapshot_state and
+# nothing was written since. The triggers set the dirty flag on the first change only.
+# They are installed when the first snapshot is written, so databases without snapshots
+# (and their bulk imports) do not pay for them.
+TRIGGERS = {f"snapshot_{table}_{event.lower()}": (table, event)
+            for table in ("habits", "check_ins") for event in ("INSERT", "UPDATE", "DELETE")}
+
+
+def _install_tracking(cur):
+    """
+    Creates the snapshot_state table and the triggers that mark it dirty, if they do not exist.
+    """
+    cur.execute("""CREATE TABLE IF NOT EXISTS snapshot_state (
+        id INTEGER PRIMARY KEY CHECK (id = 0),
+        generation INTEGER NOT NULL,
+        dirty INTEGER NOT NULL)""")
+    cur.execute("INSERT OR IGNORE INTO snapshot_state (id, generation, dirty) VALUES (0, 0, 1)")
+    for name, (table, event) in TRIGGERS.items():
+        cur.execute(f"""CREATE TRIGGER IF NOT EXISTS {name} AFTER {event} ON {table}
+            WHEN (SELECT dirty FROM snapshot_state WHERE id = 0) = 0
+            BEGIN UPDATE snapshot_state SET dirty = 1 WHERE id = 0; END""")
+
+
+def _current_generation(db):
+    """
+    Returns the generation a snapshot must have to be current, or None if the
+    database changed since the last snapshot (or was never tracked).
+    """
+    try:
+        row = db.execute("SELECT generation, dirty FROM snapshot_state WHERE id = 0").fetchone()
+        triggers = db.execute(f"""SELECT COUNT(*) FROM sqlite_master
+            WHERE type = 'trigger' AND name IN ({', '.join('?' * len(TRIGGERS))})""", list(TRIGGERS)).fetchone()[0]
+    except sqlite3.Error:
+        return None
+    if row is None or row[1] or triggers != len(TRIGGERS):
+        return None
+    return row[0]
+
+
+def _read_header(path, data):
+    """
+    Unpacks the header of a snapshot file.
+
+    :param path: File name (for error messages).
+    :param data: The first bytes of the file.
+    :return: Header tuple, or None if the file is not a snapshot of this format.
+    """
+    try:
+        header = HEADER.unpack_from(data)
+    except struct.error:
+        header = None
+    if header is None or header[:2] != (MAGIC, FORMAT_VERSION) or sys.byteorder != "little":
+        print(f"[DB Error] Ignoring snapshot {path}: unknown file format")
+        return None
+    return header
+
+
+def _current_header(db, path):
+    """
+    Reads the header of a snapshot file and checks that the snapshot matches the database.
+
+    :return: Header tuple, or None if the file is missing, invalid or stale.
+    """
+    generation = _current_generation(db)
+    if generation is None:
+        return None
+    try:
+        with open(path, "rb") as file:
+            header = _read_header(path, file.read(HEADER.size))
+    except OSError:
+        return None
+    if header is None or header[2] != schema_version(db) or header[3] != generation:
+        return None
+    return header
+
+
+def is_current(db, path):
+    """
+    Checks whether a snapshot file exists and matches the database
+    (nothing was written to the database since the snapshot was saved).
+
+    :param db: SQLite database connection.
+    :param path: File name of the snapshot.
+    :return: True if load_snapshot would use the file.
+    """
+    return _current_header(db, path) is not None
+
+
+def _encode(text):
+    """
+    Encodes a string column; None is stored as the length NULL.
+    """
+    if text is None:
+        return NULL, b""
+    data = text.encode("utf-8")
+    return len(data), data
+
+
+def _decode(strings, position, length):
+    """
+    Decodes a string column written by _encode.
+
+    :return: Tuple (text or None, position after the text).
+    """
+    if length == NULL:
+        return None, position
+    end = position + length
+    return str(strings[position:end], "utf-8"), end
+
+
+def _pad(size):
+    """
+    Returns the number of zero bytes that align a section of `size` bytes to 8 bytes.
+    """
+    return -size % 8
+
+
+def _layout(habit_count, day_count, string_size):
+    """
+    Computes where the sections of a snapshot start.
+
+    :return: Tuple of the start of the offsets, days and strings, and the file size.
+    """
+    offsets = HEADER.size + habit_count * RECORD.size
+    offsets += _pad(offsets)
+    days = offsets + (habit_count + 1) * 8
+    strings = days + day_count * 4
+    strings += _pad(strings)
+    return offsets, days, strings, strings + string_size
+
+
+def save_snapshot(db, path):
+    """
+    Writes a snapshot of the habits and check-ins of the local user ('') to a file.
+    The data is read in the same transaction that gives the snapshot its generation,
+    and the file is replaced atomically, so a snapshot always matches a database state.
+
+    :param db: SQLite database connection.
+    :param path: File name of the snapshot.
+    :return: Number of habits written, or None on errors.
+    """
+    temp_path = f"{path}.tmp"
+    cur = db.cursor()
+    try:
+        cur.execute("BEGIN IMMEDIATE")
+        _install_tracking(cur)
+        cur.execute("UPDATE snapshot_state SET generation = generation + 1, dirty = 0 WHERE id = 0")
+        generation = cur.execute("SELECT generation FROM snapshot_state WHERE id = 0").fetchone()[0]
+
+        records = bytearray()
+        strings = bytearray()
+        offsets = array("q", [0])
+        days = array("i")
+        for habit in iter_habits(db, user=""):
+            lengths = []
+            for text in (habit.name, habit.description, habit.frequency):
+                length, data = _encode(text)
+                lengths.append(length)
+                strings += data
+            records += RECORD.pack(habit.id, habit.created_at.toordinal(),
+                                   habit.current_streak(), habit.longest_streak(), *lengths)
+            days.extend(habit.check_ins.ordinals)
+            offsets.append(len(days))
+
+        # iter_habits stops on database errors, so check that nothing is missing.
+        expected = cur.execute("""SELECT (SELECT COUNT(*) FROM habits WHERE user_id = ''),
+            (SELECT COUNT(*) FROM check_ins JOIN habits ON habits.id = check_ins.habit_id
+             WHERE habits.user_id = '')""").fetchone()
+        if expected != (len(offsets) - 1, len(days)):
+            raise sqlite3.DatabaseError("the habits could not be read completely")
+
+        if sys.byteorder != "little":
+            offsets.byteswap()
+            days.byteswap()
+        with open(temp_path, "wb") as file:
+            file.write(HEADER.pack(MAGIC, FORMAT_VERSION, schema_version(db), generation,
+                                   len(offsets) - 1, len(days), len(strings)))
+            for section in (records, offsets.tobytes(), days.tobytes()):
+                file.write(section)
+                file.write(b"\0" * _pad(len(section)))
+            file.write(strings)
+        db.commit()
+        os.replace(temp_path, path)
+        return len(offsets) - 1
+    except (sqlite3.Error, OSError) as error:
+        db.rollback()
+        print(f"[DB Error] Failed to write snapshot: {error}")
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        return None
+
+
+def load_snapshot(db, path):
+    """
+    Loads the habits of the local user ('') from a snapshot file, if it matches the database.
+    The file is memory-mapped and the check-ins of every habit are a view into the
+    mapping (nothing is copied or parsed until a habit changes); the streaks come from
+    the file as well. Use load_habits if None is returned.
+
+    :param db: SQLite database connection.
+    :param path: File name of the snapshot.
+    :return: List of Habit objects, or None if there is no current snapshot.
+    """
+    header = _current_header(db, path)
+    if header is None:
+        return None
+    try:
+        with open(path, "rb") as file:
+            mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    if _read_header(path, mapping[:HEADER.size]) != header:  # replaced in the meantime
+        return None
+
+    _, _, _, _, habit_count, day_count, string_size = header
+    offsets_start, days_start, strings_start, size = _layout(habit_count, day_count, string_size)
+    if len(mapping) != size:
+        print(f"[DB Error] Ignoring snapshot {path}: the file is truncated")
+        return None
+
+    # Views into the mapping; they keep it open as long as a habit uses its check-ins.
+    view = memoryview(mapping)
+    records = view[HEADER.size:HEADER.size + habit_count * RECORD.size]
+    offsets = view[offsets_start:days_start].cast("q")
+    days = view[days_start:days_start + day_count * 4].cast("i")
+    strings = view[strings_start:size]
+
+    habits = []
+    text_position = 0
+    fromordinal = date.fromordinal
+    for index, (habit_id, created_at, current, longest, *lengths) in enumerate(RECORD.iter_unpack(records)):
+        name, text_position = _decode(strings, text_position, lengths[0])
+        description, text_position = _decode(strings, text_position, lengths[1])
+        frequency, text_position = _decode(strings, text_position, lengths[2])
+        habit = Habit(name, description, frequency)
+        habit.id = habit_id
+        habit.created_at = fromordinal(created_at)
+        habit._history_loaded(CheckInList.from_buffer(days[offsets[index]:offsets[index + 1]]), (current, longest))
+        habit.mark_saved()
+        habits.append(habit)
+    return habits
+
+
+def release(habits):
+    """
+    Copies the check-ins of habits from load_snapshot out of the memory-mapped file,
+    so the mapping is closed once nothing else uses it. Call it before the snapshot is
+    saved again: Windows cannot replace a file that is still mapped.
+
+    :param habits: Iterable of Habit objects.
+    """
+    for habit in habits:
+        if habit._check_ins is not None:  # without loading unloaded histories
+            habit._check_ins.release_buffer()
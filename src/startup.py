@@ -0,0 +1,96 @@
+import importlib
+import threading
+
+
+class LazyModule:
+    """
+    Stands in for a module that is only imported when one of its attributes is used,
+    so modules that are slow to import (like questionary) do not delay the start of the app.
+    """
+
+    def __init__(self, name):
+        """
+        Initializes the placeholder without importing anything.
+
+        :param name: Full name of the module, e.g. 'questionary'.
+        """
+        self._name = name
+        self._module = None
+
+    def load(self):
+        """
+        Imports the module (once). Safe to call from several threads.
+
+        :return: The module.
+        """
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return self._module
+
+    @property
+    def loaded(self):
+        """
+        True once the module was imported.
+        """
+        return self._module is not None
+
+    def __getattr__(self, attribute):
+        return getattr(self.load(), attribute)
+
+    def __repr__(self):
+        state = "loaded" if self.loaded else "not loaded"
+        return f"<LazyModule '{self._name}' ({state})>"
+
+
+def lazy_import(name):
+    """
+    Returns a placeholder that imports a module on first use.
+
+    :param name: Full name of the module.
+    :return: LazyModule object.
+    """
+    return LazyModule(name)
+
+
+class BackgroundTask:
+    """
+    Runs a function on a daemon thread, e.g. while the user reads the welcome prompt.
+    The result is only waited for when it is needed.
+    """
+
+    def __init__(self, func, *args, name=None):
+        """
+        Starts the function right away.
+
+        :param func: Function to run.
+        :param args: Arguments of the function.
+        :param name: Name of the thread.
+        """
+        self._result = None
+        self._error = None
+        self._thread = threading.Thread(target=self._run, args=(func, args), name=name, daemon=True)
+        self._thread.start()
+
+    def _run(self, func, args):
+        try:
+            self._result = func(*args)
+        except BaseException as error:
+            self._error = error
+
+    def done(self):
+        """
+        :return: True if the function has finished.
+        """
+        return not self._thread.is_alive()
+
+    def result(self):
+        """
+        Waits until the function has finished.
+
+        :return: Return value of the function.
+        :raises Exception: The exception raised by the function, if any.
+        """
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
+        return self._result
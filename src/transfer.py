@@ -0,0 +1,281 @@
+import csv
+import json
+import sqlite3
+from datetime import date
+from db import user_filter
+
+FORMATS = ("csv", "jsonl")
+HABIT_FIELDS = ["user", "name", "description", "frequency", "created_at"]
+CHECK_IN_FIELDS = ["user", "name", "date"]
+FREQUENCIES = ("daily", "weekly")
+
+# Rows per fetchmany / executemany call, and rows between two progress reports.
+CHUNK_SIZE = 10_000
+PROGRESS_EVERY = 100_000
+
+
+def detect_format(path, fmt=None):
+    """
+    Finds the file format from an explicit choice or the file extension.
+
+    :param path: File name.
+    :param fmt: 'csv', 'jsonl' or None to use the extension.
+    :return: 'csv' or 'jsonl'.
+    :raises ValueError: If the format cannot be determined.
+    """
+    if fmt is None:
+        fmt = str(path).rsplit(".", 1)[-1].lower()
+        fmt = "jsonl" if fmt in ("json", "ndjson") else fmt
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format '{fmt}'. Choose one of: {', '.join(FORMATS)}")
+    return fmt
+
+
+# Reading from the database
+
+def iter_habit_rows(db, user=None, chunk_size=CHUNK_SIZE):
+    """
+    Streams the habits from the database.
+
+    :param db: SQLite database connection.
+    :param user: Only export the habits of this user (default: all users).
+    :param chunk_size: Rows fetched per round trip.
+    :return: Generator of dictionaries with the keys of HABIT_FIELDS.
+    """
+    where, params = user_filter(user)
+    cur = db.execute(f"""SELECT h.user_id, h.name, h.description, h.frequency, h.created_at
+        FROM habits h {where} ORDER BY h.id""", params)
+    while True:
+        rows = cur.fetchmany(chunk_size)
+        if not rows:
+            return
+        for row in rows:
+            yield dict(zip(HABIT_FIELDS, row))
+
+
+def iter_check_in_rows(db, user=None, chunk_size=CHUNK_SIZE):
+    """
+    Streams the check-ins from the database, ordered by habit and date.
+
+    :param db: SQLite database connection.
+    :param user: Only export the check-ins of this user (default: all users).
+    :param chunk_size: Rows fetched per round trip.
+    :return: Generator of dictionaries with the keys of CHECK_IN_FIELDS.
+    """
+    where, params = user_filter(user)
+    cur = db.execute(f"""SELECT h.user_id, h.name, c.day
+        FROM habits h JOIN check_ins c ON c.habit_id = h.id {where}
+        ORDER BY h.id, c.day""", params)
+    fromordinal = date.fromordinal
+    while True:
+        rows = cur.fetchmany(chunk_size)
+        if not rows:
+            return
+        for user_id, name, day in rows:
+            yield {"user": user_id, "name": name, "date": fromordinal(day).isoformat()}
+
+
+# Files
+
+def write_rows(rows, file, fmt, fields, progress=None):
+    """
+    Writes rows to an open text file as they come.
+
+    :param rows: Iterable of dictionaries.
+    :param file: Text file opened for writing (with newline='' for CSV).
+    :param fmt: 'csv' or 'jsonl'.
+    :param fields: Column names (order of the CSV columns).
+    :param progress: Optional function called with the number of rows written so far.
+    :return: Number of rows written.
+    """
+    count = 0
+    if fmt == "csv":
+        writer = csv.writer(file)
+        writer.writerow(fields)
+        write = lambda row: writer.writerow([row[field] for field in fields])  # noqa: E731
+    else:
+        dumps = json.dumps
+        write = lambda row: file.write(dumps(row) + "\n")  # noqa: E731
+
+    for row in rows:
+        write(row)
+        count += 1
+        if progress is not None and count % PROGRESS_EVERY == 0:
+            progress(count)
+    if progress is not None:
+        progress(count)
+    return count
+
+
+def read_rows(file, fmt):
+    """
+    Reads rows from an open text file one by one.
+    CSV files need a header line with the column names.
+
+    :param file: Text file opened for reading (with newline='' for CSV).
+    :param fmt: 'csv' or 'jsonl'.
+    :return: Generator of dictionaries.
+    """
+    if fmt == "csv":
+        yield from csv.DictReader(file)
+        return
+    for number, line in enumerate(file, start=1):
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except ValueError:
+                raise ValueError(f"Invalid JSON in line {number}") from None
+
+
+# Writing to the database
+
+def import_habits(db, rows, user="", dedup=True, chunk_size=CHUNK_SIZE, progress=None):
+    """
+    Imports habits in one transaction, with chunked executemany calls.
+
+    :param db: SQLite database connection.
+    :param rows: Iterable of dictionaries with name, description, frequency ('daily' or 'weekly'),
+                 created_at (ISO date) and optionally user.
+    :param user: User for rows without a user.
+    :param dedup: Skip habits that exist already; if False, an existing habit is an error.
+    :param chunk_size: Rows per executemany call.
+    :param progress: Optional function called with the number of rows read so far.
+    :return: Dictionary with the numbers of rows read and habits added.
+    :raises ValueError: If a row is invalid or a habit exists and dedup is False
+                        (nothing is written then).
+    """
+    insert = f"""INSERT {'OR IGNORE ' if dedup else ''}INTO habits
+        (user_id, name, description, frequency, created_at) VALUES (?, ?, ?, ?, ?)"""
+    today = date.today().isoformat()
+    fromisoformat = date.fromisoformat
+    read = 0
+    try:
+        with db:
+            before = db.total_changes
+            chunk = []
+            for read, row in enumerate(rows, start=1):
+                try:
+                    name = row["name"]
+                    frequency = row.get("frequency") or "daily"
+                    created_at = row.get("created_at")
+                    created_at = fromisoformat(created_at).isoformat() if created_at else today
+                    if not isinstance(name, str) or not name or frequency not in FREQUENCIES:
+                        raise ValueError
+                except (KeyError, AttributeError, TypeError, ValueError):
+                    raise ValueError(f"Missing habit name, invalid frequency or invalid date in row {read}") from None
+                chunk.append((row.get("user") or user, name, row.get("description") or "", frequency, created_at))
+                if len(chunk) >= chunk_size:
+                    db.executemany(insert, chunk)
+                    chunk = []
+                if progress is not None and read % PROGRESS_EVERY == 0:
+                    progress(read)
+            db.executemany(insert, chunk)
+            added = db.total_changes - before
+    except sqlite3.IntegrityError as error:
+        raise ValueError(f"Import failed, a habit exists already: {error}") from None
+    if progress is not None:
+        progress(read)
+    return {"rows": read, "added": added}
+
+
+def import_check_ins(db, rows, user="", dedup=True, create_missing=None, chunk_size=CHUNK_SIZE, progress=None):
+    """
+    Imports check-ins in one transaction, with chunked executemany calls.
+    Only the ids of the habits seen so far are kept in memory.
+
+    :param db: SQLite database connection.
+    :param rows: Iterable of dictionaries with name, date (ISO) and optionally user.
+    :param user: User for rows without a user.
+    :param dedup: Skip check-ins that exist already; if False, an existing check-in is an error.
+    :param create_missing: Frequency for habits that do not exist yet, or None to fail on them.
+    :param chunk_size: Rows per executemany call.
+    :param progress: Optional function called with the number of rows read so far.
+    :return: Dictionary with the numbers of rows read, check-ins added and habits created.
+    :raises KeyError: If a habit does not exist and create_missing is None.
+    :raises ValueError: If a row is invalid or a check-in exists and dedup is False.
+                        Nothing is written in both cases.
+    """
+    insert = f"INSERT {'OR IGNORE ' if dedup else ''}INTO check_ins (habit_id, day) VALUES (?, ?)"
+    created_at = date.today().isoformat()
+    fromisoformat = date.fromisoformat
+    ids = {}
+    read = created = 0
+    try:
+        with db:
+            before = db.total_changes
+            chunk = []
+            for read, row in enumerate(rows, start=1):
+                try:
+                    key = (row.get("user") or user, row["name"])
+                    day = fromisoformat(row["date"]).toordinal()
+                    if not isinstance(key[1], str) or not key[1]:
+                        raise ValueError
+                except (KeyError, AttributeError, TypeError, ValueError):
+                    raise ValueError(f"Missing habit name or invalid date in row {read}") from None
+
+                habit_id = ids.get(key)
+                if habit_id is None:
+                    found = db.execute("SELECT id FROM habits WHERE user_id = ? AND name = ?", key).fetchone()
+                    if found is not None:
+                        habit_id = found[0]
+                    elif create_missing is None:
+                        raise KeyError(f"Unknown habit '{key[1]}' in row {read}")
+                    else:
+                        habit_id = db.execute("""INSERT INTO habits (user_id, name, description, frequency, created_at)
+                            VALUES (?, ?, '', ?, ?)""", key + (create_missing, created_at)).lastrowid
+                        created += 1
+                    ids[key] = habit_id
+
+                chunk.append((habit_id, day))
+                if len(chunk) >= chunk_size:
+                    db.executemany(insert, chunk)
+                    chunk = []
+                if progress is not None and read % PROGRESS_EVERY == 0:
+                    progress(read)
+            db.executemany(insert, chunk)
+            added = db.total_changes - before - created
+    except sqlite3.IntegrityError as error:
+        raise ValueError(f"Import failed, a check-in exists already: {error}") from None
+    if progress is not None:
+        progress(read)
+    return {"rows": read, "added": added, "habits_created": created}
+
+
+def export_file(db, path, kind="check-ins", fmt=None, user=None, progress=None):
+    """
+    Exports habits or check-ins to a CSV or JSONL file.
+
+    :param db: SQLite database connection.
+    :param path: File name.
+    :param kind: 'habits' or 'check-ins'.
+    :param fmt: 'csv', 'jsonl' or None to use the file extension.
+    :param user: Only export the data of this user (default: all users).
+    :param progress: Optional function called with the number of rows written so far.
+    :return: Number of rows written.
+    """
+    fmt = detect_format(path, fmt)
+    if kind == "habits":
+        rows, fields = iter_habit_rows(db, user), HABIT_FIELDS
+    else:
+        rows, fields = iter_check_in_rows(db, user), CHECK_IN_FIELDS
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        return write_rows(rows, file, fmt, fields, progress)
+
+
+def import_file(db, path, kind="check-ins", fmt=None, **options):
+    """
+    Imports habits or check-ins from a CSV or JSONL file.
+
+    :param db: SQLite database connection.
+    :param path: File name.
+    :param kind: 'habits' or 'check-ins'.
+    :param fmt: 'csv', 'jsonl' or None to use the file extension.
+    :param options: Further arguments of import_habits or import_check_ins.
+    :return: Result dictionary of the import.
+    """
+    fmt = detect_format(path, fmt)
+    with open(path, newline="", encoding="utf-8") as file:
+        rows = read_rows(file, fmt)
+        if kind == "habits":
+            return import_habits(db, rows, **options)
+        return import_check_ins(db, rows, **options)
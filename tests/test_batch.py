@@ -0,0 +1,147 @@
+import io
+import json
+from datetime import date, timedelta
+import db_analyze
+from batch import run
+from db import get_db, load_habits
+
+
+def _run(path, *argv):
+    """Runs a batch command and returns (exit status, parsed output or error)."""
+    out, err = io.StringIO(), io.StringIO()
+    status = run(["--db", path, *argv], out=out, err=err)
+    text = out.getvalue() if status == 0 else err.getvalue()
+    return status, json.loads(text)
+
+
+def _habits(path):
+    db = get_db(path)
+    habits = load_habits(db)
+    db.close()
+    return habits
+
+
+def test_create_and_check_in(tmp_path):
+    """Should create habits and check them off on several dates in one call."""
+    path = str(tmp_path / "batch.db")
+    assert _run(path, "create", "Read", "Run", "--frequency", "weekly") == (0, {"created": ["Read", "Run"]})
+
+    status, result = _run(path, "checkin", "Read", "Run", "--date", "2025-01-01", "--date", "2025-01-08")
+    assert (status, result) == (0, {"added": 4, "already_recorded": 0})
+    assert _run(path, "checkin", "Read", "--from", "2025-01-07", "--to", "2025-01-09")[1] == \
+        {"added": 2, "already_recorded": 1}
+
+    habits = _habits(path)
+    assert [h.frequency for h in habits] == ["weekly", "weekly"]
+    assert list(habits[0].check_ins) == [date(2025, 1, 1), date(2025, 1, 7), date(2025, 1, 8), date(2025, 1, 9)]
+
+
+def test_check_in_defaults_to_today(tmp_path):
+    """Should check off today without --date."""
+    path = str(tmp_path / "today.db")
+    _run(path, "create", "Read")
+    _run(path, "checkin", "Read")
+    assert list(_habits(path)[0].check_ins) == [date.today()]
+
+
+def test_empty_date_range_fails(tmp_path):
+    """Should reject a range that ends before it starts instead of checking off today."""
+    path = str(tmp_path / "range.db")
+    _run(path, "create", "Read")
+    yesterday = (date.today() - timedelta(days=1)).isoformat()
+    for options in (["--from", "2025-01-09", "--to", "2025-01-07"], ["--to", yesterday]):
+        status, error = _run(path, "checkin", "Read", *options)
+        assert status == 1 and "before it starts" in error["error"]
+    assert len(_habits(path)[0].check_ins) == 0
+
+
+def test_invalid_names_and_database_errors_are_reported(tmp_path):
+    """Should reject blank names and report database errors as JSON instead of raising."""
+    path = str(tmp_path / "errors.db")
+    for name in ("", "  "):
+        status, error = _run(path, "create", "Read", name)
+        assert status == 1 and "name" in error["error"]
+    assert _habits(path) == []
+
+    _run(path, "create", "Read")
+    db = get_db(path)
+    db.execute("DROP TABLE check_ins")
+    db.close()
+    status, error = _run(path, "checkin", "Read")
+    assert status == 1 and "check_ins" in error["error"]
+
+
+def test_unknown_habit_writes_nothing(tmp_path):
+    """Should fail without writing anything if one habit does not exist."""
+    path = str(tmp_path / "unknown.db")
+    _run(path, "create", "Read")
+    status, error = _run(path, "checkin", "Read", "Missing")
+    assert status == 1 and "Missing" in error["error"]
+    assert len(_habits(path)[0].check_ins) == 0
+
+    status, error = _run(path, "create", "Write", "Read")
+    assert status == 1 and "Read" in error["error"]
+    assert [h.name for h in _habits(path)] == ["Read"]
+
+
+def test_report_uses_sql(tmp_path):
+    """Should print the db_analyze reports."""
+    path = str(tmp_path / "report.db")
+    _run(path, "create", "Read")
+    yesterday = date.today() - timedelta(days=1)
+    _run(path, "checkin", "Read", "--from", (yesterday - timedelta(days=2)).isoformat(), "--to", yesterday.isoformat())
+
+    assert _run(path, "report", "streaks")[1] == [["Read", 3]]
+    assert _run(path, "report", "checkin-counts")[1] == [["Read", 3]]
+    assert _run(path, "report", "skipped")[1] == []
+    assert _run(path, "report", "skipped", "--date", (date.today() + timedelta(days=5)).isoformat())[1] == ["Read"]
+
+    db = get_db(path)
+    assert _run(path, "report", "average-streak")[1] == db_analyze.average_streak(db)
+    db.close()
+
+    _run(path, "--user", "alice", "create", "Swim")
+    assert _run(path, "report", "habits")[1] == ["Read", "Swim"]
+    assert _run(path, "--user", "alice", "report", "habits")[1] == ["Swim"]
+    assert _run(path, "--user", "alice", "report", "streaks")[1] == [["Swim", 0]]
+
+
+def test_import_csv(tmp_path):
+    """Should import check-ins from CSV, creating missing habits on request."""
+    path = str(tmp_path / "import.db")
+    source = tmp_path / "check_ins.csv"
+    source.write_text("name,date\nRead,2025-01-01\nRead,2025-01-02\nRun,2025-01-01\nRead,2025-01-01\n")
+
+    status, error = _run(path, "import", str(source))
+    assert status == 1 and "Read" in error["error"]
+    assert _habits(path) == []
+
+    assert _run(path, "import", str(source), "--create-missing", "daily")[1] == \
+        {"rows": 4, "added": 3, "habits_created": 2}
+    assert [len(h.check_ins) for h in _habits(path)] == [2, 1]
+
+
+def test_import_invalid_date(tmp_path):
+    """Should reject invalid dates and write nothing."""
+    path = str(tmp_path / "invalid.db")
+    source = tmp_path / "bad.csv"
+    source.write_text("name,date\nRead,2025-01-01\nRead,yesterday\n")
+    status, error = _run(path, "import", str(source), "--create-missing", "daily")
+    assert status == 1 and "row 2" in error["error"]
+    assert _habits(path) == []
+
+
+def test_export_and_import_jsonl(tmp_path):
+    """Should export check-ins to JSONL and import them into another database."""
+    path = str(tmp_path / "export.db")
+    _run(path, "create", "Read")
+    _run(path, "checkin", "Read", "--from", "2025-01-01", "--to", "2025-01-03")
+    target = tmp_path / "check_ins.jsonl"
+
+    assert _run(path, "export", str(target))[1] == {"rows": 3}
+    copy = str(tmp_path / "copy.db")
+    assert _run(copy, "import", str(target), "--create-missing", "daily")[1] == \
+        {"rows": 3, "added": 3, "habits_created": 1}
+    assert _run(copy, "import", str(target))[1] == {"rows": 3, "added": 0, "habits_created": 0}
+    status, error = _run(copy, "import", str(target), "--no-dedup")
+    assert status == 1 and "exists already" in error["error"]
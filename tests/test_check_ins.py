@@ -0,0 +1,79 @@
+import pytest
+from array import array
+from datetime import date
+from check_ins import CheckInList
+
+
+def test_dates_are_sorted_and_unique():
+    """
+    Tests if the initial dates are sorted and duplicates are removed.
+    """
+    check_ins = CheckInList([date(2025, 1, 3), date(2025, 1, 1), date(2025, 1, 3)])
+    assert list(check_ins) == [date(2025, 1, 1), date(2025, 1, 3)]
+    assert len(check_ins) == 2
+
+
+def test_add_keeps_order():
+    """
+    Tests if added dates are inserted at their sorted position and duplicates are ignored.
+    """
+    check_ins = CheckInList([date(2025, 1, 1), date(2025, 1, 5)])
+
+    assert check_ins.add(date(2025, 1, 3)) is True
+    assert check_ins.add(date(2025, 1, 9)) is True
+    assert check_ins.add(date(2025, 1, 3)) is False
+    assert check_ins == [date(2025, 1, 1), date(2025, 1, 3), date(2025, 1, 5), date(2025, 1, 9)]
+
+
+def test_latest_and_membership():
+    """
+    Tests access to the latest and earliest check-in and membership checks.
+    """
+    check_ins = CheckInList([date(2025, 1, 5), date(2025, 1, 2)])
+    assert check_ins.latest == date(2025, 1, 5)
+    assert check_ins.earliest == date(2025, 1, 2)
+    assert date(2025, 1, 2) in check_ins
+    assert date(2025, 1, 3) not in check_ins
+    assert CheckInList().latest is None
+
+
+def test_remove_and_discard():
+    """
+    Tests removing dates from the collection.
+    """
+    check_ins = CheckInList([date(2025, 1, 1), date(2025, 1, 2)])
+    check_ins.remove(date(2025, 1, 1))
+    assert check_ins.discard(date(2025, 1, 1)) is False
+    assert check_ins.discard(date(2025, 1, 2)) is True
+    assert len(check_ins) == 0
+
+    with pytest.raises(ValueError):
+        check_ins.remove(date(2025, 1, 1))
+
+
+def test_from_ordinals():
+    """
+    Tests creating the collection from day ordinals and reading them back as dates.
+    """
+    first = date(2025, 1, 1).toordinal()
+    check_ins = CheckInList.from_ordinals([first + 2, first, first + 2])
+    assert list(check_ins.ordinals) == [first, first + 2]
+    assert check_ins[-1] == date(2025, 1, 3)
+    assert check_ins[:1] == [date(2025, 1, 1)]
+
+
+def test_from_buffer_copies_on_write():
+    """
+    Tests if a wrapped buffer is read without copying and only copied when the dates change.
+    """
+    data = bytearray(array("i", [date(2025, 1, 1).toordinal(), date(2025, 1, 4).toordinal()]).tobytes())
+    check_ins = CheckInList.from_buffer(memoryview(data).cast("i"))
+    assert check_ins == [date(2025, 1, 1), date(2025, 1, 4)]
+    assert check_ins.latest == date(2025, 1, 4)
+    assert date(2025, 1, 4) in check_ins and date(2025, 1, 2) not in check_ins
+    assert check_ins == CheckInList.from_ordinals(check_ins.ordinals)
+
+    check_ins.add(date(2025, 1, 2))
+    check_ins.discard(date(2025, 1, 1))
+    assert check_ins == [date(2025, 1, 2), date(2025, 1, 4)]
+    assert list(memoryview(data).cast("i")) == [date(2025, 1, 1).toordinal(), date(2025, 1, 4).toordinal()]
@@ -0,0 +1,68 @@
+import pytest
+from datetime import date, timedelta
+from freezegun import freeze_time
+import analyze
+import columnar
+from columnar import CheckInColumns
+from fixtures import generate_test_habits
+from habit import Habit
+
+
+@pytest.fixture(params=[True, False], ids=["numpy", "python"])
+def use_numpy(request, monkeypatch):
+    """Runs a test with the NumPy engine and with the pure Python fallback."""
+    if request.param:
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(columnar, "np", None)
+    return request.param
+
+
+@pytest.fixture
+def demo_habits():
+    """Returns the demo habits plus habits with edge cases (no check-ins, unknown frequency)."""
+    habits = generate_test_habits()
+    empty = Habit("Empty", "Never done", "weekly")
+    monthly = Habit("Monthly", "Unknown frequency", "monthly")
+    monthly.check_ins = [date(2025, 1, 1), date(2025, 1, 2)]
+    return habits + [empty, monthly]
+
+
+def test_current_streaks_match_habits(demo_habits, use_numpy):
+    """Should compute the same current streaks as Habit.current_streak."""
+    columns = CheckInColumns(demo_habits)
+    assert columns.current_streaks() == [h.current_streak() for h in demo_habits]
+
+
+@freeze_time("2025-01-27")
+def test_skipped_matches_habits(demo_habits, use_numpy):
+    """Should compute the same skipped flags as Habit.habit_skipped."""
+    columns = CheckInColumns(demo_habits)
+    assert columns.skipped() == [h.habit_skipped() for h in demo_habits]
+
+
+@freeze_time("2025-02-05")
+def test_reports_match_analyze(demo_habits, use_numpy):
+    """Should return the same results as the functions in analyze.py."""
+    assert columnar.get_longest_streak_overall(demo_habits) == analyze.get_longest_streak_overall(demo_habits)
+    assert columnar.checkin_counts(demo_habits) == analyze.checkin_counts(demo_habits)
+    assert columnar.skipped_habits(demo_habits) == analyze.skipped_habits(demo_habits)
+    assert columnar.habit_frequency_summary(demo_habits) == analyze.habit_frequency_summary(demo_habits)
+    assert columnar.average_streak(demo_habits) == analyze.average_streak(demo_habits)
+    assert columnar.habits_by_streak(demo_habits) == analyze.habits_by_streak(demo_habits)
+
+
+def test_empty_input(use_numpy):
+    """Should handle an empty list of habits."""
+    assert columnar.get_longest_streak_overall([]) == (None, 0)
+    assert columnar.average_streak([]) == 0
+    assert CheckInColumns([]).current_streaks() == []
+
+
+def test_long_weekly_history(use_numpy):
+    """Should find the current streak at the end of a long weekly history."""
+    habit = Habit("Long walk", "Walk once a week", "weekly")
+    start = date(2020, 1, 1)
+    habit.check_ins = [start + timedelta(days=7 * i) for i in range(200)] + [start + timedelta(days=1500)]
+    columns = CheckInColumns([habit])
+    assert columns.current_streaks() == [habit.current_streak()]
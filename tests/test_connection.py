@@ -0,0 +1,99 @@
+import threading
+import pytest
+import connection
+from connection import connect, ConnectionPool
+from db import get_db
+from migrations import SCHEMA_VERSION, schema_version
+
+
+def _pragma(db, name):
+    return db.execute(f"PRAGMA {name}").fetchone()[0]
+
+
+def test_wal_profile(tmp_path):
+    """Should open the database in WAL mode with the tuned pragmas."""
+    db = connect(str(tmp_path / "wal.db"), "wal")
+    assert _pragma(db, "journal_mode") == "wal"
+    assert _pragma(db, "synchronous") == 1  # NORMAL
+    assert _pragma(db, "cache_size") == -16384
+    assert _pragma(db, "temp_store") == 2  # MEMORY
+    assert _pragma(db, "busy_timeout") == 5000
+    db.close()
+
+
+def test_safe_profile(tmp_path):
+    """Should keep the rollback journal and full fsync."""
+    db = connect(str(tmp_path / "safe.db"), "safe")
+    assert _pragma(db, "journal_mode") == "delete"
+    assert _pragma(db, "synchronous") == 2  # FULL
+    db.close()
+
+
+def test_unknown_profile(tmp_path):
+    """Should reject unknown profiles."""
+    with pytest.raises(ValueError):
+        connect(str(tmp_path / "x.db"), "fast")
+    assert get_db(str(tmp_path / "x.db"), "fast") is None
+
+
+def test_unknown_profile_in_environment(monkeypatch, capsys):
+    """Should fall back to the wal profile with a message if the environment names an unknown one."""
+    monkeypatch.setenv("HABIT_TRACKER_DB_PROFILE", "fast")
+    assert connection._default_profile() == "wal"
+    assert "fast" in capsys.readouterr().out
+    monkeypatch.setenv("HABIT_TRACKER_DB_PROFILE", "safe")
+    assert connection._default_profile() == "safe"
+
+
+def test_pool_migrates_and_reuses(tmp_path):
+    """Should create the schema and hand out the same connection again."""
+    pool = ConnectionPool(str(tmp_path / "pool.db"), size=2)
+    with pool.connection() as db:
+        assert schema_version(db) == SCHEMA_VERSION
+        first = db
+    with pool.connection() as db:
+        assert db is first
+    assert len(pool) == 1
+    pool.close()
+    assert len(pool) == 0
+
+
+def test_pool_rolls_back_open_transactions(tmp_path):
+    """Should roll back changes that were not committed when a connection is returned."""
+    pool = ConnectionPool(str(tmp_path / "pool.db"), size=1)
+    with pool.connection() as db:
+        db.execute("INSERT INTO habits (name, frequency) VALUES ('Read', 'daily')")
+    with pool.connection() as db:
+        assert db.execute("SELECT COUNT(*) FROM habits").fetchone()[0] == 0
+    pool.close()
+
+
+def test_pool_timeout(tmp_path):
+    """Should raise TimeoutError when all connections are borrowed."""
+    pool = ConnectionPool(str(tmp_path / "pool.db"), size=1, timeout=0.05)
+    with pool.connection():
+        with pytest.raises(TimeoutError):
+            with pool.connection():
+                pass
+    pool.close()
+
+
+def test_pool_threads(tmp_path):
+    """Should let several threads write and read through the pool."""
+    pool = ConnectionPool(str(tmp_path / "pool.db"), size=3)
+
+    def work(index):
+        with pool.connection() as db:
+            with db:
+                db.execute("INSERT INTO habits (name, frequency) VALUES (?, 'daily')", (f"Habit {index}",))
+
+    threads = [threading.Thread(target=work, args=(i,)) for i in range(12)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    with pool.connection() as db:
+        assert db.execute("SELECT COUNT(*) FROM habits").fetchone()[0] == 12
+    assert len(pool) <= 3
+    pool.close()
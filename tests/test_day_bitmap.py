@@ -0,0 +1,96 @@
+import random
+import pytest
+from datetime import date, timedelta
+from freezegun import freeze_time
+from analyze import checkins_between, skipped_habits_as_of, longest_streaks_ever
+from day_bitmap import DayBitmap
+from fixtures import generate_test_habits
+from habit import Habit
+
+
+@pytest.fixture
+def demo_habits():
+    """Returns 5 predefined habits with realistic check-in data."""
+    return generate_test_habits()
+
+
+def test_streaks_match_habit(demo_habits):
+    """Should compute the same current and longest streaks as Habit."""
+    for habit in demo_habits:
+        bitmap = DayBitmap.from_habit(habit)
+        assert bitmap.current_streak(habit.frequency) == habit.current_streak()
+        assert bitmap.longest_streak(habit.frequency) == habit.longest_streak()
+        assert len(bitmap) == len(habit.check_ins)
+
+
+@pytest.mark.parametrize("frequency", ["daily", "weekly", "monthly"])
+def test_streaks_match_habit_on_random_history(frequency):
+    """Should match Habit on random histories with gaps of different lengths."""
+    rng = random.Random(42)
+    for _ in range(20):
+        habit = Habit("Random", "Random gaps", frequency)
+        day = date(2024, 1, 1)
+        check_ins = []
+        for _ in range(rng.randint(1, 60)):
+            day += timedelta(days=rng.choice([1, 1, 2, 5, 7, 8, 12]))
+            check_ins.append(day)
+        habit.check_ins = check_ins
+        bitmap = DayBitmap.from_habit(habit)
+        assert bitmap.current_streak(frequency) == habit.current_streak()
+        assert bitmap.longest_streak(frequency) == habit.longest_streak()
+
+
+def test_skipped_matches_habit(demo_habits):
+    """Should give the same skip result as Habit.habit_skipped for the same day."""
+    for today in ["2025-01-28", "2025-01-30", "2025-02-05"]:
+        with freeze_time(today):
+            expected = [habit for habit in demo_habits if habit.habit_skipped()]
+        assert skipped_habits_as_of(demo_habits, date.fromisoformat(today)) == expected
+
+
+def test_skipped_ignores_later_check_ins(demo_habits):
+    """Should only look at check-ins up to the reference date."""
+    skipped = [habit.name for habit in skipped_habits_as_of(demo_habits, date(2025, 1, 17))]
+    assert skipped == ["Stay social", "Yoga practice"]
+
+
+def test_count_in_window(demo_habits):
+    """Should count the check-ins inside a date window."""
+    counts = dict(checkins_between(demo_habits, date(2025, 1, 10), date(2025, 1, 14)))
+    assert counts["Stay social"] == 5
+    assert counts["Read a book"] == 1
+    assert counts["Yoga practice"] == 3
+
+
+def test_longest_streaks_ever(demo_habits):
+    """Should report the longest streak each habit reached."""
+    longest = dict(longest_streaks_ever(demo_habits))
+    assert longest["Yoga practice"] == 7
+    assert longest["Listen to Blinkist"] == 28
+
+
+def test_empty_bitmap():
+    """Should handle habits without check-ins."""
+    bitmap = DayBitmap.from_habit(Habit("Empty", "Nothing yet", "daily"))
+    assert bitmap.current_streak("daily") == 0
+    assert bitmap.longest_streak("weekly") == 0
+    assert bitmap.skipped("daily") is True
+
+
+def test_habit_keeps_its_bitmap_up_to_date():
+    """Should reuse the bitmap of a habit and update it when check-ins change."""
+    habit = Habit("Cached", "Bitmap cache", "daily")
+    habit.created_at = date(2024, 1, 10)
+    habit.check_ins = [date(2024, 1, 10), date(2024, 1, 11)]
+    bitmap = habit.day_bitmap()
+    assert habit.day_bitmap() is bitmap
+
+    habit.check_ins.add(date(2024, 1, 12))
+    habit.check_ins.remove(date(2024, 1, 10))
+    assert habit.day_bitmap() is bitmap
+    assert bitmap.bits == DayBitmap.from_habit(habit).bits
+
+    # A check-in before the start of the bitmap rebuilds it.
+    habit.check_ins.add(date(2024, 1, 1))
+    assert habit.day_bitmap().count(date(2024, 1, 1), date(2024, 1, 31)) == 3
+    assert habit.day_bitmap().longest_streak("daily") == 2
@@ -1,5 +1,8 @@
 import os
-from db import get_db, save_habit, load_habits
+from datetime import date
+from db import get_db, save_habit, load_habits, iter_habits, save_changes
+from habit_manager import HabitManager
+from habit import Habit
 from fixtures import generate_test_habits
 
 class TestDatabase:
@@ -34,3 +37,117 @@ class TestDatabase:
             assert original.name == restored.name
             assert original.frequency == restored.frequency
             assert len(original.check_ins) == len(restored.check_ins)
+
+    def test_iter_habits_streams_in_chunks(self):
+        """
+        Tests if streaming with a small chunk size groups check-ins into the right habits.
+        """
+        for habit in self.demo_habits:
+            save_habit(self.db, habit)
+        save_habit(self.db, Habit("No check-ins", "Not started yet", "daily"))
+
+        streamed = list(iter_habits(self.db, chunk_size=3))
+
+        assert [h.name for h in streamed] == [h.name for h in self.demo_habits] + ["No check-ins"]
+        for original, restored in zip(self.demo_habits, streamed):
+            assert list(original.check_ins) == list(restored.check_ins)
+        assert len(streamed[-1].check_ins) == 0
+
+    def test_check_ins_are_read_by_primary_key(self):
+        """
+        Tests if loading check-ins searches the (habit_id, day) primary key instead of scanning the table.
+        """
+        plan = self.db.execute("""EXPLAIN QUERY PLAN
+            SELECT day FROM check_ins WHERE habit_id = ? ORDER BY day""", (1,)).fetchall()
+        assert any("PRIMARY KEY" in row[-1] for row in plan)
+        assert not any("TEMP B-TREE" in row[-1] for row in plan)
+
+    def _saved_manager(self):
+        """
+        Saves the demo habits through a HabitManager and returns the manager.
+        """
+        manager = HabitManager()
+        for habit in self.demo_habits:
+            manager.add_habit(habit)
+        assert save_changes(self.db, manager)
+        return manager
+
+    def test_save_changes_writes_only_deltas(self):
+        """
+        Tests if checking off one habit writes a single row and unchanged habits are not touched.
+        """
+        manager = self._saved_manager()
+        assert not manager.has_changes()
+
+        before = self.db.total_changes
+        manager.get_habit("Read a book").check_off()
+        assert save_changes(self.db, manager)
+        assert self.db.total_changes - before == 1
+
+        restored = {h.name: h for h in load_habits(self.db)}
+        assert date.today() in restored["Read a book"].check_ins
+        assert len(restored["Read a book"].check_ins) == 4
+
+    def test_save_changes_rename_edit_and_delete(self):
+        """
+        Tests if renames, metadata edits, removed check-ins and deleted habits are persisted.
+        """
+        manager = self._saved_manager()
+        habit = manager.get_habit("Yoga practice")
+        habit.name = "Yoga"
+        habit.description = "Short yoga session"
+        habit.check_ins.remove(date(2025, 1, 25))
+        manager.remove_habit("Stay social")
+        assert save_changes(self.db, manager)
+
+        restored = {h.name: h for h in load_habits(self.db)}
+        assert "Yoga practice" not in restored
+        assert "Stay social" not in restored
+        assert restored["Yoga"].description == "Short yoga session"
+        assert len(restored["Yoga"].check_ins) == 13
+        assert list(restored) == [h.name for h in manager.habits]
+
+    def test_rename_is_a_single_update(self):
+        """
+        Tests if renaming a saved habit writes one row, no matter how many check-ins it has.
+        """
+        manager = self._saved_manager()
+        habit = manager.get_habit("Listen to Blinkist")
+        habit_id = habit.id
+
+        before = self.db.total_changes
+        manager.rename_habit("Listen to Blinkist", "Blinkist")
+        assert save_changes(self.db, manager)
+        assert self.db.total_changes - before == 1
+
+        restored = {h.name: h for h in load_habits(self.db)}
+        assert restored["Blinkist"].id == habit_id
+        assert len(restored["Blinkist"].check_ins) == 28
+
+    def test_rename_then_create_with_the_old_name(self):
+        """
+        Tests if a new habit may take the name a habit was renamed from in the same save,
+        without merging into the renamed habit's row.
+        """
+        manager = self._saved_manager()
+        renamed = manager.get_habit("Listen to Blinkist")
+        manager.rename_habit("Listen to Blinkist", "Blinkist")
+        manager.create_habit("Listen to Blinkist", "Podcasts", "weekly")
+        assert save_changes(self.db, manager)
+        assert renamed.id != manager.get_habit("Listen to Blinkist").id
+
+        restored = {h.name: h for h in load_habits(self.db)}
+        assert len(restored["Blinkist"].check_ins) == 28
+        assert restored["Listen to Blinkist"].description == "Podcasts"
+        assert len(restored["Listen to Blinkist"].check_ins) == 0
+
+    def test_new_habit_with_a_taken_name_is_not_merged(self):
+        """
+        Tests if a new habit whose name is stored already is rejected instead of overwriting that habit.
+        """
+        manager = self._saved_manager()
+        other = HabitManager()
+        other.create_habit("Listen to Blinkist", "Other", "daily")
+        assert not save_changes(self.db, other)
+        restored = {h.name: h for h in load_habits(self.db)}
+        assert len(restored["Listen to Blinkist"].check_ins) == 28
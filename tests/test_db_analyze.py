@@ -0,0 +1,108 @@
+import pytest
+from datetime import date
+from freezegun import freeze_time
+import analyze
+import db_analyze
+from db import get_db, save_changes
+from fixtures import generate_test_habits
+from habit import Habit
+from habit_manager import HabitManager
+
+
+@pytest.fixture
+def stored(tmp_path):
+    """Saves the demo habits plus edge cases into a test database and returns (db, habits)."""
+    db = get_db(str(tmp_path / "analyze.db"))
+    manager = HabitManager()
+    for habit in generate_test_habits():
+        manager.add_habit(habit)
+    manager.add_habit(Habit("Empty", "Never done", "weekly"))
+    monthly = Habit("Monthly", "Unknown frequency", "monthly")
+    monthly.check_ins = [date(2025, 1, 1), date(2025, 1, 2)]
+    manager.add_habit(monthly)
+    save_changes(db, manager)
+    yield db, list(manager.habits)
+    db.close()
+
+
+def _names(habits):
+    return [habit.name for habit in habits]
+
+
+def test_lists_match(stored):
+    """Should list the same habits as analyze.py."""
+    db, habits = stored
+    assert db_analyze.list_all_habits(db) == analyze.list_all_habits(habits)
+    for frequency in ["daily", "weekly"]:
+        assert db_analyze.list_habits_by_frequency(db, frequency) == \
+            _names(analyze.list_habits_by_frequency(habits, frequency))
+
+
+def test_counts_and_summary_match(stored):
+    """Should count check-ins and frequencies like analyze.py."""
+    db, habits = stored
+    assert db_analyze.checkin_counts(db) == analyze.checkin_counts(habits)
+    assert db_analyze.habit_frequency_summary(db) == analyze.habit_frequency_summary(habits)
+
+
+@pytest.mark.parametrize("today", ["2025-01-20", "2025-01-28", "2025-02-05"])
+def test_skipped_matches(stored, today):
+    """Should find the same skipped habits as analyze.py."""
+    db, habits = stored
+    with freeze_time(today):
+        assert db_analyze.skipped_habits(db) == _names(analyze.skipped_habits(habits))
+
+
+def test_streaks_match(stored):
+    """Should compute the same current and longest streaks as the Habit objects."""
+    db, habits = stored
+    assert db_analyze.current_streaks(db) == [(h.name, h.current_streak()) for h in habits]
+    assert db_analyze.longest_streaks(db) == [(h.name, h.longest_streak()) for h in habits]
+    assert db_analyze.average_streak(db) == analyze.average_streak(habits)
+
+    top, streak = analyze.get_longest_streak_overall(habits)
+    assert db_analyze.get_longest_streak_overall(db) == (top.name, streak)
+    assert db_analyze.habits_by_streak(db) == [(h.name, h.current_streak()) for h in analyze.habits_by_streak(habits)]
+    for habit in habits:
+        assert db_analyze.get_longest_streak_of(db, habit.name) == analyze.get_longest_streak_of(habits, habit.name)
+
+
+def test_empty_database(tmp_path):
+    """Should handle a database without habits."""
+    db = get_db(str(tmp_path / "empty.db"))
+    assert db_analyze.get_longest_streak_overall(db) == (None, 0)
+    assert db_analyze.average_streak(db) == 0
+    assert db_analyze.get_longest_streak_of(db, "Missing") == 0
+    db.close()
+
+
+def test_habit_summaries_match(stored):
+    """Should combine counts, streaks and skipped flags of every habit like analyze.py."""
+    db, habits = stored
+    with freeze_time("2025-01-28"):
+        skipped = set(_names(analyze.skipped_habits(habits)))
+        assert db_analyze.habit_summaries(db) == [
+            ("", h.name, h.frequency, len(h.check_ins), h.current_streak(), h.name in skipped) for h in habits]
+
+
+def test_reports_of_one_user(stored):
+    """Should only look at the habits of the given user."""
+    db, habits = stored
+    other = HabitManager()
+    for habit in generate_test_habits():
+        habit.check_ins = [date(2024, 1, 1)]
+        other.add_habit(habit)
+    save_changes(db, other, user="alice")
+
+    assert len(db_analyze.list_all_habits(db)) == len(habits) + len(other)
+    assert db_analyze.list_all_habits(db, user="") == analyze.list_all_habits(habits)
+    assert db_analyze.checkin_counts(db, user="alice") == [(h.name, 1) for h in other.habits]
+    assert db_analyze.current_streaks(db, user="") == [(h.name, h.current_streak()) for h in habits]
+    assert db_analyze.longest_streaks(db, user="alice") == [(h.name, 1) for h in other.habits]
+    assert db_analyze.habit_frequency_summary(db, user="") == analyze.habit_frequency_summary(habits)
+    assert db_analyze.list_habits_by_frequency(db, "daily", user="alice") == \
+        _names(analyze.list_habits_by_frequency(list(other.habits), "daily"))
+    with freeze_time("2025-01-28"):
+        assert db_analyze.skipped_habits(db, user="") == _names(analyze.skipped_habits(habits))
+    for habit in habits:
+        assert db_analyze.get_longest_streak_of(db, habit.name, user="") == habit.current_streak()
@@ -0,0 +1,72 @@
+import random
+import pytest
+from datetime import date
+from db import get_db, load_habits
+from fixtures import generate_test_habits, synthetic_check_ins, build_synthetic_db
+
+
+def _rows(path):
+    db = get_db(str(path))
+    habits = db.execute("SELECT * FROM habits ORDER BY id").fetchall()
+    check_ins = db.execute("SELECT * FROM check_ins ORDER BY habit_id, day").fetchall()
+    db.close()
+    return habits, check_ins
+
+
+def test_demo_habits():
+    """Should return the five demo habits with check-ins."""
+    habits = generate_test_habits()
+    assert len(habits) == 5
+    assert all(habit.check_ins for habit in habits)
+
+
+def test_synthetic_check_ins_follow_frequency():
+    """Should generate ascending days, one week apart for weekly habits."""
+    first = date(2020, 1, 1).toordinal()
+    days = list(synthetic_check_ins(random.Random(1), 'weekly', first, 100))
+    assert days == sorted(set(days))
+    assert all((day - first) % 7 == 0 for day in days)
+    assert days[-1] < first + 700
+
+
+def test_synthetic_check_ins_adherence():
+    """Should check in on about `adherence` of all periods."""
+    first = date(2020, 1, 1).toordinal()
+    rng = random.Random(7)
+    done = len(list(synthetic_check_ins(rng, 'daily', first, 20000, adherence=0.6)))
+    assert done / 20000 == pytest.approx(0.6, abs=0.05)
+    assert list(synthetic_check_ins(rng, 'daily', first, 10, adherence=1)) == list(range(first, first + 10))
+    assert list(synthetic_check_ins(rng, 'daily', first, 10, adherence=0)) == []
+
+
+def test_build_synthetic_db_is_deterministic(tmp_path):
+    """Should write the same rows for the same seed and different rows for another seed."""
+    first = build_synthetic_db(str(tmp_path / "a.db"), habits=20, years=1, seed=3)
+    second = build_synthetic_db(str(tmp_path / "b.db"), habits=20, years=1, seed=3)
+    other = build_synthetic_db(str(tmp_path / "c.db"), habits=20, years=1, seed=4)
+
+    assert first == second == len(_rows(tmp_path / "a.db")[1])
+    assert _rows(tmp_path / "a.db") == _rows(tmp_path / "b.db")
+    assert _rows(tmp_path / "a.db") != _rows(tmp_path / "c.db")
+    assert other > 0
+
+
+def test_build_synthetic_db_frequency_mix(tmp_path):
+    """Should create only daily habits with daily_share=1, loadable as Habit objects."""
+    build_synthetic_db(str(tmp_path / "daily.db"), habits=5, years=1, daily_share=1, adherence=1)
+    db = get_db(str(tmp_path / "daily.db"))
+    habits = load_habits(db)
+    db.close()
+
+    assert [habit.frequency for habit in habits] == ['daily'] * 5
+    assert all(len(habit.check_ins) == 366 for habit in habits)  # 2020 is a leap year
+    assert all(habit.current_streak() == 366 for habit in habits)
+
+
+def test_build_synthetic_db_from_leap_day(tmp_path):
+    """Should end a range that starts on February 29 on February 28 of a non-leap year."""
+    path = str(tmp_path / "leap.db")
+    assert build_synthetic_db(path, habits=1, years=1, daily_share=1, adherence=1, start=date(2024, 2, 29)) == 365
+    db = get_db(path)
+    assert load_habits(db)[0].check_ins.latest == date(2025, 2, 27)
+    db.close()
@@ -61,3 +61,51 @@ def test_habit_skipped_weekly():
     habit.check_ins = [ten_days_ago]
 
     assert habit.habit_skipped() is True
+
+
+def test_check_ins_assigned_as_list():
+    """
+    Tests if a plain list assigned to check_ins is stored sorted and without duplicates.
+    """
+    habit = Habit("Stretching", "Stretch every morning", "daily")
+    today = date.today()
+    habit.check_ins = [today, today - timedelta(days=1), today]
+
+    assert list(habit.check_ins) == [today - timedelta(days=1), today]
+    assert habit.current_streak() == 2
+
+
+def test_streaks_follow_added_check_ins():
+    """
+    Tests if current and longest streak stay correct while check-ins are appended and backfilled.
+    """
+    habit = Habit("Exercise", "Go running", "daily")
+    start = date(2025, 1, 1)
+    habit.check_ins = [start, start + timedelta(days=1), start + timedelta(days=4)]
+    assert habit.current_streak() == 1
+    assert habit.longest_streak() == 2
+
+    habit.check_ins.add(start + timedelta(days=5))
+    assert habit.current_streak() == 2
+
+    habit.check_ins.add(start + timedelta(days=3))
+    habit.check_ins.add(start + timedelta(days=2))
+    assert habit.current_streak() == 6
+    assert habit.longest_streak() == 6
+
+
+def test_streaks_after_removal_and_frequency_change():
+    """
+    Tests if streaks are recomputed after a check-in is removed or the frequency changes.
+    """
+    habit = Habit("Call parents", "Call once a week", "daily")
+    start = date(2025, 1, 1)
+    habit.check_ins = [start, start + timedelta(days=1), start + timedelta(days=7)]
+    assert habit.current_streak() == 1
+
+    habit.frequency = "weekly"
+    assert habit.current_streak() == 3
+
+    habit.check_ins.remove(start + timedelta(days=7))
+    assert habit.current_streak() == 2
+    assert habit.longest_streak() == 2
@@ -1,3 +1,4 @@
+import pytest
 from datetime import date, timedelta
 from habit_manager import HabitManager
 from habit import Habit
@@ -108,4 +109,98 @@ def test_longest_daily_streak():
 
     top_habit, streak = manager.longest_daily_streak()
     assert top_habit.name == "Journal"
-    assert streak == 2
\ No newline at end of file
+    assert streak == 2
+
+def test_collect_changes_only_visits_dirty_habits():
+    """
+    Tests if only changed habits end up in the collected change set.
+    """
+    manager = HabitManager()
+    manager.create_habit("Reading", "Read 20 pages.", "daily")
+    manager.create_habit("Walking", "Walk 5 km.", "weekly")
+    changes = manager.collect_changes()
+    assert len(changes.inserted) == 2
+    assert not manager.has_changes()
+
+    walking = manager.get_habit("Walking")
+    walking.check_off()
+    changes = manager.collect_changes()
+    assert changes.inserted == [] and changes.updated == []
+    assert changes.added == [(walking, date.today().toordinal())]
+
+    reading = manager.get_habit("Reading")
+    manager.remove_habit("Reading")
+    assert manager.collect_changes().deleted == [reading]
+
+
+def test_duplicate_names_are_rejected():
+    """
+    Tests that two habits with the same name cannot be managed at once.
+    """
+    manager = HabitManager()
+    manager.create_habit("Reading", "Read 20 pages.", "daily")
+    with pytest.raises(ValueError):
+        manager.create_habit("Reading", "Read 50 pages.", "weekly")
+
+
+def test_rename_and_frequency_change_update_indexes():
+    """
+    Tests if renames and frequency changes keep lookups and the insertion order consistent.
+    """
+    manager = HabitManager()
+    for name, frequency in [("A", "daily"), ("B", "weekly"), ("C", "daily"), ("D", "weekly")]:
+        manager.create_habit(name, f"Habit {name}", frequency)
+
+    manager.rename_habit("A", "Alpha")
+    manager.get_habit("C").name = "Gamma"
+    assert manager.get_habit("A") is None
+    assert manager.get_habit("Alpha").description == "Habit A"
+    assert manager.get_habit("Gamma").description == "Habit C"
+    with pytest.raises(ValueError):
+        manager.rename_habit("Alpha", "B")
+
+    manager.get_habit("Gamma").frequency = "weekly"
+    assert [h.name for h in manager.habits_by_frequency("weekly")] == ["B", "Gamma", "D"]
+    assert [h.name for h in manager.habits_by_frequency("daily")] == ["Alpha"]
+
+    manager.remove_habit("B")
+    assert [h.name for h in manager.habits] == ["Alpha", "Gamma", "D"]
+
+
+def test_discard_habit_records_no_deletion():
+    """
+    Tests if a discarded habit leaves all indexes without being deleted on the next save.
+    """
+    manager = HabitManager()
+    manager.create_habit("Reading", "Read 20 pages.", "daily")
+    manager.collect_changes()
+    reading = manager.get_habit("Reading")
+    reading.check_off()
+
+    manager.discard_habit(reading)
+    manager.discard_habit(reading)
+    assert manager.get_habit("Reading") is None
+    assert list(manager.habits) == []
+    assert manager.habits_by_frequency("daily") == []
+    assert not manager.has_changes()
+
+
+def test_setting_a_taken_name_is_rejected():
+    """
+    Tests that renaming a habit directly to the name of another habit fails
+    and leaves both habits reachable.
+    """
+    manager = HabitManager()
+    manager.create_habit("Reading", "Read 20 pages.", "daily")
+    manager.create_habit("Walking", "Walk 5 km.", "weekly")
+    reading = manager.get_habit("Reading")
+
+    with pytest.raises(ValueError):
+        reading.name = "Walking"
+    assert reading.name == "Reading"
+    assert manager.get_habit("Reading") is reading
+    assert manager.get_habit("Walking").description == "Walk 5 km."
+
+    manager.remove_habit("Walking")
+    reading.name = "Walking"
+    assert [h.name for h in manager.habits] == ["Walking"]
@@ -0,0 +1,70 @@
+import os
+from datetime import date
+from db import get_db, load_habits, save_changes
+from fixtures import generate_test_habits
+from habit_manager import HabitManager
+from history_cache import HistoryCache
+
+
+class TestHistoryCache:
+    def setup_method(self):
+        """
+        Called before each test – saves the demo habits into a new test database.
+        """
+        self.test_db_name = "test_history_cache.db"
+        self.db = get_db(self.test_db_name)
+        manager = HabitManager()
+        for habit in generate_test_habits():
+            manager.add_habit(habit)
+        save_changes(self.db, manager)
+
+    def teardown_method(self):
+        """
+        Called after each test – deletes the test database file.
+        """
+        self.db.close()
+        if os.path.exists(self.test_db_name):
+            os.remove(self.test_db_name)
+
+    def test_check_ins_are_loaded_on_first_access(self):
+        """
+        Tests if lazily loaded habits fetch their check-ins only when they are used.
+        """
+        cache = HistoryCache(self.db)
+        habits = load_habits(self.db, history_cache=cache)
+        assert len(cache) == 0
+
+        blinkist = habits[3]
+        assert blinkist.name == "Listen to Blinkist"
+        assert len(blinkist.check_ins) == 28
+        assert blinkist.current_streak() == 28
+        assert len(cache) == 1
+
+    def test_least_recently_used_history_is_evicted(self):
+        """
+        Tests if the cache keeps at most `capacity` histories and keeps the streaks of evicted ones.
+        """
+        cache = HistoryCache(self.db, capacity=2)
+        habits = load_habits(self.db, history_cache=cache)
+        streaks = [habit.current_streak() for habit in habits]
+
+        assert len(cache) == 2
+        assert habits[0]._check_ins is None
+        assert habits[0].current_streak() == streaks[0]
+        assert len(habits[0].check_ins) == 3
+
+    def test_dirty_history_is_saved_before_eviction(self):
+        """
+        Tests if unsaved check-ins are written to the database before a history is evicted.
+        """
+        cache = HistoryCache(self.db, capacity=1)
+        manager = HabitManager()
+        for habit in load_habits(self.db, history_cache=cache):
+            manager.add_habit(habit)
+
+        manager.get_habit("Read a book").check_off()
+        len(manager.get_habit("Yoga practice").check_ins)  # evicts "Read a book"
+
+        restored = {habit.name: habit for habit in load_habits(self.db)}
+        assert date.today() in restored["Read a book"].check_ins
+        assert save_changes(self.db, manager)
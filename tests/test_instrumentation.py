@@ -0,0 +1,74 @@
+import json
+import pytest
+import instrumentation
+from instrumentation import instrumented
+
+
+@pytest.fixture
+def enabled(monkeypatch):
+    """Enables instrumentation for functions decorated inside the test."""
+    monkeypatch.setattr(instrumentation, "ENABLED", True)
+    instrumentation.reset()
+    yield
+    instrumentation.reset()
+
+
+def _name(func):
+    return f"{func.__module__}.{func.__qualname__}"
+
+
+def test_disabled_returns_function(monkeypatch):
+    """Should not wrap functions when instrumentation is disabled."""
+    monkeypatch.setattr(instrumentation, "ENABLED", False)
+
+    def work():
+        return 1
+
+    assert instrumented(work) is work
+
+
+def test_counts_calls_and_latency(enabled):
+    """Should count calls and report total and p95 latency."""
+    @instrumented
+    def work(value):
+        return value * 2
+
+    assert [work(i) for i in range(20)] == [i * 2 for i in range(20)]
+    stats = instrumentation.snapshot()[_name(work)]
+    assert stats["calls"] == 20
+    assert stats["total_ms"] >= stats["p95_ms"] >= 0
+    assert stats["mean_ms"] == pytest.approx(stats["total_ms"] / 20)
+
+
+def test_counts_failed_calls(enabled):
+    """Should record calls that raise an exception."""
+    @instrumented
+    def fail():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        fail()
+    assert instrumentation.snapshot()[_name(fail)]["calls"] == 1
+
+
+def test_generator_is_measured_once(enabled):
+    """Should count a generator as one call when it is exhausted."""
+    @instrumented
+    def numbers():
+        yield from range(5)
+
+    assert list(numbers()) == [0, 1, 2, 3, 4]
+    assert instrumentation.snapshot()[_name(numbers)]["calls"] == 1
+
+
+def test_rows_and_dump(enabled, tmp_path):
+    """Should add up rows and write the numbers as JSON."""
+    instrumentation.add_rows("db.iter_habits", read=10)
+    instrumentation.add_rows("db.iter_habits", read=5, written=2)
+
+    path = tmp_path / "profile.json"
+    instrumentation.dump(str(path))
+    data = json.loads(path.read_text())
+    assert data["db.iter_habits"]["rows_read"] == 15
+    assert data["db.iter_habits"]["rows_written"] == 2
+    assert len(instrumentation.format_report()) == 2
@@ -0,0 +1,84 @@
+import random
+from datetime import date, timedelta
+import analyze
+from fixtures import generate_test_habits
+from habit_manager import HabitManager
+from leaderboard import _SkipList
+
+
+def _demo_manager():
+    """
+    Returns a HabitManager with the demo habits.
+    """
+    manager = HabitManager()
+    for habit in generate_test_habits():
+        manager.add_habit(habit)
+    return manager
+
+
+def test_top_and_rank():
+    """
+    Tests top-k and rank queries, overall and per frequency.
+    """
+    manager = _demo_manager()
+    board = manager.leaderboard
+
+    top = board.top(2)
+    assert [(h.name, streak) for h, streak in top] == [("Listen to Blinkist", 28), ("Stay social", 5)]
+    assert board.top(1, "weekly")[0][0].name == "Try a new recipe"
+    assert board.rank(manager.get_habit("Read a book")) == 5
+    assert board.rank(manager.get_habit("Read a book"), "weekly") == 2
+    assert board.rank(manager.get_habit("Read a book"), "daily") is None
+
+
+def test_leaderboard_follows_changes():
+    """
+    Tests if check-ins, frequency changes and removals move habits on the leaderboard.
+    """
+    manager = _demo_manager()
+    board = manager.leaderboard
+    yoga = manager.get_habit("Yoga practice")
+
+    for day in range(26, 32):
+        yoga.check_ins.add(date(2025, 1, 1) + timedelta(days=day - 1))
+    assert board.rank(yoga) == 2
+
+    manager.remove_habit("Listen to Blinkist")
+    assert board.rank(yoga) == 1
+    assert manager.longest_daily_streak() == (yoga, 9)
+
+    yoga.frequency = "weekly"
+    assert board.top(1, "daily")[0][0].name == "Stay social"
+    assert board.rank(yoga, "weekly") == 1
+
+
+def test_matches_analyze_functions():
+    """
+    Tests if the leaderboard based results match the list based ones in analyze.py.
+    """
+    manager = _demo_manager()
+    habits = list(manager.habits)
+    assert analyze.get_longest_streak_overall(manager) == analyze.get_longest_streak_overall(habits)
+    assert analyze.habits_by_streak(manager) == analyze.habits_by_streak(habits)
+    assert analyze.get_longest_streak_of(manager, "Yoga practice") == 3
+    assert manager.longest_streak() == (manager.get_habit("Listen to Blinkist"), 28)
+
+
+def test_skip_list_matches_sorted_list():
+    """
+    Tests inserts, removals, positions and prefixes of the skip list against a sorted list.
+    """
+    rng = random.Random(7)
+    skip_list, expected = _SkipList(), []
+    for number in range(3000):
+        if expected and rng.random() < 0.4:
+            key = expected.pop(rng.randrange(len(expected)))
+            skip_list.remove(key)
+        else:
+            key = (rng.randint(-20, 0), number)
+            expected.append(key)
+            expected.sort()
+            skip_list.insert(key)
+    assert len(skip_list) == len(expected)
+    assert skip_list.first(len(expected) + 1) == expected
+    assert all(skip_list.index(key) == position for position, key in enumerate(expected))
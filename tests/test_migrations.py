@@ -0,0 +1,60 @@
+import sqlite3
+from datetime import date
+from db import get_db, load_habits
+from migrations import SCHEMA_VERSION, schema_version, migrate
+
+
+def _legacy_db(path):
+    """
+    Creates a database in the layout used before schema versioning, with a duplicate check-in.
+    """
+    db = sqlite3.connect(path)
+    db.execute("CREATE TABLE habits (name TEXT PRIMARY KEY, description TEXT, frequency TEXT, created_at TEXT)")
+    db.execute("""CREATE TABLE check_ins (id INTEGER PRIMARY KEY AUTOINCREMENT, habit_name TEXT, date TEXT,
+        FOREIGN KEY(habit_name) REFERENCES habits(name))""")
+    db.execute("INSERT INTO habits VALUES ('Read', 'Read a book', 'daily', '2025-01-01')")
+    db.executemany("INSERT INTO check_ins (habit_name, date) VALUES (?, ?)",
+                   [("Read", "2025-01-02"), ("Read", "2025-01-01"), ("Read", "2025-01-02")])
+    db.commit()
+    db.close()
+
+
+def test_new_database_has_latest_version(tmp_path):
+    """
+    Tests if a new database is created with the latest schema version.
+    """
+    db = get_db(str(tmp_path / "new.db"))
+    assert schema_version(db) == SCHEMA_VERSION
+    assert migrate(db) == SCHEMA_VERSION
+    db.close()
+
+
+def test_legacy_database_is_migrated(tmp_path):
+    """
+    Tests if an unversioned database is migrated in place, with dates converted to day ordinals,
+    check-ins pointing to habit ids, habits owned by the default user and duplicate check-ins removed.
+    """
+    path = str(tmp_path / "legacy.db")
+    _legacy_db(path)
+
+    db = get_db(path)
+    assert schema_version(db) == SCHEMA_VERSION
+    rows = db.execute("SELECT habit_id, day FROM check_ins ORDER BY day").fetchall()
+    assert rows == [(1, date(2025, 1, 1).toordinal()), (1, date(2025, 1, 2).toordinal())]
+    assert db.execute("SELECT id, user_id, name FROM habits").fetchall() == [(1, "", "Read")]
+
+    habits = load_habits(db)
+    assert list(habits[0].check_ins) == [date(2025, 1, 1), date(2025, 1, 2)]
+    db.close()
+
+
+def test_duplicate_check_ins_are_ignored(tmp_path):
+    """
+    Tests if the primary key prevents duplicate check-ins.
+    """
+    db = get_db(str(tmp_path / "dup.db"))
+    db.execute("INSERT INTO habits (id, name, description, frequency, created_at) "
+               "VALUES (1, 'Read', 'Read a book', 'daily', '2025-01-01')")
+    db.executemany("INSERT OR IGNORE INTO check_ins (habit_id, day) VALUES (?, ?)", [(1, 1), (1, 1)])
+    assert db.execute("SELECT COUNT(*) FROM check_ins").fetchone()[0] == 1
+    db.close()
@@ -0,0 +1,51 @@
+import pickle
+import pytest
+from datetime import date
+from freezegun import freeze_time
+import analyze
+from db import get_db, load_habits
+from fixtures import build_synthetic_db, generate_test_habits
+from habit import Habit
+from parallel_analyze import ParallelAnalysis, pack_chunk
+
+
+@pytest.fixture(scope="module")
+def habits(tmp_path_factory):
+    """Synthetic habits plus the demo habits and edge cases."""
+    path = str(tmp_path_factory.mktemp("parallel") / "synthetic.db")
+    build_synthetic_db(path, habits=60, years=1, seed=5, start=date(2024, 6, 1))
+    db = get_db(path)
+    habits = load_habits(db)
+    db.close()
+    habits += generate_test_habits()
+    habits.append(Habit("Empty", "Never done", "weekly"))
+    habits.append(Habit("Monthly", "Unknown frequency", "Monthly"))
+    return habits
+
+
+@freeze_time("2025-05-30")
+@pytest.mark.parametrize("chunk_size, workers", [(1000, 0), (7, 0), (1, 0), (16, 2)])
+def test_matches_serial_mode(habits, chunk_size, workers):
+    """Should give exactly the results of analyze.py for any chunk size and worker count."""
+    analysis = ParallelAnalysis(habits, chunk_size=chunk_size, workers=workers)
+    assert analysis.get_longest_streak_overall() == analyze.get_longest_streak_overall(habits)
+    assert analysis.average_streak() == analyze.average_streak(habits)
+    assert analysis.habit_frequency_summary() == analyze.habit_frequency_summary(habits)
+    assert analysis.skipped_habits() == analyze.skipped_habits(habits)
+    assert analysis.habits_by_streak() == analyze.habits_by_streak(habits)
+
+
+def test_empty_habit_list():
+    """Should handle an empty list like analyze.py."""
+    analysis = ParallelAnalysis([], workers=0)
+    assert analysis.get_longest_streak_overall() == (None, 0)
+    assert analysis.average_streak() == 0
+    assert analysis.habits_by_streak() == []
+
+
+def test_chunks_are_compact(habits):
+    """Should pickle a packed chunk into a fraction of the size of the Habit objects."""
+    chunk = pack_chunk(habits)
+    assert len(chunk[2]) == len(habits) + 1
+    assert len(chunk[3]) == sum(len(habit.check_ins) for habit in habits)
+    assert len(pickle.dumps(chunk)) < 5 * len(chunk[3]) + 100 * len(habits)
@@ -0,0 +1,118 @@
+from datetime import date
+from db import get_db, load_habits
+from habit_manager import HabitManager
+import persister as persister_module
+from persister import WriteBehindPersister
+
+
+def _load(path):
+    """
+    Loads the habits from a database file with a fresh connection.
+    """
+    db = get_db(path)
+    habits = {habit.name: habit for habit in load_habits(db)}
+    db.close()
+    return habits
+
+
+def test_changes_are_written_in_background(tmp_path):
+    """
+    Tests if changes made while the persister runs end up in the database after flush().
+    """
+    path = str(tmp_path / "habits.db")
+    manager = HabitManager()
+    persister = WriteBehindPersister(manager, path, interval=0.01)
+    persister.start()
+
+    manager.create_habit("Reading", "Read 20 pages.", "daily")
+    manager.get_habit("Reading").check_off()
+    persister.flush()
+
+    habits = _load(path)
+    assert date.today() in habits["Reading"].check_ins
+    persister.stop()
+
+
+def test_stop_writes_remaining_changes(tmp_path):
+    """
+    Tests if stop() writes changes that are still waiting for the next batch.
+    """
+    path = str(tmp_path / "habits.db")
+    manager = HabitManager()
+    manager.create_habit("Walking", "Walk 5 km.", "weekly")
+    persister = WriteBehindPersister(manager, path, interval=60, batch_size=10000)
+    persister.start()
+
+    manager.get_habit("Walking").description = "Walk 10 km."
+    manager.remove_habit("Walking")
+    manager.create_habit("Running", "Run 5 km.", "weekly")
+    persister.stop()
+
+    habits = _load(path)
+    assert list(habits) == ["Running"]
+    assert not manager.has_changes()
+
+
+def test_changes_violating_a_constraint_are_dropped(tmp_path):
+    """
+    Tests if a change set that cannot be written does not block the changes made after it.
+    """
+    path = str(tmp_path / "habits.db")
+    manager = HabitManager()
+    manager.create_habit("Reading", "Read 20 pages.", "daily")
+    persister = WriteBehindPersister(manager, path, interval=0.01)
+    persister.start()
+    persister.flush()
+
+    # Another program creates "Writing", so renaming "Reading" violates the unique name.
+    db = get_db(path)
+    with db:
+        db.execute("INSERT INTO habits (name, frequency, created_at) VALUES ('Writing', 'daily', '2024-01-01')")
+    db.close()
+    manager.rename_habit("Reading", "Writing")
+    assert persister.flush()
+
+    manager.create_habit("Running", "Run 5 km.", "weekly")
+    assert persister.flush()
+    persister.stop()
+
+    habits = _load(path)
+    assert sorted(habits) == ["Reading", "Running", "Writing"]
+
+
+def test_flush_returns_if_the_worker_is_not_running(tmp_path):
+    """
+    Tests if flush() does not wait forever when the worker thread has stopped.
+    """
+    manager = HabitManager()
+    persister = WriteBehindPersister(manager, str(tmp_path / "missing" / "habits.db"), interval=0.01)
+    persister.start()
+    manager.create_habit("Reading", "Read 20 pages.", "daily")
+
+    assert not persister.flush()
+    persister.stop()
+
+
+def test_flush_waits_for_retried_changes(tmp_path, monkeypatch):
+    """
+    Tests if flush() also waits for a batch that failed once and is retried.
+    """
+    path = str(tmp_path / "habits.db")
+    write_batch = persister_module.write_batch
+    failures = []
+
+    def busy_once(db, changesets):
+        if not failures and changesets:
+            failures.append(changesets)
+            return list(changesets), []  # like a locked database
+        return write_batch(db, changesets)
+    monkeypatch.setattr(persister_module, "write_batch", busy_once)
+
+    manager = HabitManager()
+    persister = WriteBehindPersister(manager, path, interval=0.01)
+    persister.start()
+    manager.create_habit("Reading", "Read 20 pages.", "daily")
+    assert persister.flush()
+
+    assert failures and list(_load(path)) == ["Reading"]
+    persister.stop()
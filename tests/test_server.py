@@ -0,0 +1,171 @@
+import asyncio
+from datetime import date
+from db import get_db, load_habits
+from server import HabitServer, HabitClient
+
+
+def _run(path, scenario):
+    """Starts a server on a free port, runs the scenario with a client and stops the server."""
+    async def main():
+        server = HabitServer(path)
+        await server.start(port=0)
+        client = await HabitClient.connect(*server.address[:2])
+        try:
+            return await scenario(server, client)
+        finally:
+            await client.close()
+            await server.stop()
+    return asyncio.run(main())
+
+
+def test_create_check_in_and_report(tmp_path):
+    """Should create habits, record check-ins and answer reports."""
+    async def scenario(server, client):
+        await client.request("create_habit", name="Read", description="Read a book", frequency="daily")
+        await client.request("create_habit", name="Run", frequency="weekly")
+        for day in ("2025-01-01", "2025-01-02", "2025-01-03"):
+            habit = await client.request("check_in", name="Read", day=day)
+        assert habit["current_streak"] == 3
+        assert habit["last_check_in"] == "2025-01-03"
+
+        assert [h["name"] for h in await client.request("list_habits")] == ["Read", "Run"]
+        assert await client.request("report", kind="checkin_counts") == [["Read", 3], ["Run", 0]]
+        assert await client.request("report", kind="longest_streak_overall") == {"name": "Read", "streak": 3}
+        assert await client.request("report", kind="habits_by_streak") == [["Read", 3], ["Run", 0]]
+
+        report = await client.request("db_report")
+        assert report["checkin_counts"] == [["Read", 3], ["Run", 0]]
+        assert report["frequency_summary"] == {"daily": 1, "weekly": 1}
+
+    path = str(tmp_path / "server.db")
+    _run(path, scenario)
+
+    db = get_db(path)
+    habits = load_habits(db)
+    db.close()
+    assert [h.name for h in habits] == ["Read", "Run"]
+    assert list(habits[0].check_ins) == [date(2025, 1, 1), date(2025, 1, 2), date(2025, 1, 3)]
+
+
+def test_errors(tmp_path):
+    """Should answer invalid requests with errors and keep serving."""
+    async def scenario(server, client):
+        await client.request("create_habit", name="Read")
+        for op, args in [("check_off", {"name": "Missing"}), ("create_habit", {"name": "Read"}),
+                         ("report", {"kind": "unknown"}), ("unknown", {}), ("check_off", {"wrong": 1})]:
+            try:
+                await client.request(op, **args)
+            except RuntimeError as error:
+                assert str(error)
+            else:
+                raise AssertionError(f"{op} should fail")
+        assert (await server.handle(b"not json"))["ok"] is False
+        return await client.request("list_habits")
+
+    assert len(_run(str(tmp_path / "errors.db"), scenario)) == 1
+
+
+def test_concurrent_writes_are_batched(tmp_path):
+    """Should write the check-ins of many concurrent clients in a few batches."""
+    async def scenario(server, client):
+        await client.request("create_habit", name="Read")
+        calls = []
+        original = server._run_db
+
+        async def counting(func, *args):
+            calls.append(func)
+            return await original(func, *args)
+        server._run_db = counting
+
+        clients = [await HabitClient.connect(*server.address[:2]) for _ in range(10)]
+        await asyncio.gather(*[c.request("check_in", name="Read", day=f"2025-01-{i + 1:02d}")
+                               for i, c in enumerate(clients)])
+        for c in clients:
+            await c.close()
+        return len(calls)
+
+    path = str(tmp_path / "batch.db")
+    assert _run(path, scenario) < 10
+
+    db = get_db(path)
+    assert len(load_habits(db)[0].check_ins) == 10
+    db.close()
+
+
+def test_rename_and_delete(tmp_path):
+    """Should rename and delete habits in memory and in the database."""
+    async def scenario(server, client):
+        await client.request("create_habit", name="Read")
+        await client.request("create_habit", name="Run")
+        await client.request("rename_habit", name="Read", new_name="Read more")
+        await client.request("delete_habit", name="Run")
+
+    path = str(tmp_path / "rename.db")
+    _run(path, scenario)
+    db = get_db(path)
+    assert [h.name for h in load_habits(db)] == ["Read more"]
+    db.close()
+
+
+def test_bad_write_does_not_block_later_writes(tmp_path):
+    """Should reject invalid names and drop changes the database refuses, then keep saving."""
+    path = str(tmp_path / "bad.db")
+
+    async def scenario(server, client):
+        for args in [{"name": None}, {"name": ""}, {"name": "Read", "description": 5}]:
+            try:
+                await client.request("create_habit", **args)
+            except RuntimeError as error:
+                assert "must be" in str(error)
+            else:
+                raise AssertionError(f"create_habit {args} should fail")
+        await client.request("create_habit", name="Read")
+
+        # Another program creates "Write", so the rename violates the unique name.
+        db = get_db(path)
+        with db:
+            db.execute("INSERT INTO habits (name, frequency, created_at) VALUES ('Write', 'daily', '2025-01-01')")
+        db.close()
+        try:
+            await client.request("rename_habit", name="Read", new_name="Write")
+        except RuntimeError as error:
+            assert "rejected" in str(error)
+        else:
+            raise AssertionError("the rename should fail")
+        assert [h["name"] for h in await client.request("list_habits")] == ["Read"]
+
+        await client.request("create_habit", name="Run")
+
+    _run(path, scenario)
+    db = get_db(path)
+    assert sorted(h.name for h in load_habits(db)) == ["Read", "Run", "Write"]
+    db.close()
+
+
+def test_rejected_request_does_not_fail_the_others(tmp_path):
+    """Should only fail the request whose change was rejected, even if others share its batch."""
+    path = str(tmp_path / "shared.db")
+
+    async def scenario(server, client):
+        await client.request("create_habit", name="Read")
+        await client.request("create_habit", name="Run")
+        db = get_db(path)
+        with db:
+            db.execute("INSERT INTO habits (name, frequency, created_at) VALUES ('Swim', 'daily', '2025-01-01')")
+        db.close()
+
+        other = await HabitClient.connect(*server.address[:2])
+        rename, check_off = await asyncio.gather(
+            client.request("rename_habit", name="Read", new_name="Swim"),
+            other.request("check_off", name="Run"), return_exceptions=True)
+        await other.close()
+        assert isinstance(rename, RuntimeError) and "rejected" in str(rename)
+        assert check_off["check_ins"] == 1
+        return sorted(h["name"] for h in await client.request("list_habits"))
+
+    assert _run(path, scenario) == ["Read", "Run"]
+    db = get_db(path)
+    habits = {h.name: h for h in load_habits(db)}
+    db.close()
+    assert sorted(habits) == ["Read", "Run", "Swim"]
+    assert list(habits["Run"].check_ins) == [date.today()]
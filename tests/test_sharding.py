@@ -0,0 +1,94 @@
+import pytest
+from datetime import date
+import analyze
+from fixtures import generate_test_habits
+from habit import Habit
+from habit_manager import HabitManager
+from sharding import ShardRouter, ShardedStorage
+
+USERS = ["alice", "bob", "carol", "dave", "erin", "frank"]
+
+
+def test_router_is_stable_and_spreads_users():
+    """Should always map a user to the same shard and use every shard."""
+    router = ShardRouter(4)
+    shards = [router.shard_for(f"user{i}") for i in range(200)]
+    assert shards == [ShardRouter(4).shard_for(f"user{i}") for i in range(200)]
+    assert set(shards) == {0, 1, 2, 3}
+
+
+def test_router_moves_few_users_when_growing():
+    """Should only move users to the new shard when a shard is added."""
+    old, new = ShardRouter(4), ShardRouter(5)
+    for i in range(200):
+        before, after = old.shard_for(f"user{i}"), new.shard_for(f"user{i}")
+        assert after == before or after == 4
+
+
+def test_router_needs_a_shard():
+    """Should reject a router without shards."""
+    with pytest.raises(ValueError):
+        ShardRouter(0)
+
+
+@pytest.fixture
+def storage(tmp_path):
+    """Stores the demo habits for every user in three shards."""
+    storage = ShardedStorage(str(tmp_path / "shards"), shards=3, processes=0)
+    for user in USERS:
+        manager = HabitManager()
+        for habit in generate_test_habits()[:USERS.index(user) % 5 + 1]:
+            manager.add_habit(habit)
+        assert storage.save_changes(user, manager)
+    yield storage
+    storage.close()
+
+
+def test_users_are_separated(tmp_path):
+    """Should keep habits with the same name apart for different users in the same shard."""
+    storage = ShardedStorage(str(tmp_path / "one"), shards=1, processes=0)
+    first, second = Habit("Read", "Read a book", "daily"), Habit("Read", "Read news", "weekly")
+    storage.save_habit("alice", first)
+    storage.save_habit("bob", second)
+
+    assert [h.description for h in storage.load_habits("alice")] == ["Read a book"]
+    assert [h.description for h in storage.load_habits("bob")] == ["Read news"]
+    assert storage.load_habits("carol") == []
+    storage.close()
+
+
+def test_load_user_habits(storage):
+    """Should load the habits of a user from their shard."""
+    habits = storage.load_habits("carol")
+    assert [h.name for h in habits] == [h.name for h in generate_test_habits()[:3]]
+    assert [len(h.check_ins) for h in habits] == [len(h.check_ins) for h in generate_test_habits()[:3]]
+
+
+@pytest.mark.parametrize("processes", [0, 2])
+def test_cross_shard_reports_match_analyze(storage, processes):
+    """Should merge the shard reports to the same results as analyze.py on all habits."""
+    storage.processes = processes
+    habits = {user: storage.load_habits(user) for user in USERS}
+    everything = [habit for user in USERS for habit in habits[user]]
+    today = date(2025, 1, 28)
+
+    assert storage.habit_frequency_summary() == analyze.habit_frequency_summary(everything)
+    assert storage.average_streak() == pytest.approx(analyze.average_streak(everything))
+    assert sorted(storage.checkin_counts()) == sorted(
+        (user, h.name, len(h.check_ins)) for user in USERS for h in habits[user])
+    assert sorted(storage.skipped_habits(today)) == sorted(
+        (user, h.name) for user in USERS for h in analyze.skipped_habits_as_of(habits[user], today))
+
+    ranked = storage.habits_by_streak()
+    assert [streak for _, _, streak in ranked] == sorted((h.current_streak() for h in everything), reverse=True)
+    assert storage.get_longest_streak_overall()[2] == analyze.get_longest_streak_overall(everything)[1]
+    assert len(storage.habits_by_streak(3)) == 3
+
+
+def test_empty_storage(tmp_path):
+    """Should report nothing for shards without habits."""
+    storage = ShardedStorage(str(tmp_path / "empty"), shards=2, processes=0)
+    assert storage.get_longest_streak_overall() == (None, None, 0)
+    assert storage.average_streak() == 0
+    assert storage.habit_frequency_summary() == {"daily": 0, "weekly": 0}
+    storage.close()
@@ -0,0 +1,124 @@
+import os
+from array import array
+from datetime import date
+import pytest
+from db import get_db, load_habits, save_habit, save_changes
+from habit import Habit
+from habit_manager import HabitManager
+from snapshot import is_current, load_snapshot, release, save_snapshot
+
+
+def _state(habits):
+    return [(h.id, h.name, h.description, h.frequency, h.created_at, list(h.check_ins),
+             h.current_streak(), h.longest_streak()) for h in habits]
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = get_db(str(tmp_path / "habits.db"))
+    read = Habit("Lesen 📚", "Ten pages", "daily")
+    for day in (1, 2, 3, 5):
+        read.check_ins.add(date(2025, 1, day))
+    run = Habit("Run", None, "weekly")
+    run.check_ins.add(date(2025, 1, 6))
+    save_habit(db, read)
+    save_habit(db, run)
+    # Another user's habits (even with the same name) are not part of the snapshot.
+    other_run = Habit("Run", "", "daily")
+    other_run.check_ins.add(date(2025, 1, 2))
+    save_habit(db, other_run, user="alice")
+    yield db
+    db.close()
+
+
+def test_round_trip(db, tmp_path):
+    """The snapshot should give the same habits as the database, with views as check-ins."""
+    path = tmp_path / "habits.snapshot"
+    assert load_snapshot(db, path) is None
+    assert save_snapshot(db, path) == 2
+    assert is_current(db, path)
+
+    habits = load_snapshot(db, path)
+    assert _state(habits) == _state(load_habits(db, user=""))
+    assert isinstance(habits[0].check_ins.ordinals, memoryview)
+    assert not any(habit.is_dirty for habit in habits)
+
+
+def test_writes_make_the_snapshot_stale(db, tmp_path):
+    """Any write to the tables should make the database load from the tables again."""
+    path = tmp_path / "habits.snapshot"
+    for statement in ("DELETE FROM check_ins WHERE day = (SELECT MAX(day) FROM check_ins)",
+                      "UPDATE habits SET description = 'x' WHERE name = 'Run'",
+                      "INSERT INTO habits (name, created_at) VALUES ('Yoga', '2025-01-01')"):
+        save_snapshot(db, path)
+        with db:
+            db.execute(statement)
+        assert not is_current(db, path)
+        assert load_snapshot(db, path) is None
+
+
+def test_changes_after_loading(db, tmp_path):
+    """Changed habits should copy their check-ins and be saved as usual."""
+    path = tmp_path / "habits.snapshot"
+    save_snapshot(db, path)
+    manager = HabitManager()
+    for habit in load_snapshot(db, path):
+        manager.add_habit(habit)
+
+    habit = manager.get_habit("Lesen 📚")
+    assert (habit.current_streak(), habit.longest_streak()) == (1, 3)
+    habit.check_ins.add(date(2025, 1, 4))
+    assert (habit.current_streak(), habit.longest_streak()) == (5, 5)
+    assert save_changes(db, manager)
+
+    assert load_snapshot(db, path) is None
+    save_snapshot(db, path)
+    assert _state(load_snapshot(db, path)) == _state(manager.habits)
+
+
+def test_invalid_files_are_ignored(db, tmp_path, capsys):
+    """Missing, foreign, truncated or replaced files should not be used."""
+    path = tmp_path / "habits.snapshot"
+    save_snapshot(db, path)
+    data = path.read_bytes()
+
+    path.write_bytes(data[:-3])
+    assert load_snapshot(db, path) is None
+    path.write_bytes(b"not a snapshot" * 10)
+    assert load_snapshot(db, path) is None
+    assert "Ignoring snapshot" in capsys.readouterr().out
+
+    path.write_bytes(data)
+    assert load_snapshot(db, path) is not None
+    save_snapshot(db, tmp_path / "other.snapshot")  # a newer generation
+    assert load_snapshot(db, path) is None
+    path.unlink()
+    assert load_snapshot(db, path) is None
+
+
+def test_dropped_triggers_make_the_snapshot_stale(db, tmp_path):
+    """Without its triggers (e.g. after a table was rebuilt) a snapshot cannot be trusted."""
+    path = tmp_path / "habits.snapshot"
+    save_snapshot(db, path)
+    with db:
+        db.execute("DROP TRIGGER snapshot_check_ins_insert")
+    assert load_snapshot(db, path) is None
+    save_snapshot(db, path)
+    assert is_current(db, path)
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/maps"), reason="needs /proc to list memory maps")
+def test_release_closes_the_mapping(db, tmp_path):
+    """After release, the loaded habits should no longer keep the file mapped (Windows cannot replace it then)."""
+    path = tmp_path / "habits.snapshot"
+    save_snapshot(db, path)
+    habits = load_snapshot(db, path)
+
+    def mapped():
+        with open("/proc/self/maps") as maps:
+            return str(path) in maps.read()
+    assert mapped()
+    release(habits)
+    assert not mapped()
+    assert all(isinstance(habit.check_ins.ordinals, array) for habit in habits)
+    assert _state(habits) == _state(load_habits(db, user=""))
@@ -0,0 +1,52 @@
+import os
+import subprocess
+import sys
+import threading
+from pathlib import Path
+import pytest
+from startup import BackgroundTask, lazy_import
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def test_lazy_import_on_first_use():
+    """A lazy module should be imported when an attribute is used, not before."""
+    sys.modules.pop("this_module_does_not_exist", None)
+    missing = lazy_import("this_module_does_not_exist")
+    assert not missing.loaded
+    with pytest.raises(ModuleNotFoundError):
+        missing.anything
+
+    json = lazy_import("json")
+    assert json.dumps([1]) == "[1]"
+    assert json.loaded and json.load() is sys.modules["json"]
+
+
+def test_background_task_result():
+    """result() should wait for the function and return its value."""
+    release = threading.Event()
+    task = BackgroundTask(lambda value: release.wait() and value * 2, 21)
+    assert not task.done()
+    release.set()
+    assert task.result() == 42
+    assert task.done()
+
+
+def test_background_task_error():
+    """An exception of the function should be raised by result()."""
+    def fail():
+        raise RuntimeError("no database")
+    task = BackgroundTask(fail)
+    with pytest.raises(RuntimeError, match="no database"):
+        task.result()
+
+
+def test_main_imports_prompts_lazily():
+    """Importing main.py should not import questionary or the analysis modules."""
+    code = ("import sys, main; "
+            "print(sorted(set(sys.modules) & {'questionary', 'prompt_toolkit', 'analyze', 'fixtures', 'json'}))")
+    env = dict(os.environ, PYTHONPATH=str(ROOT / "src"))
+    env.pop("HABIT_TRACKER_PROFILE", None)
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env,
+                            capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "[]"
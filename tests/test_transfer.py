@@ -0,0 +1,113 @@
+import io
+from datetime import date
+import pytest
+import transfer
+from db import get_db, load_habits, save_habit
+from habit import Habit
+
+
+def _db(tmp_path, name):
+    return get_db(str(tmp_path / name))
+
+
+def _fill(db):
+    read = Habit("Read", "Ten pages", "daily")
+    read.check_ins.add(date(2025, 1, 1))
+    read.check_ins.add(date(2025, 1, 2))
+    run = Habit("Run", "", "weekly")
+    run.check_ins.add(date(2025, 1, 6))
+    save_habit(db, read)
+    save_habit(db, run)
+    save_habit(db, Habit("Swim", "", "daily"), user="alice")
+
+
+@pytest.mark.parametrize("fmt", transfer.FORMATS)
+def test_round_trip(tmp_path, fmt):
+    """Habits and check-ins should survive an export and an import."""
+    source = _db(tmp_path, "source.db")
+    _fill(source)
+    habits_file = tmp_path / f"habits.{fmt}"
+    check_ins_file = tmp_path / f"check_ins.{fmt}"
+    assert transfer.export_file(source, habits_file, "habits") == 3
+    assert transfer.export_file(source, check_ins_file) == 3
+
+    target = _db(tmp_path, "target.db")
+    assert transfer.import_file(target, habits_file, "habits") == {"rows": 3, "added": 3}
+    assert transfer.import_file(target, check_ins_file) == {"rows": 3, "added": 3, "habits_created": 0}
+
+    def summary(db, user=None):
+        return sorted((h.name, h.description, h.frequency, h.created_at, sorted(h.check_ins))
+                      for h in load_habits(db, user=user))
+    assert summary(target) == summary(source)
+    assert summary(target, "alice") == summary(source, "alice")
+    source.close()
+    target.close()
+
+
+def test_dedup(tmp_path):
+    """Existing rows should be skipped with dedup and fail the whole import without it."""
+    db = _db(tmp_path, "dedup.db")
+    _fill(db)
+    rows = [{"name": "Read", "date": "2025-01-02"}, {"name": "Read", "date": "2025-01-03"}]
+
+    with pytest.raises(ValueError):
+        transfer.import_check_ins(db, rows, dedup=False)
+    assert len(load_habits(db, user="")[0].check_ins) == 2
+
+    assert transfer.import_check_ins(db, rows) == {"rows": 2, "added": 1, "habits_created": 0}
+    with pytest.raises(ValueError):
+        transfer.import_habits(db, [{"name": "Run"}], dedup=False)
+    db.close()
+
+
+def test_unknown_habits(tmp_path):
+    """Unknown habits should fail the import unless create_missing is given."""
+    db = _db(tmp_path, "missing.db")
+    rows = [{"name": "Yoga", "date": "2025-02-01"}, {"user": "bob", "name": "Yoga", "date": "2025-02-01"}]
+
+    with pytest.raises(KeyError, match="row 1"):
+        transfer.import_check_ins(db, rows)
+    assert transfer.import_check_ins(db, rows, create_missing="weekly") == \
+        {"rows": 2, "added": 2, "habits_created": 2}
+    assert [h.frequency for h in load_habits(db, user="bob")] == ["weekly"]
+    db.close()
+
+
+def test_chunks_and_progress(tmp_path, monkeypatch):
+    """Rows should be written in chunks and progress reported along the way."""
+    monkeypatch.setattr(transfer, "PROGRESS_EVERY", 10)
+    db = _db(tmp_path, "progress.db")
+    rows = ({"name": "Read", "date": date.fromordinal(738000 + day).isoformat()} for day in range(25))
+    reports = []
+    result = transfer.import_check_ins(db, rows, create_missing="daily", chunk_size=7, progress=reports.append)
+    assert result == {"rows": 25, "added": 25, "habits_created": 1}
+    assert reports == [10, 20, 25]
+
+    out = io.StringIO()
+    reports.clear()
+    written = transfer.write_rows(transfer.iter_check_in_rows(db, chunk_size=4), out, "csv",
+                                  transfer.CHECK_IN_FIELDS, reports.append)
+    assert written == 25 and reports == [10, 20, 25]
+    assert out.getvalue().splitlines()[:2] == ["user,name,date", f",Read,{date.fromordinal(738000).isoformat()}"]
+    db.close()
+
+
+def test_invalid_input(tmp_path):
+    """Invalid rows and unknown formats should raise ValueError."""
+    db = _db(tmp_path, "invalid.db")
+    with pytest.raises(ValueError, match="row 1"):
+        transfer.import_check_ins(db, [{"name": "Read", "date": "yesterday"}], create_missing="daily")
+    for name in ("", None, 5):
+        with pytest.raises(ValueError, match="row 2"):
+            transfer.import_check_ins(db, [{"name": "Read", "date": "2025-01-01"}, {"name": name, "date": "2025-01-01"}],
+                                      create_missing="daily")
+    valid = {"name": "Read", "frequency": "daily", "created_at": "2025-01-01"}
+    for invalid in ({"created_at": "01/02/2025"}, {"frequency": "monthly"}, {"name": None}, {"name": ""}):
+        with pytest.raises(ValueError, match="row 2"):
+            transfer.import_habits(db, [valid, dict(valid, **invalid)])
+    with pytest.raises(ValueError, match="line 2"):
+        list(transfer.read_rows(io.StringIO('{"name": "Read"}\nnot json\n'), "jsonl"))
+    with pytest.raises(ValueError):
+        transfer.detect_format("habits.xml")
+    assert load_habits(db) == []
+    db.close()